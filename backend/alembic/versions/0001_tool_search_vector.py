@@ -0,0 +1,60 @@
+"""Add weighted full-text search vector to tools
+
+Revision ID: 0001_tool_search_vector
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_tool_search_vector"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION = """
+    setweight(to_tsvector('english', coalesce({row}name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}tagline, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(array_to_string({row}tags, ' '), '')), 'C') ||
+    setweight(to_tsvector('english', coalesce({row}short_description, '')), 'D') ||
+    setweight(to_tsvector('english', coalesce({row}long_description, '')), 'D')
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tools ADD COLUMN IF NOT EXISTS search_vector tsvector")
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION tools_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR_EXPRESSION.format(row="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP TRIGGER IF EXISTS tools_search_vector_trigger ON tools")
+    op.execute("""
+        CREATE TRIGGER tools_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, tagline, tags, short_description, long_description
+        ON tools
+        FOR EACH ROW EXECUTE FUNCTION tools_search_vector_update()
+    """)
+
+    # Backfill existing rows
+    op.execute(f"UPDATE tools SET search_vector = {SEARCH_VECTOR_EXPRESSION.format(row='')}")
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tools_search_vector ON tools USING gin (search_vector)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tools_search_vector")
+    op.execute("DROP TRIGGER IF EXISTS tools_search_vector_trigger ON tools")
+    op.execute("DROP FUNCTION IF EXISTS tools_search_vector_update()")
+    op.drop_column("tools", "search_vector")
@@ -0,0 +1,32 @@
+"""Add pg_trgm indexes on tool name and slug
+
+Revision ID: 0002_tool_trigram_indexes
+Revises: 0001_tool_search_vector
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_tool_trigram_indexes"
+down_revision: Union[str, None] = "0001_tool_search_vector"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tools_name_trgm ON tools USING gin (name gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_tools_slug_trgm ON tools USING gin (slug gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tools_slug_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_tools_name_trgm")
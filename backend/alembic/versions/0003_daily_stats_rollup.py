@@ -0,0 +1,45 @@
+"""Add daily_stats rollup key, watermarks and event created_at indexes
+
+Revision ID: 0003_daily_stats_rollup
+Revises: 0002_tool_trigram_indexes
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_daily_stats_rollup"
+down_revision: Union[str, None] = "0002_tool_trigram_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EVENT_TABLES = ("engagements", "saved_tools", "reviews", "search_logs")
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            source VARCHAR(50) PRIMARY KEY,
+            watermark TIMESTAMPTZ NOT NULL,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_daily_stats_key ON daily_stats
+        (date, stat_type, coalesce(entity_id, '00000000-0000-0000-0000-000000000000'::uuid))
+    """)
+
+    for table in EVENT_TABLES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_created_at ON {table} (created_at)")
+
+
+def downgrade() -> None:
+    for table in EVENT_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_created_at")
+    op.execute("DROP INDEX IF EXISTS ux_daily_stats_key")
+    op.execute("DROP TABLE IF EXISTS rollup_watermarks")
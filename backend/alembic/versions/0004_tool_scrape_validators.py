@@ -0,0 +1,29 @@
+"""Add conditional re-fetch validators and content hash to tools
+
+Revision ID: 0004_tool_scrape_validators
+Revises: 0003_daily_stats_rollup
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_tool_scrape_validators"
+down_revision: Union[str, None] = "0003_daily_stats_rollup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tools ADD COLUMN IF NOT EXISTS scrape_etag VARCHAR(512)")
+    op.execute("ALTER TABLE tools ADD COLUMN IF NOT EXISTS scrape_last_modified VARCHAR(100)")
+    op.execute("ALTER TABLE tools ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE tools DROP COLUMN IF EXISTS content_hash")
+    op.execute("ALTER TABLE tools DROP COLUMN IF EXISTS scrape_last_modified")
+    op.execute("ALTER TABLE tools DROP COLUMN IF EXISTS scrape_etag")
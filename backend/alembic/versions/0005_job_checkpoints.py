@@ -0,0 +1,33 @@
+"""Add job_checkpoints for resumable maintenance jobs
+
+Revision ID: 0005_job_checkpoints
+Revises: 0004_tool_scrape_validators
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_job_checkpoints"
+down_revision: Union[str, None] = "0004_tool_scrape_validators"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS job_checkpoints (
+            name VARCHAR(50) PRIMARY KEY,
+            status VARCHAR(20) NOT NULL,
+            position VARCHAR(64),
+            processed INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS job_checkpoints")
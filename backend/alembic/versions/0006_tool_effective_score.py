@@ -0,0 +1,36 @@
+"""Materialize the effective ranking score and index listings on it
+
+Revision ID: 0006_tool_effective_score
+Revises: 0005_job_checkpoints
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_tool_effective_score"
+down_revision: Union[str, None] = "0005_job_checkpoints"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tools ADD COLUMN IF NOT EXISTS effective_score DOUBLE PRECISION NOT NULL DEFAULT 0")
+    # The freshness term is added by the first listing request after the upgrade
+    op.execute("UPDATE tools SET effective_score = COALESCE(rank_score, 0)")
+
+    op.execute("DROP INDEX IF EXISTS ix_tools_ranking")
+    op.execute("DROP INDEX IF EXISTS ix_tools_category_rank")
+    op.execute("CREATE INDEX ix_tools_ranking ON tools (status, effective_score, id)")
+    op.execute("CREATE INDEX ix_tools_category_rank ON tools (category_id, status, effective_score, id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tools_category_rank")
+    op.execute("DROP INDEX IF EXISTS ix_tools_ranking")
+    op.execute("CREATE INDEX ix_tools_ranking ON tools (status, rank_score, is_featured, is_sponsored)")
+    op.execute("CREATE INDEX ix_tools_category_rank ON tools (category_id, status, rank_score)")
+    op.execute("ALTER TABLE tools DROP COLUMN IF EXISTS effective_score")
@@ -0,0 +1,27 @@
+"""Track which trending flags were set by the trending engine
+
+Revision ID: 0007_tool_trending_auto
+Revises: 0006_tool_effective_score
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_tool_trending_auto"
+down_revision: Union[str, None] = "0006_tool_effective_score"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE tools ADD COLUMN IF NOT EXISTS trending_auto BOOLEAN NOT NULL DEFAULT false")
+    # The engine used to own every flag, so existing ones stay engine-managed
+    op.execute("UPDATE tools SET trending_auto = true WHERE is_trending")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE tools DROP COLUMN IF EXISTS trending_auto")
@@ -4,93 +4,151 @@ Admin API endpoints for dashboard and management.
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func, and_
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_pool_stats
+from app.core.pagination import fetch_keyset_page, count_rows
 from app.core.security import require_admin
 from app.models.tool import Tool, ToolStatus
 from app.models.user import User, UserRole
-from app.models.category import Category
-from app.models.engagement import Review, Engagement
+from app.models.engagement import Engagement
 from app.models.analytics import SearchLog, PageView, DailyStats, RankingConfig
 from app.schemas.analytics import (
-    PlatformStats, ToolStats, CategoryStats,
+    PlatformStats, ToolStats, CategoryStats, DailyStatsResponse,
+    DatabasePoolStats, ScraperPoolStats, EmbeddingCacheStats, LLMCacheStats,
+    VectorReindexStatus,
     RankingConfigUpdate, RankingConfigResponse,
     TopSearchQuery, DateRangeQuery
 )
-from app.schemas.tool import ToolResponse, ToolListResponse
+from app.schemas.tool import (
+    ToolResponse, ToolListResponse, ToolBulkImport, ToolImportStatus, CatalogRefreshStatus
+)
 from app.schemas.user import UserResponse
 from app.schemas.common import PaginatedResponse, BaseResponse
 from app.services.ranking import ranking_service
+from app.services.embedding_cache import embedding_cache
+from app.services.llm_cache import llm_cache
+from app.services.suggest_index import suggest_index
+from app.services.listing_cache import listing_cache
+from app.services.stats_rollup import stats_rollup, utc_today
+from app.services.platform_stats import platform_stats
+from app.services.bulk_import import bulk_importer
+from app.services.catalog_refresh import catalog_refresher
+from app.services.scraper import scraper
+from app.services.vector_reindex import vector_reindexer
+from app.services.embeddings import embedding_service
 
 router = APIRouter()
 
 
 @router.get("/stats", response_model=PlatformStats)
 async def get_platform_stats(
+    max_age: Optional[float] = Query(None, ge=0, description="Maximum snapshot age in seconds"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_admin),
 ):
     """
     Get overall platform statistics.
+    Served from a snapshot at most max_age (default ADMIN_STATS_MAX_AGE_SECONDS)
+    seconds old; as_of reports when it was computed.
     """
-    today = datetime.utcnow().date()
-    month_start = today.replace(day=1)
+    snapshot = await platform_stats.get(db, max_age)
 
-    # Get counts
-    total_tools = (await db.execute(select(func.count(Tool.id)))).scalar() or 0
-    total_users = (await db.execute(select(func.count(User.id)))).scalar() or 0
-    total_categories = (await db.execute(select(func.count(Category.id)))).scalar() or 0
-    total_reviews = (await db.execute(select(func.count(Review.id)))).scalar() or 0
+    return PlatformStats(
+        **snapshot["stats"],
+        revenue_today=0.0,  # Would integrate with payment system
+        revenue_month=0.0,
+        as_of=snapshot["as_of"]
+    )
 
-    tools_pending = (await db.execute(
-        select(func.count(Tool.id)).where(Tool.status == ToolStatus.PENDING)
-    )).scalar() or 0
 
-    tools_approved = (await db.execute(
-        select(func.count(Tool.id)).where(Tool.status == ToolStatus.APPROVED)
-    )).scalar() or 0
+@router.get("/system/db-pool", response_model=DatabasePoolStats)
+async def get_db_pool_stats(
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get database connection pool metrics.
+    """
+    return DatabasePoolStats(**get_pool_stats())
 
-    # Today's engagement (simplified)
-    total_views_today = (await db.execute(
-        select(func.sum(Tool.view_count))
-    )).scalar() or 0
 
-    total_clicks_today = (await db.execute(
-        select(func.sum(Tool.click_count))
-    )).scalar() or 0
+@router.get("/system/scraper-pool", response_model=ScraperPoolStats)
+async def get_scraper_pool_stats(
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get scraper HTTP connection pool and DNS cache metrics.
+    """
+    return ScraperPoolStats(**scraper.pool_stats())
+
 
-    total_saves_today = (await db.execute(
-        select(func.sum(Tool.save_count))
-    )).scalar() or 0
+@router.get("/system/embedding-cache", response_model=EmbeddingCacheStats)
+async def get_embedding_cache_stats(
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get query embedding cache hit/miss statistics.
+    """
+    return EmbeddingCacheStats(**embedding_cache.stats())
 
-    # Search count today
-    total_searches_today = (await db.execute(
-        select(func.count(SearchLog.id))
-    )).scalar() or 0
 
-    return PlatformStats(
-        total_tools=total_tools,
-        total_users=total_users,
-        total_categories=total_categories,
-        total_reviews=total_reviews,
-        tools_pending=tools_pending,
-        tools_approved=tools_approved,
-        total_views_today=total_views_today,
-        total_clicks_today=total_clicks_today,
-        total_saves_today=total_saves_today,
-        total_searches_today=total_searches_today,
-        revenue_today=0.0,  # Would integrate with payment system
-        revenue_month=0.0
+@router.get("/system/llm-cache", response_model=LLMCacheStats)
+async def get_llm_cache_stats(
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get LLM response cache hit/miss statistics and tokens saved.
+    """
+    return LLMCacheStats(**llm_cache.stats())
+
+
+@router.get("/stats/daily", response_model=List[DailyStatsResponse])
+async def get_daily_stats(
+    stat_type: str = Query("platform", pattern="^(tool|category|platform)$"),
+    entity_id: Optional[UUID] = None,
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get pre-aggregated daily statistics for a tool, category or the platform.
+    """
+    query = select(DailyStats).where(
+        DailyStats.stat_type == stat_type,
+        DailyStats.date >= utc_today() - timedelta(days=days - 1)
     )
+    if stat_type == "platform":
+        query = query.where(DailyStats.entity_id.is_(None))
+    else:
+        if not entity_id:
+            raise HTTPException(status_code=400, detail="entity_id is required")
+        query = query.where(DailyStats.entity_id == entity_id)
+
+    result = await db.execute(query.order_by(DailyStats.date))
+    return [DailyStatsResponse.model_validate(row) for row in result.scalars().all()]
+
+
+@router.post("/stats/rollup", response_model=BaseResponse)
+async def run_stats_rollup(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Roll new events up into daily statistics now (it otherwise runs periodically).
+    """
+    result = await stats_rollup.run(db)
+
+    return BaseResponse(message=f"Daily stats rolled up to {result['rolled_up_to']}")
 
 
 @router.get("/tools/pending", response_model=PaginatedResponse[ToolListResponse])
 async def get_pending_tools(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern="^(exact|estimate)$"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_admin),
 ):
@@ -98,18 +156,15 @@ async def get_pending_tools(
     Get tools pending moderation.
     """
     query = select(Tool).where(Tool.status == ToolStatus.PENDING)
-    query = query.order_by(Tool.created_at.desc())
 
     # Count
-    count_query = select(func.count(Tool.id)).where(Tool.status == ToolStatus.PENDING)
-    total = (await db.execute(count_query)).scalar() or 0
+    total, is_estimate = await count_rows(db, query, count)
 
     # Pagination
     offset = (page - 1) * limit
-    query = query.offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    tools = result.scalars().all()
+    tools, cursors, has_more = await fetch_keyset_page(
+        db, query, [Tool.created_at, Tool.id], limit, cursor, offset
+    )
 
     return PaginatedResponse(
         items=[ToolListResponse.model_validate(t) for t in tools],
@@ -117,8 +172,10 @@ async def get_pending_tools(
         page=page,
         limit=limit,
         pages=(total + limit - 1) // limit if total > 0 else 1,
-        has_next=offset + len(tools) < total,
-        has_prev=page > 1
+        has_next=has_more,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=cursors[-1] if has_more else None,
+        total_is_estimate=is_estimate
     )
 
 
@@ -128,6 +185,8 @@ async def list_admin_tools(
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None, pattern="^(pending|approved|rejected|archived)$"),
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern="^(exact|estimate)$"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_admin),
 ):
@@ -150,29 +209,14 @@ async def list_admin_tools(
             )
         )
 
-    query = query.order_by(Tool.created_at.desc())
-
     # Count
-    count_query = select(func.count(Tool.id))
-    if status:
-        count_query = count_query.where(Tool.status == status)
-    if search:
-        count_query = count_query.where(
-            or_(
-                Tool.name.ilike(search_term),
-                Tool.slug.ilike(search_term),
-                Tool.website_url.ilike(search_term)
-            )
-        )
-            
-    total = (await db.execute(count_query)).scalar() or 0
+    total, is_estimate = await count_rows(db, query, count)
 
     # Pagination
     offset = (page - 1) * limit
-    query = query.offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    tools = result.scalars().all()
+    tools, cursors, has_more = await fetch_keyset_page(
+        db, query, [Tool.created_at, Tool.id], limit, cursor, offset
+    )
 
     return PaginatedResponse(
         items=[ToolListResponse.model_validate(t) for t in tools],
@@ -180,8 +224,10 @@ async def list_admin_tools(
         page=page,
         limit=limit,
         pages=(total + limit - 1) // limit if total > 0 else 1,
-        has_next=offset + len(tools) < total,
-        has_prev=page > 1
+        has_next=has_more,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=cursors[-1] if has_more else None,
+        total_is_estimate=is_estimate
     )
 
 
@@ -201,14 +247,18 @@ async def get_tool_stats(
     # Calculate CTR
     ctr = (tool.click_count / tool.view_count * 100) if tool.view_count > 0 else 0
 
+    today = utc_today()
+    today_totals = await stats_rollup.get_totals(db, "tool", tool.id, since=today)
+    week_totals = await stats_rollup.get_totals(db, "tool", tool.id, since=today - timedelta(days=6))
+
     return ToolStats(
         tool_id=tool.id,
         tool_name=tool.name,
         views_total=tool.view_count,
-        views_today=0,  # Would come from daily stats
-        views_week=0,
+        views_today=today_totals["views"],
+        views_week=week_totals["views"],
         clicks_total=tool.click_count,
-        clicks_today=0,
+        clicks_today=today_totals["clicks"],
         click_through_rate=round(ctr, 2),
         saves_total=tool.save_count,
         reviews_total=tool.review_count,
@@ -223,6 +273,8 @@ async def list_users(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     role: Optional[UserRole] = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern="^(exact|estimate)$"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_admin),
 ):
@@ -234,20 +286,14 @@ async def list_users(
     if role:
         query = query.where(User.role == role)
 
-    query = query.order_by(User.created_at.desc())
-
     # Count
-    count_query = select(func.count(User.id))
-    if role:
-        count_query = count_query.where(User.role == role)
-    total = (await db.execute(count_query)).scalar() or 0
+    total, is_estimate = await count_rows(db, query, count)
 
     # Pagination
     offset = (page - 1) * limit
-    query = query.offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    users = result.scalars().all()
+    users, cursors, has_more = await fetch_keyset_page(
+        db, query, [User.created_at, User.id], limit, cursor, offset
+    )
 
     return PaginatedResponse(
         items=[UserResponse.model_validate(u) for u in users],
@@ -255,8 +301,10 @@ async def list_users(
         page=page,
         limit=limit,
         pages=(total + limit - 1) // limit if total > 0 else 1,
-        has_next=offset + len(users) < total,
-        has_prev=page > 1
+        has_next=has_more,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=cursors[-1] if has_more else None,
+        total_is_estimate=is_estimate
     )
 
 
@@ -297,7 +345,8 @@ async def get_top_searches(
     query = select(
         SearchLog.query_normalized,
         func.count(SearchLog.id).label("count"),
-        func.avg(SearchLog.results_count).label("avg_results")
+        func.avg(SearchLog.results_count).label("avg_results"),
+        func.count(SearchLog.clicked_tool_id).label("clicks")
     ).where(
         SearchLog.created_at >= cutoff
     ).group_by(
@@ -314,7 +363,7 @@ async def get_top_searches(
             query=row[0] or "unknown",
             count=row[1],
             avg_results=round(row[2] or 0, 1),
-            click_through_rate=0.0  # Would calculate from clicks
+            click_through_rate=round(row[3] / row[1] * 100, 2) if row[1] else 0.0
         )
         for row in rows
     ]
@@ -396,9 +445,138 @@ async def recalculate_rankings(
     """
     Trigger ranking recalculation for all or specific tools.
     """
-    await ranking_service.bulk_update_rankings(db, tool_ids)
+    stats = await ranking_service.bulk_update_rankings(db, tool_ids)
+
+    return BaseResponse(
+        message=(
+            f"Rankings recalculated for {stats['tools_updated']} tools "
+            f"in {stats['elapsed_seconds']}s ({stats['tools_per_second']} tools/s)"
+        )
+    )
+
+
+@router.post("/ranking/trending/refresh", response_model=BaseResponse)
+async def refresh_trending(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Recompute the trending set now (it is otherwise refreshed periodically).
+    """
+    newly_trending = await ranking_service.detect_trending(db)
+
+    return BaseResponse(
+        message=f"Trending set refreshed ({len(newly_trending)} newly trending tools)"
+    )
+
+
+@router.post("/imports", response_model=ToolImportStatus, status_code=202)
+async def start_bulk_import(
+    payload: ToolBulkImport,
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Import tools from a list of URLs.
+    Runs in the background; poll GET /admin/imports/{job_id} for progress.
+    """
+    job = bulk_importer.submit(payload.urls, UUID(current_user["user_id"]))
+    return job.to_dict()
+
+
+@router.post("/imports/file", response_model=ToolImportStatus, status_code=202)
+async def start_bulk_import_from_file(
+    file: UploadFile = File(..., description="Text file with one URL per line"),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Import tools from an uploaded URL list (blank lines and # comments ignored).
+    """
+    content = (await file.read()).decode("utf-8", errors="replace")
+    lines = [line.strip() for line in content.splitlines()]
+    urls = [line for line in lines if line and not line.startswith("#")]
+
+    try:
+        payload = ToolBulkImport(urls=urls)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = bulk_importer.submit(payload.urls, UUID(current_user["user_id"]))
+    return job.to_dict()
+
+
+@router.get("/imports", response_model=List[ToolImportStatus])
+async def list_bulk_imports(
+    current_user: dict = Depends(require_admin),
+):
+    """
+    List bulk imports started by this worker, newest first.
+    """
+    return bulk_importer.list_jobs()
+
+
+@router.get("/imports/{job_id}", response_model=ToolImportStatus)
+async def get_bulk_import(
+    job_id: UUID,
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get progress, throughput and failures of a bulk import.
+    """
+    job = await bulk_importer.get_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.post("/imports/{job_id}/cancel", response_model=BaseResponse)
+async def cancel_bulk_import(
+    job_id: UUID,
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Cancel a running bulk import. Tools already created are kept.
+    """
+    if not bulk_importer.cancel(job_id):
+        raise HTTPException(status_code=404, detail="No running import with this ID")
+    return BaseResponse(message="Import cancelled")
 
-    return BaseResponse(message="Rankings recalculated successfully")
+
+@router.post("/search/reindex", response_model=VectorReindexStatus, status_code=202)
+async def start_vector_reindex(
+    resume: bool = Query(True, description="Continue from the last checkpoint"),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Rebuild the vector index for all approved tools in the background.
+    """
+    if not embedding_service.is_connected:
+        raise HTTPException(status_code=503, detail="Vector database is not connected")
+    if not vector_reindexer.start(resume=resume):
+        raise HTTPException(status_code=409, detail="A reindex is already running")
+    return vector_reindexer.progress()
+
+
+@router.get("/search/reindex", response_model=VectorReindexStatus)
+async def get_vector_reindex(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get progress and throughput of the vector index rebuild.
+    """
+    return await vector_reindexer.get_progress(db)
+
+
+@router.post("/search/reindex/cancel", response_model=BaseResponse)
+async def cancel_vector_reindex(
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Stop a running rebuild; it resumes from its checkpoint next time.
+    """
+    if not vector_reindexer.cancel():
+        raise HTTPException(status_code=404, detail="No reindex is running")
+    return BaseResponse(message="Reindex cancelled")
 
 
 @router.post("/tools/bulk-action", response_model=BaseResponse)
@@ -428,10 +606,92 @@ async def bulk_tool_action(
         elif action == "unfeature":
             tool.is_featured = False
 
+    if action == "approve":
+        await ranking_service.refresh_effective_scores(db, [tool.id for tool in tools])
     await db.commit()
 
+    if action in ("approve", "reject", "archive"):
+        await embedding_service.sync_attributes(tools)
+    for tool in tools:
+        suggest_index.upsert_tool(tool)
+    await listing_cache.invalidate()
+
     return BaseResponse(message=f"Action '{action}' applied to {len(tools)} tools")
 
+@router.post("/tools/{tool_id}/rescrape", response_model=BaseResponse)
+async def rescrape_tool(
+    tool_id: UUID,
+    force: bool = Query(False, description="Ignore validators and content hash"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Re-scrape a tool's website; extraction and re-embedding only run if the page changed.
+    """
+    from app.services.tool_service import tool_service
+
+    tool = await db.get(Tool, tool_id)
+    if not tool:
+        raise HTTPException(status_code=404, detail="Tool not found")
+
+    outcome = await tool_service.refresh_from_source(db, tool, force=force)
+    if outcome == "failed":
+        raise HTTPException(status_code=502, detail="Could not re-scrape tool website")
+
+    return BaseResponse(message=f"Tool re-scraped: {outcome.replace('_', ' ')}")
+
+
+@router.post("/tools/rescrape", response_model=CatalogRefreshStatus, status_code=202)
+async def rescrape_catalog(
+    limit: int = Query(100, ge=1, le=5000),
+    force: bool = Query(False, description="Ignore validators and content hashes"),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Re-scrape the least recently scraped tools with conditional requests.
+    Runs in the background; poll GET /admin/rescrapes/{job_id} for progress.
+    """
+    job = catalog_refresher.submit(limit=limit, force=force)
+    return job.to_dict()
+
+
+@router.get("/rescrapes", response_model=List[CatalogRefreshStatus])
+async def list_catalog_rescrapes(
+    current_user: dict = Depends(require_admin),
+):
+    """
+    List catalog re-scrapes started by this worker, newest first.
+    """
+    return catalog_refresher.list_jobs()
+
+
+@router.get("/rescrapes/{job_id}", response_model=CatalogRefreshStatus)
+async def get_catalog_rescrape(
+    job_id: UUID,
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get progress and outcomes of a catalog re-scrape.
+    """
+    job = await catalog_refresher.get_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Re-scrape job not found")
+    return job
+
+
+@router.post("/rescrapes/{job_id}/cancel", response_model=BaseResponse)
+async def cancel_catalog_rescrape(
+    job_id: UUID,
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Cancel a running catalog re-scrape. Tools already refreshed are kept.
+    """
+    if not catalog_refresher.cancel(job_id):
+        raise HTTPException(status_code=404, detail="No running re-scrape with this ID")
+    return BaseResponse(message="Re-scrape cancelled")
+
+
 @router.post("/tools/{tool_id}/auto-categorize")
 async def auto_categorize_tool(
     tool_id: UUID,
@@ -462,6 +722,14 @@ async def auto_categorize_tool(
         tool.category_id = category.id
         await db.commit()
         await db.refresh(tool)
+        await embedding_service.update_tool(
+            tool_id=tool.id,
+            name=tool.name,
+            description=tool.short_description,
+            category=category.name,
+            tags=tool.tags or [],
+            attributes=embedding_service.attributes_for(tool)
+        )
     
     return {
         "success": True,
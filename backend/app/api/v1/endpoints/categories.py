@@ -16,6 +16,7 @@ from app.schemas.category import (
     CategoryListResponse, CategoryWithChildren
 )
 from app.schemas.common import BaseResponse
+from app.services.suggest_index import suggest_index
 
 router = APIRouter()
 
@@ -144,13 +145,14 @@ async def get_category_tools(
     category_id: UUID,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern="^(exact|estimate)$"),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get tools in a category with pagination.
     """
     from app.services.ranking import ranking_service
-    from app.schemas.tool import ToolListResponse
     from app.schemas.common import PaginatedResponse
 
     category = await db.get(Category, category_id)
@@ -159,28 +161,25 @@ async def get_category_tools(
 
     offset = (page - 1) * limit
 
-    tools = await ranking_service.get_ranked_tools(
+    result = await ranking_service.get_ranked_listing(
         db=db,
         category_id=category_id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        count_mode=count
     )
 
-    # Get total count
-    count_query = select(func.count(Tool.id)).where(
-        Tool.category_id == category_id,
-        Tool.status == ToolStatus.APPROVED
-    )
-    total = (await db.execute(count_query)).scalar() or 0
-
     return PaginatedResponse(
-        items=[ToolListResponse.model_validate(t) for t in tools],
-        total=total,
+        items=result.items,
+        total=result.total,
         page=page,
         limit=limit,
-        pages=(total + limit - 1) // limit if total > 0 else 1,
-        has_next=offset + len(tools) < total,
-        has_prev=page > 1
+        pages=(result.total + limit - 1) // limit if result.total > 0 else 1,
+        has_next=result.next_cursor is not None,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=result.next_cursor,
+        total_is_estimate=result.total_is_estimate
     )
 
 
@@ -216,6 +215,8 @@ async def create_category(
     await db.commit()
     await db.refresh(category)
 
+    suggest_index.upsert_category(category)
+
     return CategoryResponse.model_validate(category)
 
 
@@ -240,6 +241,8 @@ async def update_category(
     await db.commit()
     await db.refresh(category)
 
+    suggest_index.upsert_category(category)
+
     return CategoryResponse.model_validate(category)
 
 
@@ -269,4 +272,6 @@ async def delete_category(
     await db.delete(category)
     await db.commit()
 
+    suggest_index.remove_category(category_id)
+
     return BaseResponse(message="Category deleted successfully")
@@ -1,13 +1,14 @@
 """
 Review API endpoints.
 """
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.pagination import fetch_keyset_page, count_rows
 from app.core.security import get_current_user, require_admin
 from app.models.tool import Tool
 from app.models.engagement import Review, SavedTool
@@ -16,6 +17,7 @@ from app.schemas.engagement import (
     SavedToolCreate, SavedToolResponse, ReviewHelpful
 )
 from app.schemas.common import PaginatedResponse, BaseResponse
+from app.services.embeddings import embedding_service
 
 router = APIRouter()
 
@@ -69,6 +71,7 @@ async def create_review(
 
     await db.commit()
     await db.refresh(review)
+    await embedding_service.sync_attributes([tool])
 
     return ReviewResponse.model_validate(review)
 
@@ -79,6 +82,8 @@ async def get_tool_reviews(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
     sort: str = Query("newest", pattern="^(newest|highest|lowest|helpful)$"),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern="^(exact|estimate)$"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -86,25 +91,23 @@ async def get_tool_reviews(
     """
     query = select(Review).where(Review.tool_id == tool_id)
 
-    if sort == "newest":
-        query = query.order_by(Review.created_at.desc())
-    elif sort == "highest":
-        query = query.order_by(Review.rating.desc())
+    # Keyset sort keys (all descending, ending in the primary key)
+    if sort == "highest":
+        sort_keys = [Review.rating, Review.created_at, Review.id]
     elif sort == "lowest":
-        query = query.order_by(Review.rating.asc())
+        sort_keys = [-Review.rating, Review.created_at, Review.id]
     elif sort == "helpful":
-        query = query.order_by(Review.helpful_count.desc())
+        sort_keys = [Review.helpful_count, Review.id]
+    else:  # newest
+        sort_keys = [Review.created_at, Review.id]
 
-    # Get total count
-    count_query = select(func.count(Review.id)).where(Review.tool_id == tool_id)
-    total = (await db.execute(count_query)).scalar() or 0
+    total, is_estimate = await count_rows(db, query, count)
 
     # Pagination
     offset = (page - 1) * limit
-    query = query.offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    reviews = result.scalars().all()
+    reviews, cursors, has_more = await fetch_keyset_page(
+        db, query, sort_keys, limit, cursor, offset
+    )
 
     return PaginatedResponse(
         items=[ReviewResponse.model_validate(r) for r in reviews],
@@ -112,8 +115,10 @@ async def get_tool_reviews(
         page=page,
         limit=limit,
         pages=(total + limit - 1) // limit if total > 0 else 1,
-        has_next=offset + len(reviews) < total,
-        has_prev=page > 1
+        has_next=has_more,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=cursors[-1] if has_more else None,
+        total_is_estimate=is_estimate
     )
 
 
@@ -149,6 +154,8 @@ async def update_review(
 
     await db.commit()
     await db.refresh(review)
+    if "rating" in update_data and tool:
+        await embedding_service.sync_attributes([tool])
 
     return ReviewResponse.model_validate(review)
 
@@ -185,6 +192,8 @@ async def delete_review(
             tool.average_rating = 0
 
     await db.commit()
+    if tool:
+        await embedding_service.sync_attributes([tool])
 
     return BaseResponse(message="Review deleted successfully")
 
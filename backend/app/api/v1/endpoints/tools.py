@@ -1,9 +1,10 @@
 """
 Tool API endpoints.
 """
+import time
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -12,23 +13,30 @@ from app.models.tool import Tool, ToolStatus
 from app.models.engagement import EngagementType
 from app.schemas.tool import (
     ToolCreate, ToolUpdate, ToolResponse, ToolListResponse,
-    ToolURLSubmit, ToolExtractionResult, ToolSearchQuery,
-    ToolRankingUpdate, ToolModerationAction
+    ToolURLSubmit, ToolExtractionPreview, ToolSearchQuery,
+    ToolSearchResponse, ToolSearchClick,
+    ToolRankingUpdate, ToolModerationAction, ToolSuggestion
 )
 from app.schemas.common import PaginatedResponse, BaseResponse
 from app.services.tool_service import tool_service
 from app.services.ranking import ranking_service
+from app.services.suggest_index import suggest_index
+from app.services.listing_cache import listing_cache
+from app.services.search_log_buffer import search_log_buffer, SearchEvent, hash_ip
+from app.services.extraction_store import extraction_store
+from app.services.embeddings import embedding_service
 
 router = APIRouter()
 
 
-@router.post("/extract", response_model=ToolExtractionResult)
+@router.post("/extract", response_model=ToolExtractionPreview)
 async def extract_from_url(
     data: ToolURLSubmit,
 ):
     """
     Extract tool information from a URL using LLM.
-    Returns extracted data for preview before submission.
+    Returns extracted data for preview before submission, with an
+    extraction_token that /tools/submit accepts in place of re-extracting.
     """
     result = await tool_service.extract_from_url(url=data.url)
 
@@ -38,7 +46,13 @@ async def extract_from_url(
             detail="Failed to extract data from URL. Please check the URL and try again."
         )
 
-    return result
+    token = await extraction_store.put(data.url, result)
+
+    return ToolExtractionPreview(
+        **result.model_dump(),
+        extraction_token=token,
+        expires_in=extraction_store.ttl
+    )
 
 
 @router.post("/submit", response_model=ToolResponse)
@@ -50,10 +64,16 @@ async def submit_tool_from_url(
 ):
     """
     Submit a new tool using URL extraction.
+    A valid extraction_token from /tools/extract reuses that preview; without
+    one (or once it has expired) the URL is extracted again.
     The tool will be in pending status until approved.
     """
-    # Extract data from URL
-    extraction = await tool_service.extract_from_url(data.url)
+    extraction = None
+    if data.extraction_token:
+        extraction = await extraction_store.take(data.extraction_token, data.url)
+
+    if extraction is None:
+        extraction = await tool_service.extract_from_url(data.url)
 
     if not extraction:
         raise HTTPException(
@@ -95,37 +115,42 @@ async def list_tools(
     limit: int = Query(20, ge=1, le=100),
     category_id: Optional[UUID] = None,
     ranking_type: str = Query("default", pattern="^(default|sponsored|featured|trending|newest|top_rated)$"),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern="^(exact|estimate)$"),
     db: AsyncSession = Depends(get_db),
 ):
     """
     List tools with ranking and pagination.
+    Pass next_cursor from a previous page as cursor for constant-cost deep paging.
     """
     offset = (page - 1) * limit
 
-    tools = await ranking_service.get_ranked_tools(
+    result = await ranking_service.get_ranked_listing(
         db=db,
         category_id=category_id,
         limit=limit,
         offset=offset,
-        ranking_type=ranking_type
+        ranking_type=ranking_type,
+        cursor=cursor,
+        count_mode=count
     )
 
-    # Get total count (simplified - in production use count query)
-    total = len(tools) + offset if len(tools) == limit else len(tools) + offset
-
     return PaginatedResponse(
-        items=[ToolListResponse.model_validate(t) for t in tools],
-        total=total,
+        items=result.items,
+        total=result.total,
         page=page,
         limit=limit,
-        pages=(total + limit - 1) // limit,
-        has_next=len(tools) == limit,
-        has_prev=page > 1
+        pages=(result.total + limit - 1) // limit if result.total > 0 else 1,
+        has_next=result.next_cursor is not None,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=result.next_cursor,
+        total_is_estimate=result.total_is_estimate
     )
 
 
-@router.get("/search", response_model=PaginatedResponse[ToolListResponse])
+@router.get("/search", response_model=ToolSearchResponse)
 async def search_tools(
+    request: Request,
     q: str = Query(..., min_length=1, max_length=500),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
@@ -137,6 +162,7 @@ async def search_tools(
 ):
     """
     Search tools using keyword, semantic, or hybrid search.
+    Report result clicks to /tools/search/{search_id}/click.
     """
     from app.models.tool import PricingModel
 
@@ -148,6 +174,7 @@ async def search_tools(
         search_type=search_type
     )
 
+    started = time.perf_counter()
     offset = (page - 1) * limit
     tools, total = await tool_service.search(
         db=db,
@@ -156,17 +183,65 @@ async def search_tools(
         offset=offset
     )
 
-    return PaginatedResponse(
+    search_id = await search_log_buffer.record_search(SearchEvent(
+        query=q,
+        search_type=search_type,
+        results_count=total,
+        result_tool_ids=[str(t.id) for t in tools],
+        filters={
+            "category_id": str(category_id) if category_id else None,
+            "pricing": pricing,
+            "min_rating": min_rating,
+            "page": page,
+        },
+        response_time_ms=int((time.perf_counter() - started) * 1000),
+        session_id=request.headers.get("X-Session-ID"),
+        user_agent=request.headers.get("User-Agent"),
+        ip_hash=hash_ip(request.client.host if request.client else None),
+    ))
+
+    return ToolSearchResponse(
         items=[ToolListResponse.model_validate(t) for t in tools],
         total=total,
         page=page,
         limit=limit,
         pages=(total + limit - 1) // limit if total > 0 else 1,
         has_next=offset + len(tools) < total,
-        has_prev=page > 1
+        has_prev=page > 1,
+        search_id=search_id
     )
 
 
+@router.post("/search/{search_id}/click", response_model=BaseResponse)
+async def record_search_click(
+    search_id: UUID,
+    data: ToolSearchClick,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Link a click on a search result to its search.
+    Only the search log is updated; the click engagement itself is recorded
+    by POST /tools/{id}/click. Clicks on tools the search did not return
+    are ignored.
+    """
+    await search_log_buffer.record_click(search_id, data.tool_id, data.position, db=db)
+
+    return BaseResponse(message="Click recorded")
+
+
+@router.get("/suggest", response_model=List[ToolSuggestion])
+async def suggest_tools(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20),
+):
+    """
+    Search-as-you-type suggestions over approved tool names, tags and categories.
+    Served from an in-memory prefix index, ranked by rank score.
+    """
+    await suggest_index.ensure_built()
+    return [ToolSuggestion.model_validate(s) for s in suggest_index.suggest(q, limit)]
+
+
 @router.get("/{tool_id}", response_model=ToolResponse)
 async def get_tool(
     tool_id: UUID,
@@ -299,6 +374,8 @@ async def update_tool_ranking(
         tool.is_sponsored = data.is_sponsored
     if data.is_trending is not None:
         tool.is_trending = data.is_trending
+        # A manual flag is left alone by the trending engine
+        tool.trending_auto = False
     if data.is_editors_pick is not None:
         tool.is_editors_pick = data.is_editors_pick
     if data.is_internal is not None:
@@ -310,10 +387,14 @@ async def update_tool_ranking(
 
     # Recalculate rank score
     tool.rank_score = ranking_service.calculate_rank_score(tool)
+    await ranking_service.refresh_effective_scores(db, [tool.id])
 
     await db.commit()
     await db.refresh(tool)
 
+    suggest_index.upsert_tool(tool)
+    await listing_cache.invalidate()
+
     return tool
 
 
@@ -361,8 +442,15 @@ async def moderate_tool(
     tool.moderated_by = UUID(current_user["user_id"])
     from datetime import datetime
     tool.moderated_at = datetime.utcnow().isoformat()
+    if tool.status == ToolStatus.APPROVED:
+        # New tools have no effective score until they are listed
+        await ranking_service.refresh_effective_scores(db, [tool.id])
 
     await db.commit()
     await db.refresh(tool)
 
+    await embedding_service.sync_attributes([tool])
+    suggest_index.upsert_tool(tool)
+    await listing_cache.invalidate()
+
     return tool
@@ -40,8 +40,12 @@ class Settings(BaseSettings):
 
     # Database - Supabase PostgreSQL
     DATABASE_URL: PostgresDsn = Field(..., description="Supabase PostgreSQL connection URL")
+    DATABASE_ENGINE_PROFILE: str = "serverless"  # serverless (NullPool) | pooled
     DATABASE_POOL_SIZE: int = 5
     DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_PGBOUNCER: bool = True  # Disable asyncpg statement caches for transaction pooling
 
     # Redis - Upstash (serverless Redis)
     REDIS_URL: str = ""
@@ -51,22 +55,117 @@ class Settings(BaseSettings):
     QDRANT_URL: str = ""
     QDRANT_API_KEY: Optional[str] = None
     QDRANT_COLLECTION: str = "tool_embeddings"
+    QDRANT_USE_ASYNC_CLIENT: bool = True  # False falls back to the sync client in a thread pool
+    QDRANT_SYNC_MAX_WORKERS: int = 4
+    VECTOR_SEARCH_TIMEOUT_SECONDS: float = 5.0
+    VECTOR_BACKEND: str = "auto"  # qdrant | local | auto (qdrant if QDRANT_URL is set)
+    VECTOR_WRITE_TIMEOUT_SECONDS: float = 15.0
+    HYBRID_SEARCH_LEG_TIMEOUT_SECONDS: float = 4.0
+
+    # In-process vector index (VECTOR_BACKEND=local)
+    VECTOR_LOCAL_PATH: str = "data/vector_index"
+    VECTOR_LOCAL_DTYPE: str = "float32"  # float32 | int8 (4x smaller, slightly lossy)
+    VECTOR_LOCAL_ALGORITHM: str = "brute"  # brute | ivf
+    VECTOR_LOCAL_INLINE_MAX: int = 20000  # Larger indexes are searched in a worker thread
+    VECTOR_LOCAL_FLUSH_SECONDS: float = 2.0  # Metadata persistence delay after writes
+    VECTOR_IVF_MIN_POINTS: int = 50000  # Brute force below this size
+    VECTOR_IVF_LISTS: int = 0  # 0 = sqrt(vector count)
+    VECTOR_IVF_PROBES: int = 8
+
+    # Keyword search relevance blend: ts_rank_cd * text weight + ln(1 + rank_score) * rank weight
+    SEARCH_TEXT_RANK_WEIGHT: float = 1.0
+    SEARCH_RANK_SCORE_WEIGHT: float = 0.1
+
+    # Trigram fuzzy matching, used when full-text search finds nothing
+    SEARCH_FUZZY_ENABLED: bool = True
+    SEARCH_FUZZY_THRESHOLD: float = 0.3  # pg_trgm similarity threshold (0-1)
+
+    # Materialized ranked listings (/tools and category pages)
+    LISTING_CACHE_ENABLED: bool = True
+    LISTING_CACHE_MAX_ITEMS: int = 1000  # Deeper pages fall back to the database
+    LISTING_CACHE_TTL_SECONDS: int = 600
+    LISTING_CACHE_LOCAL_TTL_SECONDS: int = 30  # Cross-worker staleness bound
+    LISTING_CACHE_LOCAL_MAX_LISTINGS: int = 256  # LRU cap on snapshots held in process
+
+    # Search-as-you-type suggestions
+    SUGGEST_MAX_RESULTS: int = 10
+    SUGGEST_REBUILD_SECONDS: int = 300  # Rebuild so scores follow engagement and ranking updates
 
     # OpenAI / LLM
     OPENAI_API_KEY: str = Field(..., description="OpenAI API key for LLM operations")
     LLM_MODEL: str = "gpt-4o-mini"
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 512  # In-process LRU tier
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     EMBEDDING_DIMENSIONS: int = 1536
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 2048  # In-process LRU tier
+    EMBEDDING_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Redis tier
+    EMBEDDING_BATCH_SIZE: int = 256  # Inputs per embeddings request
+    QDRANT_UPSERT_BATCH_SIZE: int = 512  # Points per upsert
+    REINDEX_CONCURRENCY: int = 4  # Embedding batches in flight during a full reindex
 
     # Scraping
     SCRAPER_USER_AGENT: str = "AIToolMarketplace/1.0 (+https://aitoolmarketplace.com)"
     SCRAPER_TIMEOUT: int = 30
     SCRAPER_MAX_RETRIES: int = 3
+    SCRAPER_MAX_CONNECTIONS: int = 100  # Shared client pool
+    SCRAPER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    SCRAPER_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    SCRAPER_MAX_CONNECTIONS_PER_HOST: int = 4
+    SCRAPER_HTTP2: bool = False  # Requires the h2 package (httpx[http2])
+    SCRAPER_DNS_CACHE_TTL_SECONDS: float = 300.0
+    SCRAPER_PARSE_EXECUTOR: str = "process"  # process | thread | inline (falls back to thread)
+    SCRAPER_PARSE_WORKERS: int = 2
+    SCRAPER_MAX_HTML_BYTES: int = 2_000_000  # Larger pages are truncated before parsing
+
+    # Extraction preview tokens (/tools/extract -> /tools/submit)
+    EXTRACTION_TOKEN_TTL_SECONDS: int = 1800
+    EXTRACTION_TOKEN_MAX_ENTRIES: int = 1000  # In-process tier
+
+    # Bulk URL import pipeline (per-stage worker counts)
+    IMPORT_FETCH_CONCURRENCY: int = 16
+    IMPORT_CLEAN_CONCURRENCY: int = 4
+    IMPORT_EXTRACT_CONCURRENCY: int = 4  # Bounded by LLM rate limits
+    IMPORT_CREATE_CONCURRENCY: int = 2
+    IMPORT_QUEUE_SIZE: int = 32  # Items buffered between stages
+    IMPORT_HOST_DELAY_SECONDS: float = 1.0  # Minimum spacing between fetches to one host
+    IMPORT_MAX_RETRIES: int = 2  # Extract/create retries; fetch retries in the scraper
 
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 60
 
+    # Engagement write-behind buffer
+    ENGAGEMENT_BUFFER_ENABLED: bool = True
+    ENGAGEMENT_BUFFER_BACKEND: str = "memory"  # memory | redis
+    ENGAGEMENT_FLUSH_INTERVAL_SECONDS: float = 5.0
+    ENGAGEMENT_FLUSH_BATCH_SIZE: int = 500
+    ENGAGEMENT_BUFFER_MAX_EVENTS: int = 50000
+
+    # Search telemetry (write-behind SearchLog capture)
+    SEARCH_LOG_ENABLED: bool = True
+    SEARCH_LOG_FLUSH_INTERVAL_SECONDS: float = 2.0
+    SEARCH_LOG_FLUSH_BATCH_SIZE: int = 500
+    SEARCH_LOG_MAX_EVENTS: int = 10000  # Queue bound; overflow is dropped and counted
+
+    # Trending detection (sliding hourly windows)
+    # redis shares counts across workers; memory is for single-process deployments only,
+    # since each process would otherwise publish a trending set from its own counts
+    TRENDING_BACKEND: str = "redis"  # redis | memory
+    TRENDING_RECENT_HOURS: int = 24
+    TRENDING_TOP_K: int = 20
+    TRENDING_MIN_VELOCITY: float = 1.5  # Recent vs baseline hourly rate
+    TRENDING_REFRESH_SECONDS: float = 300.0
+
+    # Daily stats rollup
+    STATS_ROLLUP_ENABLED: bool = True
+    STATS_ROLLUP_INTERVAL_SECONDS: float = 300.0
+    STATS_ROLLUP_LAG_SECONDS: int = 120  # Leave room for buffered engagement writes
+    STATS_ROLLUP_MAX_WINDOW_HOURS: int = 24  # Catch-up chunk size
+    ADMIN_STATS_MAX_AGE_SECONDS: float = 60.0  # Staleness bound for /admin/stats
+
     # Ranking Weights (configurable)
     RANKING_WEIGHT_SPONSORED: float = 100.0
     RANKING_WEIGHT_FEATURED: float = 50.0
@@ -74,6 +173,8 @@ class Settings(BaseSettings):
     RANKING_WEIGHT_REVIEWS: float = 20.0
     RANKING_WEIGHT_FRESHNESS: float = 10.0
     RANKING_WEIGHT_INTERNAL: float = 80.0
+    RANKING_BATCH_SIZE: int = 5000  # Tools scored per chunk in bulk recomputes
+    RANKING_FRESHNESS_BUCKET_SECONDS: int = 3600  # Effective scores are rewritten once per bucket
 
     # Monitoring
     SENTRY_DSN: Optional[str] = None
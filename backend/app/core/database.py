@@ -2,11 +2,18 @@
 Database configuration and session management.
 Uses SQLAlchemy async for non-blocking database operations.
 Compatible with Supabase PostgreSQL (uses PgBouncer).
+
+Two engine profiles are available via DATABASE_ENGINE_PROFILE:
+- serverless: NullPool, a fresh connection per session (Vercel)
+- pooled: AsyncAdaptedQueuePool for long-running uvicorn workers
 """
+import time
+from uuid import uuid4
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
-from typing import AsyncGenerator
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Dict, Any
 
 from app.core.config import settings
 
@@ -22,12 +29,74 @@ def get_async_db_url(url: str) -> str:
         return url.replace("postgres://", "postgresql+asyncpg://", 1)
     return url
 
-# Create async engine with serverless-friendly settings
+
+class PoolMetrics:
+    """Counters for connection checkout wait time."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        if timed_out:
+            self.timeouts += 1
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out)
+
+
+def _engine_options() -> Dict[str, Any]:
+    """Build create_async_engine kwargs for the configured profile."""
+    options: Dict[str, Any] = {"pool_pre_ping": True}
+
+    if settings.DATABASE_PGBOUNCER:
+        # PgBouncer in transaction mode cannot track server-side prepared
+        # statements across pooled backends
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    if settings.DATABASE_ENGINE_PROFILE == "pooled":
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+    else:
+        options["poolclass"] = NullPool  # No pooling - better for serverless
+
+    return options
+
+
+# Create async engine for the configured profile
 engine = create_async_engine(
     url=get_async_db_url(str(settings.DATABASE_URL)),
     echo=settings.DEBUG,
-    poolclass=NullPool,  # No pooling - better for serverless
-    pool_pre_ping=True,
+    **_engine_options()
 )
 
 
@@ -57,6 +126,36 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def get_pool_stats() -> Dict[str, Any]:
+    """Current connection pool statistics."""
+    pool = engine.sync_engine.pool
+    stats: Dict[str, Any] = {
+        "profile": settings.DATABASE_ENGINE_PROFILE,
+        "pool_class": type(pool).__name__,
+        "pool_size": 0,
+        "checked_in": 0,
+        "checked_out": 0,
+        "overflow": 0,
+        "max_overflow": 0,
+        "total_checkouts": pool_metrics.checkouts,
+        "checkout_timeouts": pool_metrics.timeouts,
+        "avg_wait_ms": round(pool_metrics.total_wait / pool_metrics.checkouts * 1000, 3)
+        if pool_metrics.checkouts else 0.0,
+        "max_wait_ms": round(pool_metrics.max_wait * 1000, 3),
+    }
+
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            pool_size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        )
+
+    return stats
+
+
 async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
@@ -0,0 +1,162 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Listings are ordered by a tuple of sort keys, all descending and ending in a
+unique column (the primary key). A cursor is an opaque token holding the sort
+key values of the last row served; the next page is fetched with a row-value
+comparison, so deep pages cost the same as the first one.
+"""
+import base64
+import enum
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select, func, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass
+class Page:
+    """One page of a listing."""
+    items: List[Any]
+    total: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
+    cursors: List[str] = field(default_factory=list)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor token."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _check_value(value: Any, sort_key: Any) -> Any:
+    """Check a decoded cursor value against its sort key's Python type."""
+    try:
+        python_type = sort_key.type.python_type
+    except (AttributeError, NotImplementedError):
+        python_type = None
+
+    if value is None:
+        raise ValueError("null cursor value")
+    if python_type is None:
+        return value
+    if issubclass(python_type, enum.Enum):
+        return python_type(value)
+    if python_type is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if python_type is int and isinstance(value, bool):
+        raise ValueError("cursor value type mismatch")
+    if not isinstance(value, python_type):
+        raise ValueError("cursor value type mismatch")
+    return value
+
+
+def decode_cursor(token: str, sort_keys: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor token, rejecting anything that doesn't fit the listing:
+    one non-null value per sort key, of that key's type.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(sort_keys):
+            raise ValueError("cursor shape mismatch")
+        return [_check_value(_decode_value(v), key) for v, key in zip(values, sort_keys)]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    query: Select,
+    sort_keys: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0
+) -> Tuple[List[Any], List[str], bool]:
+    """
+    Fetch one page ordered by sort_keys (all descending).
+
+    Returns (items, per-item cursors, has_more). When a cursor is given the
+    offset is ignored.
+    """
+    labeled = [key.label(f"_sort_{i}") for i, key in enumerate(sort_keys)]
+    stmt = query.add_columns(*labeled).order_by(*[key.desc() for key in sort_keys])
+
+    if cursor:
+        values = decode_cursor(cursor, sort_keys)
+        stmt = stmt.where(tuple_(*sort_keys) < tuple(values))
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [row[0] for row in rows]
+    cursors = [encode_cursor(row[1:]) for row in rows]
+    return items, cursors, has_more
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """Planner row estimate for a query (no table scan)."""
+    compiled = query.compile(
+        dialect=postgresql.dialect(),
+        compile_kwargs={"literal_binds": True}
+    )
+    # Savepoint so a failed EXPLAIN doesn't abort the caller's transaction
+    async with db.begin_nested():
+        conn = await db.connection()
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+    db: AsyncSession,
+    query: Select,
+    mode: str = "exact"
+) -> Tuple[int, bool]:
+    """
+    Count rows matched by a query.
+    Returns (total, is_estimate); estimate mode falls back to an exact count
+    if the planner estimate is unavailable.
+    """
+    if mode == "estimate":
+        try:
+            return await estimate_count(db, query), True
+        except Exception:
+            pass
+
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    return (await db.execute(count_query)).scalar() or 0, False
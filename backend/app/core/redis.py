@@ -13,6 +13,7 @@ class RedisClient:
 
     def __init__(self):
         self._client: Optional[redis.Redis] = None
+        self._binary_client: Optional[redis.Redis] = None
 
     async def connect(self):
         """Connect to Redis."""
@@ -23,11 +24,21 @@ class RedisClient:
             encoding="utf-8",
             decode_responses=True
         )
+        # Separate connection without response decoding for packed binary values
+        self._binary_client = redis.from_url(settings.REDIS_URL)
 
     async def disconnect(self):
         """Disconnect from Redis."""
         if self._client:
             await self._client.close()
+            self._client = None
+        if self._binary_client:
+            await self._binary_client.close()
+            self._binary_client = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._client is not None
 
     @property
     def client(self) -> redis.Redis:
@@ -35,6 +46,12 @@ class RedisClient:
             raise RuntimeError("Redis client not connected")
         return self._client
 
+    @property
+    def binary_client(self) -> redis.Redis:
+        if not self._binary_client:
+            raise RuntimeError("Redis client not connected")
+        return self._binary_client
+
     async def get(self, key: str) -> Optional[str]:
         """Get a value from cache."""
         return await self.client.get(key)
@@ -62,6 +79,15 @@ class RedisClient:
             return json.loads(value)
         return None
 
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get a raw binary value."""
+        return await self.binary_client.get(key)
+
+    async def set_bytes(self, key: str, value: bytes, ttl: int = None):
+        """Set a raw binary value."""
+        ttl = ttl or settings.CACHE_TTL_SECONDS
+        await self.binary_client.set(key, value, ex=ttl)
+
     async def increment(self, key: str, ttl: int = None) -> int:
         """Increment a counter."""
         count = await self.client.incr(key)
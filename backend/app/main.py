@@ -20,6 +20,15 @@ from app.core.database import init_db, close_db, AsyncSessionLocal
 from app.core.redis import redis_client
 from app.api.v1.router import api_router
 from app.services.embeddings import embedding_service
+from app.services.engagement_buffer import engagement_buffer
+from app.services.search_log_buffer import search_log_buffer
+from app.services.suggest_index import suggest_index
+from app.services.trending import trending_engine
+from app.services.stats_rollup import stats_rollup
+from app.services.bulk_import import bulk_importer
+from app.services.vector_reindex import vector_reindexer
+from app.services.catalog_refresh import catalog_refresher
+from app.services.scraper import scraper
 
 # Configure logging
 logging.basicConfig(
@@ -64,7 +73,7 @@ async def lifespan(app: FastAPI):
             logger.info("Redis URL not configured - skipping Redis connection")
 
         # Connect to vector database (optional for serverless)
-        if settings.QDRANT_URL:
+        if settings.QDRANT_URL or embedding_service.backend == "local":
             try:
                 await asyncio.wait_for(embedding_service.connect(), timeout=5.0)
                 logger.info("Vector database connected")
@@ -73,7 +82,25 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.warning(f"Vector database connection failed: {e} - continuing without vector search")
         else:
-            logger.info("Qdrant URL not configured - skipping vector database connection")
+            logger.info("No vector backend configured - skipping vector database connection")
+
+        # Start write-behind engagement flushing
+        await engagement_buffer.start()
+        await search_log_buffer.start()
+
+        # Warm trending windows and start periodic trending refresh
+        await trending_engine.start()
+
+        # Incremental daily_stats rollup
+        await stats_rollup.start()
+
+        # Warm the search-as-you-type index (built lazily on first use otherwise)
+        try:
+            await asyncio.wait_for(suggest_index.rebuild(), timeout=5.0)
+        except asyncio.TimeoutError:
+            logger.warning("Suggest index build timed out - will build on first request")
+        except Exception as e:
+            logger.warning(f"Suggest index build failed: {e}")
 
         _initialized = True
 
@@ -81,6 +108,46 @@ async def lifespan(app: FastAPI):
 
     # Shutdown - cleanup (with error handling)
     logger.info("Shutting down...")
+    try:
+        await bulk_importer.stop()
+    except Exception as e:
+        logger.error(f"Error stopping bulk imports: {e}")
+
+    try:
+        await catalog_refresher.stop()
+    except Exception as e:
+        logger.error(f"Error stopping catalog refresh: {e}")
+
+    try:
+        await vector_reindexer.stop()
+    except Exception as e:
+        logger.error(f"Error stopping vector reindex: {e}")
+
+    try:
+        await trending_engine.stop()
+    except Exception as e:
+        logger.error(f"Error stopping trending refresh: {e}")
+
+    try:
+        await stats_rollup.stop()
+    except Exception as e:
+        logger.error(f"Error stopping stats rollup: {e}")
+
+    try:
+        await engagement_buffer.stop()
+    except Exception as e:
+        logger.error(f"Error flushing engagement buffer: {e}")
+
+    try:
+        await search_log_buffer.stop()
+    except Exception as e:
+        logger.error(f"Error flushing search log buffer: {e}")
+
+    try:
+        await scraper.close()
+    except Exception as e:
+        logger.error(f"Error closing scraper client: {e}")
+
     try:
         await close_db()
     except Exception as e:
@@ -91,6 +158,11 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error disconnecting Redis: {e}")
 
+    try:
+        await embedding_service.close()
+    except Exception as e:
+        logger.error(f"Error closing vector database client: {e}")
+
 
 # Create FastAPI application
 app = FastAPI(
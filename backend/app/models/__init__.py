@@ -13,7 +13,7 @@ from app.models.promotion import (
     AffiliateLink,
     PaymentStatus,
 )
-from app.models.analytics import SearchLog, PageView, DailyStats, RankingConfig
+from app.models.analytics import SearchLog, PageView, DailyStats, RankingConfig, RollupWatermark, JobCheckpoint
 
 __all__ = [
     # User
@@ -42,4 +42,6 @@ __all__ = [
     "PageView",
     "DailyStats",
     "RankingConfig",
+    "RollupWatermark",
+    "JobCheckpoint",
 ]
@@ -1,7 +1,7 @@
 """
 Analytics models for tracking and ML data collection.
 """
-from sqlalchemy import Column, String, Integer, Float, Text, JSON, DateTime, Index
+from sqlalchemy import Column, String, Integer, Float, Text, JSON, DateTime, Index, func, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 
@@ -40,6 +40,7 @@ class SearchLog(Base, UUIDMixin, TimestampMixin):
 
     __table_args__ = (
         Index("ix_search_logs_query_date", "query_normalized", "created_at"),
+        Index("ix_search_logs_created_at", "created_at"),
     )
 
 
@@ -105,6 +106,31 @@ class DailyStats(Base, UUIDMixin):
     )
 
 
+# Platform rows have no entity; coalesce so they still have a unique key
+DAILY_STATS_NIL_ENTITY = literal_column("'00000000-0000-0000-0000-000000000000'::uuid")
+DAILY_STATS_KEY = (
+    DailyStats.date,
+    DailyStats.stat_type,
+    func.coalesce(DailyStats.entity_id, DAILY_STATS_NIL_ENTITY),
+)
+Index("ux_daily_stats_key", *DAILY_STATS_KEY, unique=True)
+
+
+class RollupWatermark(Base):
+    """How far each event source has been rolled up into daily_stats."""
+
+    __tablename__ = "rollup_watermarks"
+
+    source = Column(String(50), primary_key=True)  # engagements, reviews, ...
+    watermark = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
+
+
 class RankingConfig(Base, UUIDMixin, TimestampMixin):
     """Dynamic ranking configuration."""
 
@@ -130,3 +156,20 @@ class RankingConfig(Base, UUIDMixin, TimestampMixin):
     trending_threshold = Column(Integer, default=100)
 
     is_active = Column(String(5), default="true")
+
+
+class JobCheckpoint(Base):
+    """Progress of a resumable maintenance job (e.g. the vector reindex)."""
+
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    status = Column(String(20), nullable=False)  # running | completed | failed | cancelled
+    position = Column(String(64))  # Last key fully processed
+    processed = Column(Integer, default=0, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
@@ -1,7 +1,7 @@
 """
 Engagement models for tracking user interactions.
 """
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import enum
@@ -43,6 +43,10 @@ class Engagement(Base, UUIDMixin, TimestampMixin):
     # Relationships
     tool = relationship("Tool", back_populates="engagements")
 
+    __table_args__ = (
+        Index("ix_engagements_created_at", "created_at"),
+    )
+
 
 class SavedTool(Base, UUIDMixin, TimestampMixin):
     """User's saved/bookmarked tools."""
@@ -60,6 +64,10 @@ class SavedTool(Base, UUIDMixin, TimestampMixin):
     user = relationship("User", back_populates="saved_tools")
     tool = relationship("Tool", back_populates="saved_by")
 
+    __table_args__ = (
+        Index("ix_saved_tools_created_at", "created_at"),
+    )
+
 
 class Review(Base, UUIDMixin, TimestampMixin):
     """User reviews for tools."""
@@ -91,3 +99,7 @@ class Review(Base, UUIDMixin, TimestampMixin):
     # Relationships
     tool = relationship("Tool", back_populates="reviews")
     user = relationship("User", back_populates="reviews")
+
+    __table_args__ = (
+        Index("ix_reviews_created_at", "created_at"),
+    )
@@ -3,10 +3,10 @@ Tool model - the core entity of the marketplace.
 """
 from sqlalchemy import (
     Column, String, Text, Boolean, Integer, Float,
-    ForeignKey, Enum as SQLEnum, JSON, Index
+    ForeignKey, Enum as SQLEnum, JSON, Index, DDL, event
 )
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
 import enum
 
 from app.core.database import Base
@@ -79,6 +79,7 @@ class Tool(Base, UUIDMixin, TimestampMixin):
     is_featured = Column(Boolean, default=False, index=True)
     is_sponsored = Column(Boolean, default=False, index=True)
     is_trending = Column(Boolean, default=False, index=True)
+    trending_auto = Column(Boolean, nullable=False, default=False, server_default="false")  # Set by the trending engine
     is_editors_pick = Column(Boolean, default=False)
     is_internal = Column(Boolean, default=False, index=True)  # Platform-owned tools
     is_verified = Column(Boolean, default=False)
@@ -92,6 +93,8 @@ class Tool(Base, UUIDMixin, TimestampMixin):
 
     # Ranking
     rank_score = Column(Float, default=0.0, index=True)
+    # rank_score plus the freshness term at the current bucket; listings order by it
+    effective_score = Column(Float, nullable=False, default=0.0, server_default="0")
     sponsored_rank = Column(Integer)  # Manual sponsored position
     featured_rank = Column(Integer)   # Manual featured position
 
@@ -104,6 +107,9 @@ class Tool(Base, UUIDMixin, TimestampMixin):
     extracted_data = Column(JSON)  # Raw LLM extraction output
     last_scraped_at = Column(String(50))
     scrape_version = Column(Integer, default=1)
+    scrape_etag = Column(String(512))           # Validators for conditional re-fetch
+    scrape_last_modified = Column(String(100))
+    content_hash = Column(String(64))           # sha256 of the normalized cleaned page
 
     # Owner
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True)
@@ -111,6 +117,9 @@ class Tool(Base, UUIDMixin, TimestampMixin):
     # Vector embedding ID (stored in Qdrant)
     embedding_id = Column(String(64))
 
+    # Weighted full-text document, maintained by the tools_search_vector trigger
+    search_vector = deferred(Column(TSVECTOR))
+
     # Relationships
     owner = relationship("User", back_populates="tools", foreign_keys=[owner_id])
     category = relationship("Category", back_populates="tools")
@@ -121,9 +130,47 @@ class Tool(Base, UUIDMixin, TimestampMixin):
 
     # Indexes for ranking queries
     __table_args__ = (
-        Index("ix_tools_ranking", "status", "rank_score", "is_featured", "is_sponsored"),
-        Index("ix_tools_category_rank", "category_id", "status", "rank_score"),
+        Index("ix_tools_ranking", "status", "effective_score", "id"),
+        Index("ix_tools_category_rank", "category_id", "status", "effective_score", "id"),
+        Index("ix_tools_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexes for typo-tolerant and prefix matching (pg_trgm)
+        Index(
+            "ix_tools_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_tools_slug_trgm", "slug",
+            postgresql_using="gin", postgresql_ops={"slug": "gin_trgm_ops"}
+        ),
     )
 
     def __repr__(self):
         return f"<Tool {self.name}>"
+
+
+# Full-text search document weights: name (A) > tagline (B) > tags (C) > descriptions (D)
+TOOL_SEARCH_VECTOR_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION tools_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.tagline, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(array_to_string(NEW.tags, ' '), '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.short_description, '')), 'D') ||
+        setweight(to_tsvector('english', coalesce(NEW.long_description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""")
+
+TOOL_SEARCH_VECTOR_TRIGGER = DDL("""
+CREATE TRIGGER tools_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, tagline, tags, short_description, long_description
+ON tools
+FOR EACH ROW EXECUTE FUNCTION tools_search_vector_update()
+""")
+
+# Installed when init_db() creates the table; existing databases get it via Alembic
+event.listen(Tool.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+event.listen(Tool.__table__, "after_create", TOOL_SEARCH_VECTOR_FUNCTION)
+event.listen(Tool.__table__, "after_create", TOOL_SEARCH_VECTOR_TRIGGER)
@@ -20,8 +20,15 @@ from app.schemas.tool import (
     ToolResponse,
     ToolListResponse,
     ToolURLSubmit,
+    ToolBulkImport,
+    ToolImportStatus,
+    CatalogRefreshStatus,
     ToolExtractionResult,
+    ToolExtractionPreview,
     ToolSearchQuery,
+    ToolSearchResponse,
+    ToolSearchClick,
+    ToolSuggestion,
     ToolRankingUpdate,
     ToolModerationAction,
 )
@@ -57,6 +64,11 @@ from app.schemas.analytics import (
     PlatformStats,
     ToolStats,
     CategoryStats,
+    DatabasePoolStats,
+    ScraperPoolStats,
+    EmbeddingCacheStats,
+    LLMCacheStats,
+    VectorReindexStatus,
     RankingConfigUpdate,
     RankingConfigResponse,
     DateRangeQuery,
@@ -80,8 +92,15 @@ __all__ = [
     "ToolResponse",
     "ToolListResponse",
     "ToolURLSubmit",
+    "ToolBulkImport",
+    "ToolImportStatus",
+    "CatalogRefreshStatus",
     "ToolExtractionResult",
+    "ToolExtractionPreview",
     "ToolSearchQuery",
+    "ToolSearchResponse",
+    "ToolSearchClick",
+    "ToolSuggestion",
     "ToolRankingUpdate",
     "ToolModerationAction",
     # Category
@@ -113,6 +132,11 @@ __all__ = [
     "PlatformStats",
     "ToolStats",
     "CategoryStats",
+    "DatabasePoolStats",
+    "ScraperPoolStats",
+    "EmbeddingCacheStats",
+    "LLMCacheStats",
+    "VectorReindexStatus",
     "RankingConfigUpdate",
     "RankingConfigResponse",
     "DateRangeQuery",
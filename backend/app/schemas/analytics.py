@@ -62,6 +62,7 @@ class PlatformStats(BaseModel):
     total_searches_today: int
     revenue_today: float
     revenue_month: float
+    as_of: Optional[datetime] = None  # When the stats snapshot was computed
 
 
 class ToolStats(BaseModel):
@@ -92,6 +93,80 @@ class CategoryStats(BaseModel):
     avg_rating: float
 
 
+class DatabasePoolStats(BaseModel):
+    """Database connection pool statistics."""
+    profile: str
+    pool_class: str
+    pool_size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    total_checkouts: int
+    checkout_timeouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class ScraperPoolStats(BaseModel):
+    """Shared scraper HTTP client pool statistics."""
+    open: bool
+    http2_enabled: bool
+    max_connections: Optional[int] = None
+    max_keepalive_connections: Optional[int] = None
+    max_connections_per_host: int
+    connections: int
+    idle_connections: int
+    active_connections: int
+    http2_connections: int
+    hosts_at_cap: int
+    requests: int
+    failures: int
+    not_modified: int
+    connections_opened: int
+    dns_cache_entries: int
+    dns_hit_rate: float
+    parse_executor: str
+    html_truncated: int
+
+
+class EmbeddingCacheStats(BaseModel):
+    """Query embedding cache statistics."""
+    enabled: bool
+    local_entries: int
+    max_local_entries: int
+    local_hits: int
+    redis_hits: int
+    misses: int
+    hit_rate: float
+
+
+class LLMCacheStats(BaseModel):
+    """LLM response cache statistics."""
+    enabled: bool
+    local_entries: int
+    max_local_entries: int
+    local_hits: int
+    redis_hits: int
+    misses: int
+    hit_rate: float
+    tokens_saved: int
+
+
+class VectorReindexStatus(BaseModel):
+    """Progress of the full vector index rebuild."""
+    status: str
+    running: bool
+    position: Optional[str] = None
+    processed: int
+    indexed: int
+    failed: int
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float
+    tools_per_second: float
+
+
 class TrafficSource(BaseModel):
     """Traffic source breakdown."""
     source: str
@@ -40,6 +40,8 @@ class PaginatedResponse(BaseModel, Generic[T]):
     pages: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None  # Opaque keyset cursor for the next page
+    total_is_estimate: bool = False
 
 
 class TimestampMixin(BaseModel):
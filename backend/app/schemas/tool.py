@@ -7,6 +7,7 @@ from datetime import datetime
 from uuid import UUID
 
 from app.models.tool import ToolStatus, PricingModel
+from app.schemas.common import PaginatedResponse
 
 
 class ToolBase(BaseModel):
@@ -128,6 +129,7 @@ class ToolListResponse(BaseModel):
 class ToolURLSubmit(BaseModel):
     """Schema for URL-based tool submission."""
     url: str
+    extraction_token: Optional[str] = Field(None, max_length=64)  # From /tools/extract
 
     @field_validator("url")
     @classmethod
@@ -137,6 +139,63 @@ class ToolURLSubmit(BaseModel):
         return v
 
 
+class ToolBulkImport(BaseModel):
+    """Schema for starting a bulk URL import."""
+    urls: List[str] = Field(..., min_length=1, max_length=10000)
+
+    @field_validator("urls")
+    @classmethod
+    def validate_urls(cls, v):
+        for url in v:
+            if not url.strip().startswith(("http://", "https://")):
+                raise ValueError(f"URL must start with http:// or https://: {url[:100]}")
+        return v
+
+
+class ToolImportFailure(BaseModel):
+    """A URL a bulk import gave up on."""
+    url: str
+    stage: str
+    error: str
+
+
+class ToolImportStatus(BaseModel):
+    """Progress of a bulk URL import."""
+    id: UUID
+    status: str
+    total: int
+    processed: int
+    created: int
+    failed: int
+    skipped: int
+    stages: Dict[str, int]
+    retries: Dict[str, int]
+    elapsed_seconds: float
+    urls_per_minute: float
+    created_tool_ids: List[str] = []
+    failures: List[ToolImportFailure] = []
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class CatalogRefreshStatus(BaseModel):
+    """Progress of a background catalog re-scrape."""
+    id: UUID
+    status: str
+    force: bool
+    total: int
+    processed: int
+    not_modified: int
+    unchanged: int
+    updated: int
+    failed: int
+    elapsed_seconds: float
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class ToolExtractionResult(BaseModel):
     """Schema for LLM extraction result."""
     name: str
@@ -154,6 +213,12 @@ class ToolExtractionResult(BaseModel):
     raw_data: Dict[str, Any]
 
 
+class ToolExtractionPreview(ToolExtractionResult):
+    """Extraction result plus a token that lets /tools/submit reuse it."""
+    extraction_token: str
+    expires_in: int
+
+
 class ToolSearchQuery(BaseModel):
     """Schema for tool search."""
     query: str = Field(..., min_length=1, max_length=500)
@@ -164,6 +229,29 @@ class ToolSearchQuery(BaseModel):
     search_type: str = Field(default="hybrid", pattern="^(keyword|semantic|hybrid)$")
 
 
+class ToolSearchResponse(PaginatedResponse[ToolListResponse]):
+    """Search results with the ID to report result clicks against."""
+    search_id: Optional[UUID] = None
+
+
+class ToolSearchClick(BaseModel):
+    """A click on a search result."""
+    tool_id: UUID
+    position: int = Field(..., ge=1)  # 1-based position in the results
+
+
+class ToolSuggestion(BaseModel):
+    """Search-as-you-type suggestion."""
+    type: str  # tool | tag | category
+    label: str
+    slug: Optional[str] = None
+    id: Optional[UUID] = None
+    score: float
+
+    class Config:
+        from_attributes = True
+
+
 class ToolRankingUpdate(BaseModel):
     """Schema for admin ranking update."""
     is_featured: Optional[bool] = None
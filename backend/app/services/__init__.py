@@ -3,19 +3,58 @@ Service layer for business logic.
 """
 from app.services.scraper import scraper, WebScraper
 from app.services.llm_extractor import llm_extractor, LLMExtractor
+from app.services.llm_cache import llm_cache, LLMResponseCache
 from app.services.embeddings import embedding_service, EmbeddingService
+from app.services.embedding_cache import embedding_cache, EmbeddingCache
+from app.services.listing_cache import listing_cache, ListingCache
 from app.services.ranking import ranking_service, RankingService
 from app.services.tool_service import tool_service, ToolService
+from app.services.engagement_buffer import engagement_buffer, EngagementBuffer
+from app.services.search_log_buffer import search_log_buffer, SearchLogBuffer
+from app.services.suggest_index import suggest_index, SuggestIndex
+from app.services.trending import trending_engine, TrendingEngine
+from app.services.stats_rollup import stats_rollup, StatsRollup
+from app.services.platform_stats import platform_stats, PlatformStatsService
+from app.services.bulk_import import bulk_importer, BulkImporter
+from app.services.extraction_store import extraction_store, ExtractionStore
+from app.services.vector_reindex import vector_reindexer, VectorReindexer
+from app.services.catalog_refresh import catalog_refresher, CatalogRefresher
 
 __all__ = [
     "scraper",
     "WebScraper",
     "llm_extractor",
     "LLMExtractor",
+    "llm_cache",
+    "LLMResponseCache",
     "embedding_service",
     "EmbeddingService",
+    "embedding_cache",
+    "EmbeddingCache",
+    "listing_cache",
+    "ListingCache",
     "ranking_service",
     "RankingService",
     "tool_service",
     "ToolService",
+    "engagement_buffer",
+    "EngagementBuffer",
+    "search_log_buffer",
+    "SearchLogBuffer",
+    "suggest_index",
+    "SuggestIndex",
+    "trending_engine",
+    "TrendingEngine",
+    "stats_rollup",
+    "StatsRollup",
+    "platform_stats",
+    "PlatformStatsService",
+    "bulk_importer",
+    "BulkImporter",
+    "extraction_store",
+    "ExtractionStore",
+    "vector_reindexer",
+    "VectorReindexer",
+    "catalog_refresher",
+    "CatalogRefresher",
 ]
@@ -0,0 +1,341 @@
+"""
+Bulk URL import pipeline.
+Runs fetch -> clean -> extract -> create as separate stages connected by
+bounded queues, each with its own worker pool, so slow LLM calls never
+stall fetching and a large import never holds more than a few pages in
+memory. Fetches are throttled per host.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+from urllib.parse import urlparse
+from uuid import UUID, uuid4
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.models.tool import Tool
+from app.services.scraper import scraper
+from app.services.llm_extractor import llm_extractor
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("fetch", "clean", "extract", "create")
+MAX_RECORDED_FAILURES = 200
+
+
+@dataclass
+class ImportJob:
+    """State and counters of one bulk import."""
+    urls: List[str]
+    owner_id: UUID
+    id: UUID = field(default_factory=uuid4)
+    status: str = "queued"  # queued | running | completed | cancelled | failed
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    completed: Dict[str, int] = field(default_factory=lambda: {stage: 0 for stage in STAGES})
+    retries: Dict[str, int] = field(default_factory=lambda: {stage: 0 for stage in STAGES})
+    failed: int = 0
+    skipped: int = 0
+    created_tool_ids: List[str] = field(default_factory=list)
+    failures: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def processed(self) -> int:
+        return self.completed["create"] + self.failed + self.skipped
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or datetime.now(timezone.utc)
+        elapsed = (end - self.started_at).total_seconds() if self.started_at else 0.0
+        return {
+            "id": str(self.id),
+            "status": self.status,
+            "total": len(self.urls),
+            "processed": self.processed,
+            "created": self.completed["create"],
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "stages": self.completed,
+            "retries": self.retries,
+            "elapsed_seconds": round(elapsed, 1),
+            "urls_per_minute": round(self.processed / elapsed * 60, 1) if elapsed > 0 else 0.0,
+            "created_tool_ids": self.created_tool_ids,
+            "failures": self.failures,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class StageError(Exception):
+    """A pipeline stage gave up on an item."""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+
+
+class HostGate:
+    """Per-host politeness: one request at a time and a minimum spacing."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last: Dict[str, float] = {}
+
+    async def wait(self, host: str) -> asyncio.Lock:
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        await lock.acquire()
+        delay = self._last.get(host, 0.0) + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return lock
+
+    def release(self, host: str, lock: asyncio.Lock):
+        self._last[host] = time.monotonic()
+        lock.release()
+
+
+class BulkImporter:
+    """
+    Runs import jobs through the staged pipeline.
+
+    Stage concurrency, per-host spacing and retries come from the
+    IMPORT_* settings. Job status is kept in process and mirrored to Redis
+    (when connected) so any worker can report it.
+    """
+
+    def __init__(self):
+        self.concurrency = {
+            "fetch": settings.IMPORT_FETCH_CONCURRENCY,
+            "clean": settings.IMPORT_CLEAN_CONCURRENCY,
+            "extract": settings.IMPORT_EXTRACT_CONCURRENCY,
+            "create": settings.IMPORT_CREATE_CONCURRENCY,
+        }
+        self.max_retries = settings.IMPORT_MAX_RETRIES
+        self.queue_size = settings.IMPORT_QUEUE_SIZE
+        self.host_gate = HostGate(settings.IMPORT_HOST_DELAY_SECONDS)
+        self._jobs: Dict[UUID, ImportJob] = {}
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def submit(self, urls: List[str], owner_id: UUID) -> ImportJob:
+        """Queue a job and start it in the background."""
+        # Preserve order, drop blanks and duplicates within the list
+        unique_urls = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
+        job = ImportJob(urls=unique_urls, owner_id=owner_id)
+        self._jobs[job.id] = job
+        self._tasks[job.id] = asyncio.create_task(self._run_job(job))
+        return job
+
+    def cancel(self, job_id: UUID) -> bool:
+        task = self._tasks.get(job_id)
+        if not task or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def stop(self):
+        """Cancel running jobs (on shutdown); they are recorded as cancelled."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_status(self, job_id: UUID) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job:
+            return job.to_dict()
+        if redis_client.is_connected:
+            try:
+                return await redis_client.get_json(f"import:{job_id}")
+            except Exception as e:
+                logger.warning(f"Could not read import status: {e}")
+        return None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in sorted(
+            self._jobs.values(), key=lambda j: j.created_at, reverse=True
+        )]
+
+    async def _publish(self, job: ImportJob):
+        if redis_client.is_connected:
+            try:
+                await redis_client.set(f"import:{job.id}", job.to_dict(), ttl=7 * 24 * 3600)
+            except Exception as e:
+                logger.debug(f"Could not publish import status: {e}")
+
+    def _fail(self, job: ImportJob, url: str, stage: str, error: str):
+        job.failed += 1
+        if len(job.failures) < MAX_RECORDED_FAILURES:
+            job.failures.append({"url": url, "stage": stage, "error": error[:500]})
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    async def _with_retry(self, job: ImportJob, stage: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn, retrying with backoff when it fails or returns None."""
+        last_error = "no result"
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                job.retries[stage] += 1
+                await asyncio.sleep(2 ** (attempt - 1))
+            try:
+                result = await fn()
+                if result is not None:
+                    return result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                last_error = str(e) or type(e).__name__
+        raise StageError(stage, last_error)
+
+    async def _fetch(self, job: ImportJob, url: str) -> Dict[str, Any]:
+        host = urlparse(url).netloc.lower()
+        lock = await self.host_gate.wait(host)
+        try:
+            # WebScraper.fetch_page already retries transport errors internally
+            page = await scraper.fetch_page(url)
+        finally:
+            self.host_gate.release(host, lock)
+        if page is None:
+            raise StageError("fetch", "could not fetch page")
+        return {"url": url, "page": page}
+
+    async def _clean(self, job: ImportJob, item: Dict[str, Any]) -> Dict[str, Any]:
+        page = item["page"]
+        content = await scraper.clean_html_async(page.html)
+        page.html = None  # Only the validators are needed from here on
+        item["content"] = content
+        item["content_hash"] = scraper.content_hash(content)
+        return item
+
+    async def _extract(self, job: ImportJob, item: Dict[str, Any]) -> Dict[str, Any]:
+        item["extraction"] = await self._with_retry(
+            job, "extract",
+            lambda: llm_extractor.extract_tool_data(item["url"], item["content"])
+        )
+        del item["content"]
+        return item
+
+    async def _create(self, job: ImportJob, item: Dict[str, Any]) -> Dict[str, Any]:
+        from app.services.tool_service import tool_service
+
+        async def attempt():
+            async with AsyncSessionLocal() as session:
+                return await tool_service.create_from_extraction(
+                    db=session,
+                    extraction=item["extraction"],
+                    website_url=item["url"],
+                    owner_id=job.owner_id,
+                    page=item["page"],
+                    content_hash=item["content_hash"]
+                )
+
+        tool = await self._with_retry(job, "create", attempt)
+        job.created_tool_ids.append(str(tool.id))
+        return item
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+
+    async def _existing_urls(self, urls: List[str]) -> set:
+        existing = set()
+        async with AsyncSessionLocal() as session:
+            for i in range(0, len(urls), 1000):
+                result = await session.execute(
+                    select(Tool.website_url).where(Tool.website_url.in_(urls[i:i + 1000]))
+                )
+                existing.update(result.scalars().all())
+        return existing
+
+    async def _run_job(self, job: ImportJob):
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        await self._publish(job)
+
+        handlers = {
+            "fetch": self._fetch,
+            "clean": self._clean,
+            "extract": self._extract,
+            "create": self._create,
+        }
+        # queues[i] feeds stage i; the last stage has no output queue
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in STAGES]
+        workers: List[asyncio.Task] = []
+
+        async def worker(index: int, stage: str):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(STAGES) else None
+            while True:
+                item = await inbox.get()
+                try:
+                    url = item if stage == "fetch" else item["url"]
+                    result = await handlers[stage](job, item)
+                    job.completed[stage] += 1
+                    if outbox is not None:
+                        await outbox.put(result)
+                except asyncio.CancelledError:
+                    raise
+                except StageError as e:
+                    self._fail(job, url, e.stage, str(e))
+                except Exception as e:
+                    self._fail(job, url, stage, str(e) or type(e).__name__)
+                finally:
+                    inbox.task_done()
+
+        try:
+            existing = await self._existing_urls(job.urls)
+            for index, stage in enumerate(STAGES):
+                for _ in range(self.concurrency[stage]):
+                    workers.append(asyncio.create_task(worker(index, stage)))
+
+            async def progress():
+                while True:
+                    await asyncio.sleep(2)
+                    await self._publish(job)
+
+            reporter = asyncio.create_task(progress())
+            try:
+                for url in job.urls:
+                    if url in existing:
+                        job.skipped += 1
+                        continue
+                    await queues[0].put(url)
+                # Drain stage by stage so each queue is final before the next
+                for queue in queues:
+                    await queue.join()
+            finally:
+                reporter.cancel()
+
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Import job {job.id} failed: {e}", exc_info=True)
+            job.status = "failed"
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            job.finished_at = datetime.now(timezone.utc)
+            self._tasks.pop(job.id, None)
+            await self._publish(job)
+            logger.info(
+                f"Import job {job.id} {job.status}: {job.completed['create']} created, "
+                f"{job.failed} failed, {job.skipped} skipped"
+            )
+
+
+# Singleton instance
+bulk_importer = BulkImporter()
@@ -0,0 +1,176 @@
+"""
+Background re-scraping of the tool catalog.
+Picks the least recently scraped tools and refreshes each one with
+conditional requests (see ToolService.refresh_from_source), a few at a
+time. Runs as a job so large refreshes never hold an HTTP request open.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+from uuid import UUID, uuid4
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.models.tool import Tool
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = ("not_modified", "unchanged", "updated", "failed")
+
+
+@dataclass
+class RefreshJob:
+    """State and counters of one catalog refresh."""
+    limit: int
+    force: bool = False
+    id: UUID = field(default_factory=uuid4)
+    status: str = "queued"  # queued | running | completed | cancelled | failed
+    total: int = 0
+    outcomes: Dict[str, int] = field(default_factory=lambda: {outcome: 0 for outcome in OUTCOMES})
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def processed(self) -> int:
+        return sum(self.outcomes.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or datetime.now(timezone.utc)
+        elapsed = (end - self.started_at).total_seconds() if self.started_at else 0.0
+        return {
+            "id": str(self.id),
+            "status": self.status,
+            "force": self.force,
+            "total": self.total,
+            "processed": self.processed,
+            **self.outcomes,
+            "elapsed_seconds": round(elapsed, 1),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class CatalogRefresher:
+    """
+    Runs catalog refresh jobs in the background.
+
+    Job status is kept in process and mirrored to Redis (when connected)
+    so any worker can report it, like bulk imports.
+    """
+
+    def __init__(self):
+        self.concurrency = settings.IMPORT_FETCH_CONCURRENCY
+        self._jobs: Dict[UUID, RefreshJob] = {}
+        self._tasks: Dict[UUID, asyncio.Task] = {}
+
+    def submit(self, limit: int, force: bool = False) -> RefreshJob:
+        """Queue a refresh and start it in the background."""
+        job = RefreshJob(limit=limit, force=force)
+        self._jobs[job.id] = job
+        self._tasks[job.id] = asyncio.create_task(self._run_job(job))
+        return job
+
+    def cancel(self, job_id: UUID) -> bool:
+        task = self._tasks.get(job_id)
+        if not task or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def stop(self):
+        """Cancel running jobs (on shutdown); they are recorded as cancelled."""
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_status(self, job_id: UUID) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job:
+            return job.to_dict()
+        if redis_client.is_connected:
+            try:
+                return await redis_client.get_json(f"refresh:{job_id}")
+            except Exception as e:
+                logger.warning(f"Could not read refresh status: {e}")
+        return None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in sorted(
+            self._jobs.values(), key=lambda j: j.created_at, reverse=True
+        )]
+
+    async def _publish(self, job: RefreshJob):
+        if redis_client.is_connected:
+            try:
+                await redis_client.set(f"refresh:{job.id}", job.to_dict(), ttl=7 * 24 * 3600)
+            except Exception as e:
+                logger.debug(f"Could not publish refresh status: {e}")
+
+    async def _stale_tool_ids(self, limit: int) -> List[UUID]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Tool.id)
+                .where(Tool.website_url.isnot(None))
+                .order_by(Tool.last_scraped_at.asc().nullsfirst(), Tool.id)
+                .limit(limit)
+            )
+            return list(result.scalars().all())
+
+    async def _refresh(self, job: RefreshJob, tool_id: UUID, semaphore: asyncio.Semaphore):
+        # Imported here: tool_service imports the scraper and embedding services
+        from app.services.tool_service import tool_service
+
+        async with semaphore:
+            try:
+                # Each tool uses its own session so one failure does not roll back the others
+                async with AsyncSessionLocal() as session:
+                    tool = await session.get(Tool, tool_id)
+                    outcome = await tool_service.refresh_from_source(session, tool, force=job.force) if tool else "failed"
+            except Exception as e:
+                logger.error(f"Refreshing tool {tool_id} failed: {e}")
+                outcome = "failed"
+            job.outcomes[outcome] += 1
+
+    async def _run_job(self, job: RefreshJob):
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        await self._publish(job)
+
+        async def progress():
+            while True:
+                await asyncio.sleep(2)
+                await self._publish(job)
+
+        reporter = asyncio.create_task(progress())
+        try:
+            tool_ids = await self._stale_tool_ids(job.limit)
+            job.total = len(tool_ids)
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._refresh(job, tool_id, semaphore) for tool_id in tool_ids))
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Catalog refresh {job.id} failed: {e}", exc_info=True)
+            job.status = "failed"
+        finally:
+            reporter.cancel()
+            job.finished_at = datetime.now(timezone.utc)
+            self._tasks.pop(job.id, None)
+            await self._publish(job)
+            logger.info(
+                f"Catalog refresh {job.id} {job.status}: {job.outcomes['updated']} updated, "
+                f"{job.outcomes['unchanged']} unchanged, {job.outcomes['not_modified']} not modified, "
+                f"{job.outcomes['failed']} failed"
+            )
+
+
+# Singleton instance
+catalog_refresher = CatalogRefresher()
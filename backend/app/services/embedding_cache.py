@@ -0,0 +1,118 @@
+"""
+Two-tier cache for query embeddings.
+An in-process LRU sits in front of Redis; vectors are stored in Redis as
+packed float32 bytes rather than JSON.
+"""
+import hashlib
+import logging
+import re
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """LRU + Redis cache keyed by normalized text, model and dimensions."""
+
+    def __init__(self):
+        self.enabled = settings.EMBEDDING_CACHE_ENABLED
+        self.max_entries = settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self.ttl = settings.EMBEDDING_CACHE_TTL_SECONDS
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+
+        # Counters
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize a query so trivial variations share a cache entry."""
+        return re.sub(r"\s+", " ", text.strip().lower())
+
+    def make_key(self, text: str, model: str, dimensions: int) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"emb:{model}:{dimensions}:{digest}"
+
+    @staticmethod
+    def encode(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def decode(raw: bytes) -> List[float]:
+        values = array("f")
+        values.frombytes(raw)
+        return values.tolist()
+
+    async def get(self, text: str, model: str, dimensions: int) -> Optional[List[float]]:
+        """Look up an embedding in the local tier, then Redis."""
+        if not self.enabled:
+            return None
+
+        key = self.make_key(text, model, dimensions)
+
+        vector = self._local.get(key)
+        if vector is not None:
+            self._local.move_to_end(key)
+            self.local_hits += 1
+            return vector
+
+        if redis_client.is_connected:
+            try:
+                raw = await redis_client.get_bytes(key)
+                if raw:
+                    vector = self.decode(raw)
+                    self._store_local(key, vector)
+                    self.redis_hits += 1
+                    return vector
+            except Exception as e:
+                logger.warning(f"Embedding cache Redis lookup failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, model: str, dimensions: int, vector: List[float]):
+        """Store an embedding in both tiers."""
+        if not self.enabled:
+            return
+
+        key = self.make_key(text, model, dimensions)
+        self._store_local(key, vector)
+
+        if redis_client.is_connected:
+            try:
+                await redis_client.set_bytes(key, self.encode(vector), ttl=self.ttl)
+            except Exception as e:
+                logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    def _store_local(self, key: str, vector: List[float]):
+        self._local[key] = vector
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def clear(self):
+        """Drop the local tier (Redis entries expire on their own)."""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "local_entries": len(self._local),
+            "max_local_entries": self.max_entries,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Singleton instance
+embedding_cache = EmbeddingCache()
@@ -1,68 +1,199 @@
 """
-Embedding service for semantic search using OpenAI and Qdrant.
-Supports both local Qdrant and Qdrant Cloud.
+Embedding service for semantic search using OpenAI and a vector backend.
+Supports local Qdrant, Qdrant Cloud, and an in-process NumPy index
+(VECTOR_BACKEND=local, or auto with no QDRANT_URL).
+Qdrant calls never block the event loop: the async client is used by default,
+with the sync client run in a bounded thread pool as a fallback.
+Each point's payload carries the tool's searchable attributes (category,
+tags, pricing model, status, rating) so search filters run inside the
+vector search rather than afterwards in Postgres.
 """
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Dict, Any, Union, Callable
 from uuid import UUID
 from openai import AsyncOpenAI
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.models import (
     Distance, VectorParams, PointStruct,
-    Filter, FieldCondition, MatchValue,
-    SearchParams
+    Filter, FieldCondition, MatchValue, MatchAny, Range,
+    SearchParams, PayloadSchemaType, SetPayload, SetPayloadOperation
 )
 
 from app.core.config import settings
+from app.services.embedding_cache import embedding_cache
+from app.services.vector_store import LocalVectorIndex
 
 logger = logging.getLogger(__name__)
 
+# Payload fields search filters on, with their Qdrant index types
+PAYLOAD_INDEXES = {
+    "category": PayloadSchemaType.KEYWORD,
+    "category_id": PayloadSchemaType.KEYWORD,
+    "tags": PayloadSchemaType.KEYWORD,
+    "pricing_model": PayloadSchemaType.KEYWORD,
+    "status": PayloadSchemaType.KEYWORD,
+    "rating": PayloadSchemaType.FLOAT,
+}
+
 
 class EmbeddingService:
     """Service for generating and searching embeddings."""
 
     def __init__(self):
         self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        self.qdrant_client: Optional[QdrantClient] = None
+        self.qdrant_client: Optional[Union[AsyncQdrantClient, QdrantClient]] = None
+        self.local_index: Optional[LocalVectorIndex] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
         self.collection_name = settings.QDRANT_COLLECTION
         self.embedding_model = settings.EMBEDDING_MODEL
         self.dimensions = settings.EMBEDDING_DIMENSIONS
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.upsert_batch_size = settings.QDRANT_UPSERT_BATCH_SIZE
+
+    @property
+    def backend(self) -> str:
+        """Configured vector backend: qdrant or local."""
+        if settings.VECTOR_BACKEND == "auto":
+            return "qdrant" if settings.QDRANT_URL else "local"
+        return settings.VECTOR_BACKEND
+
+    @property
+    def is_connected(self) -> bool:
+        return self.qdrant_client is not None or self.local_index is not None
 
     async def connect(self):
-        """Connect to Qdrant (local or cloud)."""
+        """Open the vector backend: Qdrant (local or cloud) or the in-process index."""
+        if self.backend == "local":
+            await self._connect_local()
+            return
+
         try:
-            # Check if QDRANT_URL is set for cloud deployment
-            if settings.QDRANT_URL and not settings.QDRANT_URL.startswith("http://localhost"):
-                # Qdrant Cloud
-                self.qdrant_client = QdrantClient(
-                    url=settings.QDRANT_URL,
-                    api_key=settings.QDRANT_API_KEY
-                )
-                logger.info(f"Connected to Qdrant Cloud: {settings.QDRANT_URL}")
-            elif settings.QDRANT_URL and settings.QDRANT_URL.startswith("http://localhost"):
-                # Local Qdrant via URL
-                self.qdrant_client = QdrantClient(url=settings.QDRANT_URL)
-                logger.info(f"Connected to local Qdrant: {settings.QDRANT_URL}")
-            else:
+            if not settings.QDRANT_URL:
                 # No Qdrant configured
                 logger.info("Qdrant URL not configured - vector search will be disabled")
                 return
 
+            client_kwargs: Dict[str, Any] = {
+                "url": settings.QDRANT_URL,
+                "timeout": int(settings.VECTOR_WRITE_TIMEOUT_SECONDS),
+            }
+            is_local = settings.QDRANT_URL.startswith("http://localhost")
+            if not is_local:
+                # Qdrant Cloud
+                client_kwargs["api_key"] = settings.QDRANT_API_KEY
+
+            if settings.QDRANT_USE_ASYNC_CLIENT:
+                self.qdrant_client = AsyncQdrantClient(**client_kwargs)
+            else:
+                self.qdrant_client = QdrantClient(**client_kwargs)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.QDRANT_SYNC_MAX_WORKERS,
+                    thread_name_prefix="qdrant"
+                )
+
+            logger.info(
+                f"Connected to {'local Qdrant' if is_local else 'Qdrant Cloud'}: {settings.QDRANT_URL} "
+                f"({'async' if settings.QDRANT_USE_ASYNC_CLIENT else 'sync/threaded'} client)"
+            )
+
             # Ensure collection exists
-            self._ensure_collection()
+            await self._ensure_collection()
         except Exception as e:
             logger.error(f"Failed to connect to Qdrant: {e}")
             # Don't raise - allow app to continue without vector DB
 
-    def _ensure_collection(self):
-        """Create collection if it doesn't exist."""
+    async def _connect_local(self):
+        index = LocalVectorIndex(
+            path=settings.VECTOR_LOCAL_PATH,
+            dimensions=self.dimensions,
+            dtype=settings.VECTOR_LOCAL_DTYPE,
+            algorithm=settings.VECTOR_LOCAL_ALGORITHM,
+            ivf_min_points=settings.VECTOR_IVF_MIN_POINTS,
+            ivf_lists=settings.VECTOR_IVF_LISTS,
+            ivf_probes=settings.VECTOR_IVF_PROBES,
+        )
+        try:
+            await asyncio.to_thread(index.load)
+        except Exception as e:
+            # e.g. a read-only filesystem on serverless hosts
+            logger.error(f"Failed to open local vector index at {settings.VECTOR_LOCAL_PATH}: {e}")
+            return
+        self.local_index = index
+        logger.info(f"Using local vector index at {settings.VECTOR_LOCAL_PATH} ({len(index)} vectors)")
+
+    async def _local(self, method: str, *args) -> Any:
+        """
+        Call the local index. Writes and searches over large indexes run in
+        a worker thread (NumPy releases the GIL for the matrix products).
+        """
+        func = getattr(self.local_index, method)
+        if method == "search" and len(self.local_index) <= settings.VECTOR_LOCAL_INLINE_MAX:
+            return func(*args)
+        result = await asyncio.to_thread(func, *args)
+        if method in ("upsert", "delete", "set_payload"):
+            self._schedule_flush()
+        return result
+
+    def _schedule_flush(self):
+        """Persist local index metadata shortly after a burst of writes."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(settings.VECTOR_LOCAL_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(self.local_index.flush)
+        except Exception as e:
+            logger.error(f"Failed to persist local vector index: {e}")
+
+    async def close(self):
+        """Close the vector backend and any fallback thread pool."""
+        if self.local_index is not None:
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
+            try:
+                await asyncio.to_thread(self.local_index.flush)
+            except Exception as e:
+                logger.warning(f"Error persisting local vector index: {e}")
+            self.local_index = None
+        if self.qdrant_client is not None:
+            try:
+                result = self.qdrant_client.close()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Error closing Qdrant client: {e}")
+            self.qdrant_client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _qdrant(self, method: str, **kwargs) -> Any:
+        """
+        Invoke a Qdrant client method without blocking the event loop.
+        Sync clients are dispatched to the bounded thread pool.
+        """
+        func = getattr(self.qdrant_client, method)
+        if isinstance(self.qdrant_client, AsyncQdrantClient):
+            return await func(**kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, **kwargs))
+
+    async def _ensure_collection(self):
+        """Create collection and its payload indexes if they don't exist."""
         if not self.qdrant_client:
             return
 
         try:
-            collections = self.qdrant_client.get_collections().collections
+            collections = (await self._qdrant("get_collections")).collections
             if not any(c.name == self.collection_name for c in collections):
-                self.qdrant_client.create_collection(
+                await self._qdrant(
+                    "create_collection",
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
                         size=self.dimensions,
@@ -72,6 +203,19 @@ class EmbeddingService:
                 logger.info(f"Created collection: {self.collection_name}")
         except Exception as e:
             logger.warning(f"Could not ensure collection exists: {e}")
+            return
+
+        # Creating an index that already exists is a no-op
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            try:
+                await self._qdrant(
+                    "create_payload_index",
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
+            except Exception as e:
+                logger.warning(f"Could not create payload index on {field_name}: {e}")
 
     async def generate_embedding(self, text: str) -> Optional[List[float]]:
         """Generate embedding for text using OpenAI."""
@@ -85,24 +229,166 @@ class EmbeddingService:
             logger.error(f"Embedding generation error: {e}")
             return None
 
+    async def generate_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed many texts, EMBEDDING_BATCH_SIZE inputs per OpenAI request.
+        Results line up with texts; a failed request yields None for its inputs.
+        """
+        embeddings: List[Optional[List[float]]] = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            try:
+                response = await self.openai_client.embeddings.create(
+                    model=self.embedding_model,
+                    input=batch
+                )
+                vectors = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+                embeddings.extend(vectors)
+            except Exception as e:
+                logger.error(f"Batch embedding generation error ({len(batch)} texts): {e}")
+                embeddings.extend([None] * len(batch))
+        return embeddings
+
+    async def generate_query_embedding(self, query: str) -> Optional[List[float]]:
+        """Generate a search query embedding, served from the cache when possible."""
+        cached = await embedding_cache.get(query, self.embedding_model, self.dimensions)
+        if cached is not None:
+            return cached
+
+        embedding = await self.generate_embedding(embedding_cache.normalize(query))
+        if embedding:
+            await embedding_cache.set(query, self.embedding_model, self.dimensions, embedding)
+        return embedding
+
+    @staticmethod
+    def tool_text(name: str, description: str, category: str, tags: List[str]) -> str:
+        """Text a tool is embedded from."""
+        return f"{name}. {description}. Category: {category}. Tags: {', '.join(tags or [])}"
+
+    @staticmethod
+    def tool_attributes(
+        category_id: Optional[UUID] = None,
+        pricing_model: Optional[str] = None,
+        status: Optional[str] = None,
+        rating: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Filterable tool fields stored in the payload besides category and tags."""
+        return {
+            "category_id": str(category_id) if category_id else None,
+            "pricing_model": getattr(pricing_model, "value", pricing_model),
+            "status": getattr(status, "value", status),
+            "rating": float(rating or 0.0),
+        }
+
+    def attributes_for(self, tool) -> Dict[str, Any]:
+        """Payload attributes of a Tool row."""
+        return self.tool_attributes(tool.category_id, tool.pricing_model, tool.status, tool.average_rating)
+
+    @staticmethod
+    def tool_payload(
+        tool_id: UUID,
+        name: str,
+        category: str,
+        tags: List[str],
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Payload stored with a tool's vector."""
+        return {
+            "tool_id": str(tool_id),
+            "name": name,
+            "category": category,
+            "tags": tags or [],
+            **(attributes or {})
+        }
+
+    async def index_tools(self, tools: List[Dict[str, Any]]) -> int:
+        """
+        Index many tools: one embedding request per EMBEDDING_BATCH_SIZE tools
+        and one upsert per QDRANT_UPSERT_BATCH_SIZE points.
+        Each tool dict carries tool_id, name, description, category and tags,
+        plus the category_id, pricing_model, status and rating attributes.
+        Returns the number of points written.
+        """
+        if not self.is_connected:
+            logger.warning("Vector database not connected")
+            return 0
+
+        embeddings = await self.generate_embeddings([
+            self.tool_text(t["name"], t["description"], t["category"], t["tags"]) for t in tools
+        ])
+        points = [
+            PointStruct(
+                id=str(tool["tool_id"]),
+                vector=embedding,
+                payload=self.tool_payload(
+                    tool["tool_id"], tool["name"], tool["category"], tool["tags"],
+                    self.tool_attributes(
+                        tool.get("category_id"), tool.get("pricing_model"),
+                        tool.get("status"), tool.get("rating")
+                    )
+                )
+            )
+            for tool, embedding in zip(tools, embeddings)
+            if embedding
+        ]
+
+        if self.local_index is not None:
+            await self._local("upsert", [(p.id, p.vector, p.payload) for p in points])
+            return len(points)
+
+        written = 0
+        for start in range(0, len(points), self.upsert_batch_size):
+            batch = points[start:start + self.upsert_batch_size]
+            try:
+                await asyncio.wait_for(
+                    self._qdrant("upsert", collection_name=self.collection_name, points=batch),
+                    timeout=settings.VECTOR_WRITE_TIMEOUT_SECONDS
+                )
+                written += len(batch)
+            except asyncio.TimeoutError:
+                logger.error(f"Upserting {len(batch)} tool embeddings timed out")
+            except Exception as e:
+                logger.error(f"Failed to upsert {len(batch)} tool embeddings: {e}")
+        return written
+
     async def index_tool(
         self,
         tool_id: UUID,
         name: str,
         description: str,
         category: str,
-        tags: List[str]
+        tags: List[str],
+        attributes: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
         """
         Index a tool in the vector database.
+        attributes are the filterable fields from tool_attributes().
         Returns the embedding ID.
         """
-        if not self.qdrant_client:
-            logger.warning("Qdrant client not connected")
+        if not self.is_connected:
+            logger.warning("Vector database not connected")
+            return None
+
+        try:
+            return await asyncio.wait_for(
+                self._index_tool(tool_id, name, description, category, tags, attributes),
+                timeout=settings.VECTOR_WRITE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Indexing tool {tool_id} timed out")
             return None
 
+    async def _index_tool(
+        self,
+        tool_id: UUID,
+        name: str,
+        description: str,
+        category: str,
+        tags: List[str],
+        attributes: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
         # Create combined text for embedding
-        text = f"{name}. {description}. Category: {category}. Tags: {', '.join(tags)}"
+        text = self.tool_text(name, description, category, tags)
 
         # Generate embedding
         embedding = await self.generate_embedding(text)
@@ -111,23 +397,18 @@ class EmbeddingService:
 
         # Create point ID from tool UUID
         point_id = str(tool_id)
+        payload = self.tool_payload(tool_id, name, category, tags, attributes)
 
         try:
+            if self.local_index is not None:
+                await self._local("upsert", [(point_id, embedding, payload)])
+                return point_id
+
             # Upsert to Qdrant
-            self.qdrant_client.upsert(
+            await self._qdrant(
+                "upsert",
                 collection_name=self.collection_name,
-                points=[
-                    PointStruct(
-                        id=point_id,
-                        vector=embedding,
-                        payload={
-                            "tool_id": str(tool_id),
-                            "name": name,
-                            "category": category,
-                            "tags": tags
-                        }
-                    )
-                ]
+                points=[PointStruct(id=point_id, vector=embedding, payload=payload)]
             )
             return point_id
         except Exception as e:
@@ -140,39 +421,114 @@ class EmbeddingService:
         limit: int = 20,
         category: Optional[str] = None,
         tags: Optional[List[str]] = None,
-        score_threshold: float = 0.5
+        score_threshold: float = 0.5,
+        category_id: Optional[UUID] = None,
+        pricing_models: Optional[List[str]] = None,
+        min_rating: Optional[float] = None,
+        status: Optional[str] = None,
+        offset: int = 0
     ) -> List[Dict[str, Any]]:
         """
         Search for similar tools using semantic search.
+        All filters are applied inside the vector search, so a page is only
+        short when there are no more matches; tags match if any overlap.
+        Returns an empty list if the search exceeds its deadline.
         """
-        if not self.qdrant_client:
-            logger.warning("Qdrant client not connected")
+        if not self.is_connected:
+            logger.warning("Vector database not connected")
             return []
 
+        conditions = {
+            "category": category,
+            "category_id": str(category_id) if category_id else None,
+            "tags": tags or None,
+            "pricing_model": [getattr(p, "value", p) for p in pricing_models] if pricing_models else None,
+            "status": getattr(status, "value", status),
+            "rating": min_rating,
+        }
+        conditions = {field: value for field, value in conditions.items() if value is not None}
+
+        try:
+            return await asyncio.wait_for(
+                self._search_similar(query, limit, offset, conditions, score_threshold),
+                timeout=settings.VECTOR_SEARCH_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Semantic search timed out for query: {query[:100]}")
+            return []
+
+    @staticmethod
+    def _qdrant_filter(conditions: Dict[str, Any]) -> Optional[Filter]:
+        """Qdrant filter for search conditions: lists match any, rating is a minimum."""
+        must = []
+        for field, value in conditions.items():
+            if field == "rating":
+                must.append(FieldCondition(key=field, range=Range(gte=value)))
+            elif isinstance(value, list):
+                must.append(FieldCondition(key=field, match=MatchAny(any=value)))
+            else:
+                must.append(FieldCondition(key=field, match=MatchValue(value=value)))
+        return Filter(must=must) if must else None
+
+    @staticmethod
+    def _local_predicate(conditions: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """The same conditions as a payload predicate for the local index."""
+        if not conditions:
+            return None
+
+        def matches(payload: Dict[str, Any]) -> bool:
+            for field, value in conditions.items():
+                actual = payload.get(field)
+                if field == "rating":
+                    if actual is None or actual < value:
+                        return False
+                elif isinstance(value, list):
+                    values = actual if isinstance(actual, list) else [actual]
+                    if not any(v in value for v in values):
+                        return False
+                elif actual != value:
+                    return False
+            return True
+
+        return matches
+
+    async def _search_similar(
+        self,
+        query: str,
+        limit: int,
+        offset: int,
+        conditions: Dict[str, Any],
+        score_threshold: float
+    ) -> List[Dict[str, Any]]:
         # Generate query embedding
-        query_embedding = await self.generate_embedding(query)
+        query_embedding = await self.generate_query_embedding(query)
         if not query_embedding:
             return []
 
-        # Build filters
-        filters = []
-        if category:
-            filters.append(
-                FieldCondition(
-                    key="category",
-                    match=MatchValue(value=category)
-                )
+        if self.local_index is not None:
+            hits = await self._local(
+                "search", query_embedding, limit + offset, score_threshold,
+                self._local_predicate(conditions)
             )
-
-        search_filter = Filter(must=filters) if filters else None
+            return [
+                {
+                    "tool_id": payload["tool_id"],
+                    "score": score,
+                    "name": payload.get("name"),
+                    "category": payload.get("category")
+                }
+                for _, score, payload in hits[offset:]
+            ]
 
         try:
             # Search Qdrant
-            results = self.qdrant_client.search(
+            results = await self._qdrant(
+                "search",
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
-                query_filter=search_filter,
+                query_filter=self._qdrant_filter(conditions),
                 limit=limit,
+                offset=offset,
                 score_threshold=score_threshold,
                 search_params=SearchParams(hnsw_ef=128, exact=False)
             )
@@ -193,15 +549,25 @@ class EmbeddingService:
 
     async def delete_tool(self, tool_id: UUID) -> bool:
         """Remove a tool from the vector database."""
-        if not self.qdrant_client:
+        if not self.is_connected:
             return False
 
+        if self.local_index is not None:
+            return await self._local("delete", [str(tool_id)]) > 0
+
         try:
-            self.qdrant_client.delete(
-                collection_name=self.collection_name,
-                points_selector=[str(tool_id)]
+            await asyncio.wait_for(
+                self._qdrant(
+                    "delete",
+                    collection_name=self.collection_name,
+                    points_selector=[str(tool_id)]
+                ),
+                timeout=settings.VECTOR_WRITE_TIMEOUT_SECONDS
             )
             return True
+        except asyncio.TimeoutError:
+            logger.error(f"Deleting tool embedding {tool_id} timed out")
+            return False
         except Exception as e:
             logger.error(f"Failed to delete tool embedding: {e}")
             return False
@@ -212,13 +578,46 @@ class EmbeddingService:
         name: str,
         description: str,
         category: str,
-        tags: List[str]
+        tags: List[str],
+        attributes: Optional[Dict[str, Any]] = None
     ) -> bool:
         """Update a tool's embedding."""
         # Simply re-index (upsert handles update)
-        result = await self.index_tool(tool_id, name, description, category, tags)
+        result = await self.index_tool(tool_id, name, description, category, tags, attributes)
         return result is not None
 
+    async def sync_attributes(self, tools: List[Any]) -> int:
+        """
+        Copy the filterable attributes of Tool rows into their payloads
+        without re-embedding, e.g. after moderation or a rating change.
+        Returns the number of tools sent.
+        """
+        if not self.is_connected or not tools:
+            return 0
+
+        updates = [(str(tool.id), self.attributes_for(tool)) for tool in tools]
+        try:
+            if self.local_index is not None:
+                return await self._local("set_payload", updates)
+
+            await asyncio.wait_for(
+                self._qdrant(
+                    "batch_update_points",
+                    collection_name=self.collection_name,
+                    update_operations=[
+                        SetPayloadOperation(set_payload=SetPayload(payload=fields, points=[point_id]))
+                        for point_id, fields in updates
+                    ]
+                ),
+                timeout=settings.VECTOR_WRITE_TIMEOUT_SECONDS
+            )
+            return len(updates)
+        except asyncio.TimeoutError:
+            logger.error(f"Updating payloads of {len(updates)} tools timed out")
+        except Exception as e:
+            logger.error(f"Failed to update tool payloads: {e}")
+        return 0
+
 
 # Singleton instance
 embedding_service = EmbeddingService()
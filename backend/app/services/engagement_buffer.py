@@ -0,0 +1,349 @@
+"""
+Write-behind buffer for engagement events (views, clicks, saves).
+Events are queued in-process (or in Redis) and flushed to Postgres in batches:
+one multi-row INSERT into engagements, atomic counter deltas on tools, trending
+window counts, and a rank recompute limited to the tools touched by the flush.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+from uuid import UUID, uuid4
+from sqlalchemy import select, insert, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.models.tool import Tool
+from app.models.engagement import Engagement, EngagementType
+from app.services.ranking import ranking_service
+from app.services.trending import trending_engine
+
+logger = logging.getLogger(__name__)
+
+REDIS_QUEUE_KEY = "engagement:queue"
+
+# Which denormalized tool counter each engagement type increments
+COUNTER_COLUMNS = {
+    EngagementType.VIEW: "view_count",
+    EngagementType.CLICK: "click_count",
+    EngagementType.SAVE: "save_count",
+}
+
+
+@dataclass
+class EngagementEvent:
+    """A single buffered engagement."""
+    tool_id: UUID
+    engagement_type: EngagementType
+    user_id: Optional[UUID] = None
+    session_id: Optional[str] = None
+    source: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "tool_id": str(self.tool_id),
+            "engagement_type": self.engagement_type.value,
+            "user_id": str(self.user_id) if self.user_id else None,
+            "session_id": self.session_id,
+            "source": self.source,
+            "created_at": self.created_at.isoformat(),
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "EngagementEvent":
+        data = json.loads(raw)
+        return cls(
+            tool_id=UUID(data["tool_id"]),
+            engagement_type=EngagementType(data["engagement_type"]),
+            user_id=UUID(data["user_id"]) if data.get("user_id") else None,
+            session_id=data.get("session_id"),
+            source=data.get("source"),
+            created_at=datetime.fromisoformat(data["created_at"]),
+        )
+
+
+class EngagementBuffer:
+    """
+    Batches engagement events and flushes them on a timer.
+
+    When the buffer is not running (e.g. serverless deployments without a
+    lifespan-managed background task) events are written through immediately
+    using the same set-based statements.
+    """
+
+    def __init__(self):
+        self.enabled = settings.ENGAGEMENT_BUFFER_ENABLED
+        self.use_redis = settings.ENGAGEMENT_BUFFER_BACKEND == "redis"
+        self.flush_interval = settings.ENGAGEMENT_FLUSH_INTERVAL_SECONDS
+        self.batch_size = settings.ENGAGEMENT_FLUSH_BATCH_SIZE
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ENGAGEMENT_BUFFER_MAX_EVENTS)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        # Counters
+        self.events_flushed = 0
+        self.events_dropped = 0
+        self.flush_count = 0
+        self.last_flush_at: Optional[datetime] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start the background flush loop."""
+        if not self.enabled or self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Engagement buffer started (backend={'redis' if self.use_redis else 'memory'}, "
+            f"interval={self.flush_interval}s)"
+        )
+
+    async def stop(self):
+        """Stop the flush loop and write out anything still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def record(
+        self,
+        tool_id: UUID,
+        engagement_type: EngagementType,
+        user_id: Optional[UUID] = None,
+        session_id: Optional[str] = None,
+        source: Optional[str] = None,
+        db: Optional[AsyncSession] = None
+    ):
+        """Queue an engagement event (or write it through if not buffering)."""
+        event = EngagementEvent(
+            tool_id=tool_id,
+            engagement_type=engagement_type,
+            user_id=user_id,
+            session_id=session_id,
+            source=source,
+        )
+
+        if not self.is_running:
+            if db is not None:
+                await self.write_events(db, [event])
+            else:
+                async with AsyncSessionLocal() as session:
+                    await self.write_events(session, [event])
+            return
+
+        if self.use_redis:
+            try:
+                await redis_client.client.rpush(REDIS_QUEUE_KEY, event.to_json())
+                return
+            except Exception as e:
+                logger.warning(f"Redis engagement queue unavailable, buffering locally: {e}")
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.events_dropped += 1
+            return
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self):
+        """Background loop: flush every interval or when a batch fills up."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Engagement flush failed: {e}", exc_info=True)
+
+    async def _drain(self) -> List[EngagementEvent]:
+        """Pull up to one batch of pending events."""
+        events: List[EngagementEvent] = []
+        while len(events) < self.batch_size and not self._queue.empty():
+            events.append(self._queue.get_nowait())
+
+        if self.use_redis and len(events) < self.batch_size:
+            try:
+                raw_items = await redis_client.client.lpop(
+                    REDIS_QUEUE_KEY, self.batch_size - len(events)
+                )
+                for raw in raw_items or []:
+                    try:
+                        events.append(EngagementEvent.from_json(raw))
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Skipping malformed engagement event: {e}")
+            except Exception as e:
+                logger.warning(f"Could not drain Redis engagement queue: {e}")
+
+        return events
+
+    async def flush(self) -> int:
+        """Flush pending events until the buffer is empty. Returns events written."""
+        total = 0
+        async with self._flush_lock:
+            while True:
+                events = await self._drain()
+                if not events:
+                    break
+
+                committed = False
+                try:
+                    async with AsyncSessionLocal() as session:
+                        written = await self._persist(session, events)
+                        committed = True
+                        total += len(written)
+                        await self._after_commit(session, written)
+                except BaseException:
+                    # Put an uncommitted batch back so it is retried on the next
+                    # tick (or by the final flush in stop() when cancelled)
+                    if not committed:
+                        for event in events:
+                            try:
+                                self._queue.put_nowait(event)
+                            except asyncio.QueueFull:
+                                self.events_dropped += 1
+                    raise
+
+                if len(events) < self.batch_size:
+                    break
+
+        if total:
+            self.flush_count += 1
+            self.last_flush_at = datetime.now(timezone.utc)
+        return total
+
+    async def write_events(self, db: AsyncSession, events: List[EngagementEvent]) -> int:
+        """
+        Persist a batch of events with set-based statements.
+        Returns the number of events written.
+        """
+        written = await self._persist(db, events)
+        await self._after_commit(db, written)
+        return len(written)
+
+    async def _persist(self, db: AsyncSession, events: List[EngagementEvent]) -> List[EngagementEvent]:
+        """Insert events and apply counter deltas in one transaction; returns the events written."""
+        if not events:
+            return []
+
+        # Drop events for tools deleted since they were queued
+        tool_ids = {e.tool_id for e in events}
+        result = await db.execute(select(Tool.id).where(Tool.id.in_(tool_ids)))
+        existing_ids = set(result.scalars().all())
+        events = [e for e in events if e.tool_id in existing_ids]
+        if not events:
+            return []
+
+        # Multi-row INSERT for the raw events
+        await db.execute(
+            insert(Engagement),
+            [
+                {
+                    "id": uuid4(),
+                    "tool_id": e.tool_id,
+                    "user_id": e.user_id,
+                    "session_id": e.session_id,
+                    "engagement_type": e.engagement_type,
+                    "source": e.source,
+                    "created_at": e.created_at,
+                }
+                for e in events
+            ]
+        )
+
+        # Aggregate counter deltas per tool
+        deltas: Dict[UUID, Dict[str, int]] = defaultdict(
+            lambda: {column: 0 for column in COUNTER_COLUMNS.values()}
+        )
+        for e in events:
+            column = COUNTER_COLUMNS.get(e.engagement_type)
+            if column:
+                deltas[e.tool_id][column] += 1
+
+        if deltas:
+            # Rows are updated in tool_id order so concurrent flushers lock
+            # them in the same order and cannot deadlock
+            tools_table = Tool.__table__
+            stmt = (
+                update(tools_table)
+                .where(tools_table.c.id == bindparam("b_tool_id"))
+                .values(
+                    view_count=tools_table.c.view_count + bindparam("b_view_count"),
+                    click_count=tools_table.c.click_count + bindparam("b_click_count"),
+                    save_count=tools_table.c.save_count + bindparam("b_save_count"),
+                )
+            )
+            await db.execute(
+                stmt,
+                [
+                    {
+                        "b_tool_id": tool_id,
+                        **{f"b_{column}": n for column, n in counts.items()},
+                    }
+                    for tool_id, counts in sorted(deltas.items())
+                ]
+            )
+
+        await db.commit()
+        self.events_flushed += len(events)
+        return events
+
+    async def _after_commit(self, db: AsyncSession, events: List[EngagementEvent]):
+        """
+        Derived updates for committed events. Failures are logged, never
+        raised: the events are already stored and must not be written again.
+        """
+        if not events:
+            return
+
+        try:
+            await trending_engine.record(
+                (e.tool_id, e.engagement_type, e.created_at) for e in events
+            )
+        except Exception as e:
+            logger.error(f"Recording trending counts failed: {e}", exc_info=True)
+
+        # Recompute rank scores only for the tools this batch touched
+        tool_ids = sorted({e.tool_id for e in events if e.engagement_type in COUNTER_COLUMNS})
+        if tool_ids:
+            try:
+                await ranking_service.bulk_update_rankings(
+                    db, tool_ids, invalidate_listings=False
+                )
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Rank recompute after engagement flush failed: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffer statistics for monitoring."""
+        return {
+            "running": self.is_running,
+            "backend": "redis" if self.use_redis else "memory",
+            "pending": self._queue.qsize(),
+            "events_flushed": self.events_flushed,
+            "events_dropped": self.events_dropped,
+            "flush_count": self.flush_count,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+        }
+
+
+# Singleton instance
+engagement_buffer = EngagementBuffer()
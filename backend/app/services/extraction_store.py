@@ -0,0 +1,108 @@
+"""
+Short-lived store for URL extraction previews.
+/tools/extract saves its result under a random token; /tools/submit
+redeems the token instead of scraping and calling the LLM a second time.
+Entries live in Redis when connected (shared across workers) and in a
+bounded in-process TTL tier. The Redis key includes a digest of the URL, so
+a redeem is a single atomic GETDEL and a token presented with the wrong URL
+is left in place.
+"""
+import hashlib
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.schemas.tool import ToolExtractionResult
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionStore:
+    """Token -> (url, extraction) with a TTL; tokens are single use."""
+
+    def __init__(self):
+        self.ttl = settings.EXTRACTION_TOKEN_TTL_SECONDS
+        self.max_entries = settings.EXTRACTION_TOKEN_MAX_ENTRIES
+        # token -> (expires_at, entry, stored in Redis)
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any], bool]]" = OrderedDict()
+
+        # Counters
+        self.issued = 0
+        self.redeemed = 0
+        self.expired = 0
+
+    @staticmethod
+    def make_key(token: str, url: str) -> str:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        return f"extract:{token}:{digest}"
+
+    async def put(self, url: str, extraction: ToolExtractionResult) -> str:
+        """Store an extraction and return its token."""
+        token = secrets.token_urlsafe(24)
+        entry = {"url": url, "extraction": extraction.model_dump()}
+
+        shared = False
+        if redis_client.is_connected:
+            try:
+                await redis_client.set(self.make_key(token, url), entry, ttl=self.ttl)
+                shared = True
+            except Exception as e:
+                logger.warning(f"Could not store extraction token in Redis: {e}")
+
+        self._local[token] = (time.monotonic() + self.ttl, entry, shared)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+        self.issued += 1
+        return token
+
+    async def take(self, token: str, url: str) -> Optional[ToolExtractionResult]:
+        """
+        Redeem a token for the URL it was issued for. Returns None when the
+        token is unknown, expired or belongs to another URL; in the last
+        case the token stays redeemable for its own URL.
+        """
+        entry = None
+        local = self._local.get(token)
+        if local and local[1].get("url") != url:
+            local = None
+
+        # Redis is the source of truth for tokens stored there: GETDEL lets
+        # exactly one worker redeem them
+        redeemed_in_redis = False
+        if redis_client.is_connected:
+            try:
+                raw = await redis_client.client.getdel(self.make_key(token, url))
+                entry = json.loads(raw) if raw else None
+                redeemed_in_redis = True
+            except Exception as e:
+                logger.warning(f"Could not redeem extraction token from Redis: {e}")
+
+        if local:
+            self._local.pop(token, None)
+            if not (redeemed_in_redis and local[2]) and local[0] > time.monotonic():
+                entry = local[1]
+
+        if entry is None or entry.get("url") != url:
+            self.expired += 1
+            return None
+
+        self.redeemed += 1
+        return ToolExtractionResult(**entry["extraction"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local_entries": len(self._local),
+            "issued": self.issued,
+            "redeemed": self.redeemed,
+            "expired": self.expired,
+        }
+
+
+# Singleton instance
+extraction_store = ExtractionStore()
@@ -0,0 +1,161 @@
+"""
+Materialized cache for ranked tool listings.
+Each (ranking_type, category_id) listing is stored as an ordered list of
+tool IDs plus serialized ToolListResponse payloads, so listing pages are a
+slice of a snapshot instead of an ORDER BY/OFFSET query.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "listing:generation"
+
+
+class ListingCache:
+    """
+    Two-tier snapshot store: process memory in front of Redis.
+
+    Invalidation bumps a generation counter (shared through Redis when
+    connected), so every worker stops serving old snapshots at once. The
+    local tier is an LRU capped at LISTING_CACHE_LOCAL_MAX_LISTINGS, which
+    also ages out snapshots from past freshness buckets.
+    """
+
+    def __init__(self):
+        self.enabled = settings.LISTING_CACHE_ENABLED
+        self.max_items = settings.LISTING_CACHE_MAX_ITEMS
+        self.ttl = settings.LISTING_CACHE_TTL_SECONDS
+        self.local_ttl = settings.LISTING_CACHE_LOCAL_TTL_SECONDS
+        self.max_local = settings.LISTING_CACHE_LOCAL_MAX_LISTINGS
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._generation = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        ranking_type: str,
+        category_id: Optional[UUID],
+        freshness_epoch: Optional[int] = None
+    ) -> str:
+        # Freshness bucket in the key so snapshots roll over with the ordering
+        key = f"{ranking_type}:{category_id or 'all'}"
+        return f"{key}:{freshness_epoch}" if freshness_epoch is not None else key
+
+    def lock_for(self, key: str) -> asyncio.Lock:
+        """Per-listing lock so concurrent misses build a snapshot once."""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    async def _current_generation(self) -> int:
+        if redis_client.is_connected:
+            try:
+                value = await redis_client.get(GENERATION_KEY)
+                return int(value or 0)
+            except Exception as e:
+                logger.warning(f"Listing cache generation lookup failed: {e}")
+        return self._generation
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the snapshot for a listing key, if cached."""
+        local = self._local.get(key)
+        if local is not None:
+            if local[0] > time.monotonic():
+                self._local.move_to_end(key)
+                self.hits += 1
+                return local[1]
+            del self._local[key]
+
+        if redis_client.is_connected:
+            try:
+                generation = await self._current_generation()
+                snapshot = await redis_client.get_json(f"listing:{generation}:{key}")
+                if snapshot:
+                    self._store_local(key, snapshot)
+                    self.hits += 1
+                    return snapshot
+            except Exception as e:
+                logger.warning(f"Listing cache Redis lookup failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, snapshot: Dict[str, Any]):
+        """Store a snapshot in both tiers."""
+        self._store_local(key, snapshot)
+
+        if redis_client.is_connected:
+            try:
+                generation = await self._current_generation()
+                await redis_client.set(f"listing:{generation}:{key}", snapshot, ttl=self.ttl)
+            except Exception as e:
+                logger.warning(f"Listing cache Redis write failed: {e}")
+
+    def _store_local(self, key: str, snapshot: Dict[str, Any]):
+        self._local[key] = (time.monotonic() + self.local_ttl, snapshot)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local:
+            self._local.popitem(last=False)
+        self._prune_locks()
+
+    def _prune_locks(self):
+        # Locks for listings no longer held (e.g. past freshness buckets)
+        if len(self._locks) > self.max_local:
+            for key in [k for k, lock in self._locks.items() if k not in self._local and not lock.locked()]:
+                del self._locks[key]
+
+    @staticmethod
+    def make_snapshot(
+        items: List[Dict[str, Any]],
+        cursors: List[str],
+        total: int
+    ) -> Dict[str, Any]:
+        """Snapshot of a listing: ordered IDs, payloads and per-item keyset cursors."""
+        return {
+            "ids": [item["id"] for item in items],
+            "items": items,
+            "cursors": cursors,
+            "total": total,
+            "built_at": time.time(),
+        }
+
+    async def invalidate(self):
+        """Drop every listing snapshot (all workers, when Redis is shared)."""
+        self._local.clear()
+        self._locks = {key: lock for key, lock in self._locks.items() if lock.locked()}
+        self._generation += 1
+        self.invalidations += 1
+
+        if redis_client.is_connected:
+            try:
+                await redis_client.client.incr(GENERATION_KEY)
+            except Exception as e:
+                logger.warning(f"Listing cache invalidation failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "local_listings": len(self._local),
+            "max_local_listings": self.max_local,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+# Singleton instance
+listing_cache = ListingCache()
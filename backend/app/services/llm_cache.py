@@ -0,0 +1,122 @@
+"""
+Content-addressed cache for LLM completions.
+Keys hash the model, the prompt template version and the fully rendered
+request, so identical prompts are answered without a model call and any
+prompt or model change naturally misses. An in-process LRU sits in front
+of Redis; both tiers expire entries after a TTL.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """LRU + Redis cache of completion text keyed by request content."""
+
+    def __init__(self):
+        self.enabled = settings.LLM_CACHE_ENABLED
+        self.max_entries = settings.LLM_CACHE_MAX_ENTRIES
+        self.ttl = settings.LLM_CACHE_TTL_SECONDS
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # Counters
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def make_key(
+        model: str,
+        template: str,
+        version: int,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any]
+    ) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True, ensure_ascii=False
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"llm:{template}:v{version}:{digest}"
+
+    def _hit(self, key: str, entry: Dict[str, Any], tier: str) -> str:
+        self.tokens_saved += entry.get("tokens", 0)
+        logger.info(f"LLM cache {tier} hit for {key.rsplit(':', 1)[0]} ({entry.get('tokens', 0)} tokens saved)")
+        return entry["content"]
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up a completion in the local tier, then Redis."""
+        if not self.enabled:
+            return None
+
+        local = self._local.get(key)
+        if local is not None:
+            if local[0] > time.monotonic():
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return self._hit(key, local[1], "local")
+            del self._local[key]
+
+        if redis_client.is_connected:
+            try:
+                entry = await redis_client.get_json(key)
+                if entry:
+                    self._store_local(key, entry)
+                    self.redis_hits += 1
+                    return self._hit(key, entry, "redis")
+            except Exception as e:
+                logger.warning(f"LLM cache Redis lookup failed: {e}")
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, content: str, tokens: int = 0):
+        """Store a completion in both tiers."""
+        if not self.enabled:
+            return
+
+        entry = {"content": content, "tokens": tokens}
+        self._store_local(key, entry)
+
+        if redis_client.is_connected:
+            try:
+                await redis_client.set(key, entry, ttl=self.ttl)
+            except Exception as e:
+                logger.warning(f"LLM cache Redis write failed: {e}")
+
+    def _store_local(self, key: str, entry: Dict[str, Any]):
+        self._local[key] = (time.monotonic() + self.ttl, entry)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def clear(self):
+        """Drop the local tier (Redis entries expire on their own)."""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics."""
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "local_entries": len(self._local),
+            "max_local_entries": self.max_entries,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.local_hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+# Singleton instance
+llm_cache = LLMResponseCache()
@@ -4,14 +4,23 @@ Uses OpenAI GPT models to extract and classify tool information.
 """
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 from openai import AsyncOpenAI
 
 from app.core.config import settings
 from app.schemas.tool import ToolExtractionResult
+from app.services.llm_cache import llm_cache
 
 logger = logging.getLogger(__name__)
 
+# Bump a template's version whenever its prompt or post-processing changes,
+# so cached completions for the old prompt are no longer used
+PROMPT_VERSIONS = {
+    "extract": 1,
+    "classify": 1,
+    "tags": 1,
+}
+
 
 EXTRACTION_PROMPT = """You are an AI tool data extraction specialist. Analyze the following website content and extract structured information about the AI/software tool.
 
@@ -86,6 +95,24 @@ Available Categories:
 Return only the category name, nothing else."""
 
 
+TAG_GENERATION_PROMPT = """Generate 5 relevant search tags for this AI tool.
+
+Tool: {name}
+Description: {description}
+Existing tags: {tags}
+
+Return only comma-separated tags, no explanations.
+Focus on: use cases, technologies, industries, features."""
+
+
+def _is_json(content: str) -> bool:
+    try:
+        json.loads(content)
+        return True
+    except (json.JSONDecodeError, TypeError):
+        return False
+
+
 class LLMExtractor:
     """LLM-powered tool data extraction service."""
 
@@ -93,6 +120,34 @@ class LLMExtractor:
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = settings.LLM_MODEL
 
+    async def _complete(
+        self,
+        template: str,
+        messages: List[Dict[str, str]],
+        cacheable: Optional[Callable[[str], bool]] = None,
+        **params
+    ) -> str:
+        """
+        Run a chat completion through the response cache.
+        Only completions that pass cacheable (when given) are stored.
+        """
+        key = llm_cache.make_key(self.model, template, PROMPT_VERSIONS[template], messages, params)
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            **params
+        )
+        content = response.choices[0].message.content or ""
+
+        if content and (cacheable is None or cacheable(content)):
+            tokens = response.usage.total_tokens if response.usage else 0
+            await llm_cache.set(key, content, tokens)
+        return content
+
     async def extract_tool_data(
         self,
         url: str,
@@ -133,19 +188,19 @@ class LLMExtractor:
             )
 
             # Call LLM
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            result_text = await self._complete(
+                "extract",
+                [
                     {"role": "system", "content": "You are a precise data extraction assistant."},
                     {"role": "user", "content": prompt}
                 ],
+                cacheable=_is_json,
                 temperature=0.2,
                 max_tokens=2000,
                 response_format={"type": "json_object"}
             )
 
             # Parse response
-            result_text = response.choices[0].message.content
             result_data = json.loads(result_text)
 
             # Validate and normalize
@@ -186,14 +241,12 @@ class LLMExtractor:
                 tags=", ".join(tags)
             )
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+            category = (await self._complete(
+                "classify",
+                [{"role": "user", "content": prompt}],
                 temperature=0,
                 max_tokens=50
-            )
-
-            category = response.choices[0].message.content.strip()
+            )).strip()
             return category if category else "Other"
 
         except Exception as e:
@@ -208,25 +261,22 @@ class LLMExtractor:
     ) -> List[str]:
         """Generate additional relevant tags."""
         try:
-            prompt = f"""Generate 5 relevant search tags for this AI tool.
-
-Tool: {name}
-Description: {description}
-Existing tags: {', '.join(existing_tags)}
-
-Return only comma-separated tags, no explanations.
-Focus on: use cases, technologies, industries, features."""
+            prompt = TAG_GENERATION_PROMPT.format(
+                name=name,
+                description=description,
+                tags=", ".join(existing_tags)
+            )
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+            content = await self._complete(
+                "tags",
+                [{"role": "user", "content": prompt}],
                 temperature=0.3,
                 max_tokens=100
             )
 
             new_tags = [
                 tag.strip().lower()
-                for tag in response.choices[0].message.content.split(",")
+                for tag in content.split(",")
             ]
             # Combine and dedupe
             all_tags = list(set(existing_tags + new_tags))
@@ -0,0 +1,117 @@
+"""
+Admin dashboard platform statistics.
+All counts are gathered in a single statement (FILTER clauses plus scalar
+subqueries) and served from a snapshot shared through Redis, so dashboard
+polling costs at most one query per staleness interval.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from sqlalchemy import select, func, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.models.tool import Tool, ToolStatus
+from app.models.user import User
+from app.models.category import Category
+from app.models.engagement import Review
+from app.models.analytics import DailyStats
+from app.services.stats_rollup import utc_today
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "admin:platform_stats"
+
+
+class PlatformStatsService:
+    """
+    Snapshot cache for platform statistics.
+
+    A snapshot younger than the staleness bound is served as-is (from memory,
+    then Redis); otherwise one consolidated query rebuilds it. Concurrent
+    requests for a stale snapshot share a single rebuild.
+    """
+
+    def __init__(self):
+        self.max_age = settings.ADMIN_STATS_MAX_AGE_SECONDS
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = asyncio.Lock()
+
+    def _statement(self):
+        tool_counts = select(
+            func.count().label("total_tools"),
+            func.count().filter(Tool.status == ToolStatus.PENDING).label("tools_pending"),
+            func.count().filter(Tool.status == ToolStatus.APPROVED).label("tools_approved"),
+        ).select_from(Tool).subquery()
+
+        today_totals = select(
+            func.coalesce(func.sum(DailyStats.views), 0).label("total_views_today"),
+            func.coalesce(func.sum(DailyStats.clicks), 0).label("total_clicks_today"),
+            func.coalesce(func.sum(DailyStats.saves), 0).label("total_saves_today"),
+            func.coalesce(func.sum(DailyStats.searches), 0).label("total_searches_today"),
+        ).where(
+            DailyStats.stat_type == "platform",
+            DailyStats.entity_id.is_(None),
+            DailyStats.date >= utc_today()
+        ).subquery()
+
+        # Both subqueries yield exactly one row; joining them on true keeps the
+        # FROM clause explicit instead of an implicit cartesian product
+        return select(
+            tool_counts,
+            today_totals,
+            select(func.count()).select_from(User).scalar_subquery().label("total_users"),
+            select(func.count()).select_from(Category).scalar_subquery().label("total_categories"),
+            select(func.count()).select_from(Review).scalar_subquery().label("total_reviews"),
+        ).select_from(tool_counts.join(today_totals, true()))
+
+    @staticmethod
+    def _age(snapshot: Dict[str, Any]) -> float:
+        return time.time() - snapshot["as_of_ts"]
+
+    async def refresh(self, db: AsyncSession) -> Dict[str, Any]:
+        """Recompute the snapshot with one query and publish it."""
+        row = (await db.execute(self._statement())).one()
+        now = datetime.now(timezone.utc)
+        snapshot = {
+            "stats": {key: int(value or 0) for key, value in row._mapping.items()},
+            "as_of": now.isoformat(),
+            "as_of_ts": now.timestamp(),
+        }
+        self._snapshot = snapshot
+
+        if redis_client.is_connected:
+            try:
+                await redis_client.set(SNAPSHOT_KEY, snapshot, ttl=max(int(self.max_age) * 10, 60))
+            except Exception as e:
+                logger.warning(f"Could not publish platform stats snapshot: {e}")
+        return snapshot
+
+    async def get(self, db: AsyncSession, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Return a snapshot no older than max_age seconds (default: configured bound)."""
+        max_age = self.max_age if max_age is None else max_age
+
+        if self._snapshot and self._age(self._snapshot) <= max_age:
+            return self._snapshot
+
+        if redis_client.is_connected:
+            try:
+                shared = await redis_client.get_json(SNAPSHOT_KEY)
+                if shared and self._age(shared) <= max_age:
+                    self._snapshot = shared
+                    return shared
+            except Exception as e:
+                logger.warning(f"Could not read platform stats snapshot: {e}")
+
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if self._snapshot and self._age(self._snapshot) <= max_age:
+                return self._snapshot
+            return await self.refresh(db)
+
+
+# Singleton instance
+platform_stats = PlatformStatsService()
@@ -3,19 +3,40 @@ Ranking algorithm service for tool discovery.
 Implements a weighted multi-factor ranking system.
 """
 import math
+import time
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Sequence
+from datetime import datetime, timezone
 from uuid import UUID
-from sqlalchemy import select, func, and_, or_, desc, asc
+import numpy as np
+from sqlalchemy import select, update, func, text, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.tool import Tool, ToolStatus
-from app.models.analytics import RankingConfig
+from app.models.analytics import RankingConfig, JobCheckpoint
+from app.schemas.tool import ToolListResponse
+from app.services.listing_cache import listing_cache
 from app.core.config import settings
+from app.core.pagination import Page, fetch_keyset_page, count_rows
 
 logger = logging.getLogger(__name__)
 
+# Stand-in for a NULL manual sponsored/featured position (sorts after all others)
+MAX_MANUAL_RANK = 2 ** 31 - 1
+
+# Set-based write-back of one scored chunk
+RANK_SCORE_UPDATE = text("""
+    UPDATE tools SET rank_score = v.score
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:scores AS double precision[])) AS v(id, score)
+    WHERE tools.id = v.id
+""")
+
+# Checkpoint row recording the freshness bucket effective scores were written for
+FRESHNESS_CHECKPOINT = "ranking_freshness"
+# Advisory lock so only one worker materializes a bucket
+FRESHNESS_LOCK_ID = 72_410_001
+
 
 class RankingService:
     """
@@ -45,6 +66,7 @@ class RankingService:
         self.engagement_decay_days = 7
         self.min_reviews_for_score = 5
         self.trending_threshold = 100
+        self._scores_epoch: Optional[int] = None
 
     async def load_config(self, db: AsyncSession):
         """Load ranking configuration from database."""
@@ -72,8 +94,9 @@ class RankingService:
 
     def calculate_rank_score(self, tool: Tool) -> float:
         """
-        Calculate the overall rank score for a tool.
-        Higher score = higher ranking position.
+        Calculate the stored (time-independent) base rank score for a tool.
+        Higher score = higher ranking position. Listings order by this plus
+        the freshness term, materialized in Tool.effective_score.
         """
         score = 0.0
 
@@ -102,9 +125,8 @@ class RankingService:
         review_score = self._calculate_review_score(tool)
         score += review_score * self.weights["reviews"]
 
-        # 6. Freshness score (decay over time)
-        freshness_score = self._calculate_freshness_score(tool)
-        score += freshness_score * self.weights["freshness"]
+        # 6. Freshness is time-dependent and added per freshness bucket
+        #    (see refresh_effective_scores), so it is not stored here
 
         # 7. Trending bonus
         if tool.is_trending:
@@ -154,134 +176,431 @@ class RankingService:
         # Scale to 0-10 range
         return (bayesian_avg / 5.0) * 10
 
-    def _calculate_freshness_score(self, tool: Tool) -> float:
+    def freshness_epoch(self, now: Optional[datetime] = None) -> int:
         """
-        Calculate freshness score with exponential decay.
-        New tools get a boost that decays over time.
+        Reference time for query-time freshness, truncated to the bucket size
+        so orderings (and keyset cursors) are stable within a bucket.
         """
-        if not tool.created_at:
-            return 0.0
+        bucket = settings.RANKING_FRESHNESS_BUCKET_SECONDS
+        epoch = int((now or datetime.now(timezone.utc)).timestamp())
+        return epoch - epoch % bucket
 
-        days_old = (datetime.utcnow() - tool.created_at).days
+    def freshness_expression(self, epoch: Optional[int] = None):
+        """
+        Freshness score (0-10, halving every freshness_decay_days) as of a
+        bucket's reference time.
+        """
+        epoch = epoch if epoch is not None else self.freshness_epoch()
+        days_old = func.greatest(
+            func.floor((literal(epoch) - func.extract("epoch", Tool.created_at)) / 86400),
+            0
+        )
+        decay_rate = math.log(2) / self.freshness_decay_days
+        return func.coalesce(10.0 * func.exp(-decay_rate * days_old), 0.0)
+
+    def effective_score_expression(self, epoch: Optional[int] = None):
+        """Stored base score plus the freshness term."""
+        return (
+            func.coalesce(Tool.rank_score, 0.0) +
+            self.weights["freshness"] * self.freshness_expression(epoch)
+        )
+
+    async def refresh_effective_scores(
+        self,
+        db: AsyncSession,
+        tool_ids: Optional[List[UUID]] = None,
+        epoch: Optional[int] = None
+    ) -> int:
+        """
+        Write rank_score + freshness into Tool.effective_score, for the given
+        tools or all of them. Only rows whose value moved are rewritten.
+        The caller commits. Returns the number of rows updated.
+        """
+        # Sessions don't autoflush: push pending rank_score changes first so
+        # the UPDATE reads the new values, not the stored ones
+        await db.flush()
+        score = self.effective_score_expression(epoch)
+        stmt = update(Tool).where(Tool.effective_score.is_distinct_from(score))
+        if tool_ids:
+            stmt = stmt.where(Tool.id.in_(tool_ids))
+        result = await db.execute(
+            stmt.values(effective_score=score).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
 
-        if days_old <= 0:
-            return 10.0  # Max freshness for new tools
+    async def ensure_effective_scores(self, db: AsyncSession):
+        """
+        Materialize effective scores once per freshness bucket.
 
-        # Exponential decay
-        decay_rate = math.log(2) / self.freshness_decay_days  # Half-life
-        freshness = 10.0 * math.exp(-decay_rate * days_old)
+        The first listing request after a bucket boundary (in any worker)
+        rewrites the scores whose freshness moved and records the bucket in
+        job_checkpoints; later requests skip this after one in-process check.
+        """
+        epoch = self.freshness_epoch()
+        if self._scores_epoch == epoch:
+            return
 
-        return max(0.0, freshness)
+        try:
+            checkpoint = await db.get(JobCheckpoint, FRESHNESS_CHECKPOINT)
+            if checkpoint is None or checkpoint.position != str(epoch):
+                locked = (await db.execute(
+                    select(func.pg_try_advisory_xact_lock(FRESHNESS_LOCK_ID))
+                )).scalar()
+                if not locked:
+                    # Another worker is writing this bucket; serve the current scores
+                    await db.rollback()
+                    return
+
+                updated = await self.refresh_effective_scores(db, epoch=epoch)
+                stmt = pg_insert(JobCheckpoint).values(
+                    name=FRESHNESS_CHECKPOINT, status="completed", position=str(epoch), processed=updated
+                )
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[JobCheckpoint.name],
+                    set_={
+                        "status": stmt.excluded.status,
+                        "position": stmt.excluded.position,
+                        "processed": stmt.excluded.processed,
+                        "updated_at": func.now(),
+                    },
+                ))
+                await db.commit()
+                logger.info(f"Materialized effective scores for bucket {epoch} ({updated} rows changed)")
+            self._scores_epoch = epoch
+        except Exception as e:
+            logger.warning(f"Could not refresh effective scores: {e}")
+            await db.rollback()
 
     async def update_tool_ranking(self, db: AsyncSession, tool: Tool) -> float:
         """Update and save a tool's rank score."""
         new_score = self.calculate_rank_score(tool)
         tool.rank_score = new_score
+        await self.refresh_effective_scores(db, [tool.id])
         await db.commit()
         return new_score
 
-    async def bulk_update_rankings(self, db: AsyncSession, tool_ids: Optional[List[UUID]] = None):
+    # Columns streamed for bulk scoring (never the heavy text/JSON columns)
+    _SCORING_COLUMNS = (
+        Tool.id,
+        func.coalesce(Tool.is_sponsored, False).label("is_sponsored"),
+        func.coalesce(Tool.sponsored_rank, 0).label("sponsored_rank"),
+        func.coalesce(Tool.is_featured, False).label("is_featured"),
+        func.coalesce(Tool.featured_rank, 0).label("featured_rank"),
+        func.coalesce(Tool.is_internal, False).label("is_internal"),
+        func.coalesce(Tool.is_trending, False).label("is_trending"),
+        func.coalesce(Tool.is_verified, False).label("is_verified"),
+        func.coalesce(Tool.view_count, 0).label("view_count"),
+        func.coalesce(Tool.click_count, 0).label("click_count"),
+        func.coalesce(Tool.save_count, 0).label("save_count"),
+        func.coalesce(Tool.review_count, 0).label("review_count"),
+        func.coalesce(Tool.average_rating, 0.0).label("average_rating"),
+    )
+
+    def score_batch(self, rows: Sequence[Any]) -> np.ndarray:
         """
-        Bulk update rankings for multiple tools.
-        If no IDs provided, updates all approved tools.
+        Vectorized calculate_rank_score over rows of _SCORING_COLUMNS.
+        Produces the same scores as the per-tool path.
         """
-        query = select(Tool).where(Tool.status == ToolStatus.APPROVED)
-        if tool_ids:
-            query = query.where(Tool.id.in_(tool_ids))
+        cols = list(zip(*rows))
+
+        is_sponsored = np.array(cols[1], dtype=bool)
+        sponsored_rank = np.array(cols[2], dtype=np.float64)
+        is_featured = np.array(cols[3], dtype=bool)
+        featured_rank = np.array(cols[4], dtype=np.float64)
+        is_internal = np.array(cols[5], dtype=bool)
+        is_trending = np.array(cols[6], dtype=bool)
+        is_verified = np.array(cols[7], dtype=bool)
+        views = np.array(cols[8], dtype=np.float64)
+        clicks = np.array(cols[9], dtype=np.float64)
+        saves = np.array(cols[10], dtype=np.float64)
+        review_count = np.array(cols[11], dtype=np.float64)
+        average_rating = np.array(cols[12], dtype=np.float64)
+
+        score = np.zeros(len(rows), dtype=np.float64)
+
+        # 1-3. Sponsored, featured and internal boosts (manual rank 0 = unset)
+        score += np.where(
+            is_sponsored,
+            self.weights["sponsored"] + np.where(sponsored_rank != 0, 1000 - sponsored_rank, 0.0),
+            0.0
+        )
+        score += np.where(
+            is_featured,
+            self.weights["featured"] + np.where(featured_rank != 0, 500 - featured_rank, 0.0),
+            0.0
+        )
+        score += np.where(is_internal, self.weights["internal"], 0.0)
 
-        result = await db.execute(query)
-        tools = result.scalars().all()
+        # 4. Engagement (log scaled)
+        raw_engagement = views * 0.1 + clicks * 1.0 + saves * 2.0
+        engagement = np.where(
+            raw_engagement > 0, np.log10(np.maximum(raw_engagement, 0) + 1) * 10, 0.0
+        )
+        score += engagement * self.weights["engagement"]
+
+        # 5. Reviews (partial score below the threshold, Bayesian average above)
+        min_reviews = self.min_reviews_for_score
+        prior_mean = 3.5
+        with np.errstate(divide="ignore", invalid="ignore"):
+            partial = (average_rating / 5.0) * (review_count / min_reviews) * 10 if min_reviews else 0.0
+            bayesian = (
+                (average_rating * review_count + prior_mean * min_reviews) /
+                (review_count + min_reviews)
+            )
+        reviews = np.where(review_count < min_reviews, partial, (bayesian / 5.0) * 10)
+        score += np.nan_to_num(reviews) * self.weights["reviews"]
 
-        for tool in tools:
-            tool.rank_score = self.calculate_rank_score(tool)
+        # 7-8. Trending and verified bonuses
+        score += np.where(is_trending, self.weights["engagement"] * 0.5, 0.0)
+        score += np.where(is_verified, 5.0, 0.0)
 
-        await db.commit()
-        logger.info(f"Updated rankings for {len(tools)} tools")
+        return np.round(score, 4)
 
-    async def get_ranked_tools(
+    async def bulk_update_rankings(
         self,
         db: AsyncSession,
-        category_id: Optional[UUID] = None,
-        limit: int = 20,
-        offset: int = 0,
-        ranking_type: str = "default"
-    ) -> List[Tool]:
+        tool_ids: Optional[List[UUID]] = None,
+        invalidate_listings: bool = True,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
-        Get tools sorted by ranking with optional filters.
+        Bulk update rankings for multiple tools.
+        If no IDs provided, updates all approved tools.
+
+        Tools are streamed in primary-key order in chunks of only the ranking
+        columns, scored with score_batch and written back with one
+        UPDATE ... FROM unnest(...) per chunk. Cached listings are invalidated
+        unless invalidate_listings is False (engagement flushes rely on the
+        listing TTL instead).
+
+        Returns throughput stats for the run.
+        """
+        batch_size = batch_size or settings.RANKING_BATCH_SIZE
+        started = time.perf_counter()
+        updated = 0
+        chunks = 0
+        last_id: Optional[UUID] = None
+
+        while True:
+            query = select(*self._SCORING_COLUMNS).where(Tool.status == ToolStatus.APPROVED)
+            if tool_ids:
+                query = query.where(Tool.id.in_(tool_ids))
+            if last_id is not None:
+                query = query.where(Tool.id > last_id)
+            query = query.order_by(Tool.id).limit(batch_size)
+
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            scores = self.score_batch(rows)
+            await db.execute(RANK_SCORE_UPDATE, {"ids": ids, "scores": scores.tolist()})
+            await self.refresh_effective_scores(db, ids)
+            await db.commit()
+
+            updated += len(rows)
+            chunks += 1
+            last_id = ids[-1]
+            if len(rows) < batch_size:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            "tools_updated": updated,
+            "chunks": chunks,
+            "elapsed_seconds": round(elapsed, 3),
+            "tools_per_second": round(updated / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info(
+            f"Updated rankings for {updated} tools in {chunks} chunks "
+            f"({stats['elapsed_seconds']}s, {stats['tools_per_second']} tools/s)"
+        )
+
+        if invalidate_listings:
+            await listing_cache.invalidate()
+        return stats
+
+    def ranking_sort_keys(self, ranking_type: str = "default") -> List[Any]:
+        """
+        Sort keys for a ranking type, all applied descending and ending in
+        Tool.id so every listing has a total order usable for keyset paging.
+        Score-based orderings use the materialized effective score, which
+        ix_tools_ranking and ix_tools_category_rank serve. Keyset cursors
+        carry score values, so a tool whose score changes between pages (on
+        a rank update, or at a bucket boundary for tools crossing a day of
+        age) can move across the cursor, as with any score-ordered listing.
 
         Ranking types:
         - default: Overall rank score
-        - sponsored: Sponsored first, then by rank
-        - featured: Featured first, then by rank
+        - sponsored: Sponsored first (by manual position), then by rank
+        - featured: Featured first (by manual position), then by rank
         - trending: Trending tools first
         - newest: By creation date
         - top_rated: By average rating
         """
-        query = select(Tool).where(Tool.status == ToolStatus.APPROVED)
-
-        if category_id:
-            query = query.where(Tool.category_id == category_id)
+        score = Tool.effective_score
 
-        # Apply ranking type ordering
         if ranking_type == "sponsored":
-            query = query.order_by(
-                desc(Tool.is_sponsored),
-                Tool.sponsored_rank.asc().nullslast(),
-                desc(Tool.rank_score)
-            )
+            # Manual positions ascend with NULLs last; negate so the key descends
+            return [
+                func.coalesce(Tool.is_sponsored, False),
+                -func.coalesce(Tool.sponsored_rank, MAX_MANUAL_RANK),
+                score,
+                Tool.id,
+            ]
         elif ranking_type == "featured":
-            query = query.order_by(
-                desc(Tool.is_featured),
-                Tool.featured_rank.asc().nullslast(),
-                desc(Tool.rank_score)
-            )
+            return [
+                func.coalesce(Tool.is_featured, False),
+                -func.coalesce(Tool.featured_rank, MAX_MANUAL_RANK),
+                score,
+                Tool.id,
+            ]
         elif ranking_type == "trending":
-            query = query.order_by(
-                desc(Tool.is_trending),
-                desc(Tool.rank_score)
-            )
+            return [func.coalesce(Tool.is_trending, False), score, Tool.id]
         elif ranking_type == "newest":
-            query = query.order_by(desc(Tool.created_at))
+            return [Tool.created_at, Tool.id]
         elif ranking_type == "top_rated":
-            query = query.order_by(
-                desc(Tool.average_rating),
-                desc(Tool.review_count)
-            )
+            # Both columns are nullable; a NULL would break the row comparison
+            return [
+                func.coalesce(Tool.average_rating, 0.0),
+                func.coalesce(Tool.review_count, 0),
+                Tool.id,
+            ]
         else:  # default
-            query = query.order_by(desc(Tool.rank_score))
+            return [score, Tool.id]
 
-        query = query.offset(offset).limit(limit)
+    def _listing_query(self, category_id: Optional[UUID] = None):
+        query = select(Tool).where(Tool.status == ToolStatus.APPROVED)
+        if category_id:
+            query = query.where(Tool.category_id == category_id)
+        return query
 
-        result = await db.execute(query)
-        return list(result.scalars().all())
+    async def get_ranked_tools(
+        self,
+        db: AsyncSession,
+        category_id: Optional[UUID] = None,
+        limit: int = 20,
+        offset: int = 0,
+        ranking_type: str = "default"
+    ) -> List[Tool]:
+        """
+        Get tools sorted by ranking with optional filters.
+        See ranking_sort_keys for the available ranking types.
+        """
+        await self.ensure_effective_scores(db)
+        tools, _, _ = await fetch_keyset_page(
+            db,
+            self._listing_query(category_id),
+            self.ranking_sort_keys(ranking_type),
+            limit,
+            offset=offset
+        )
+        return tools
 
-    async def detect_trending(self, db: AsyncSession) -> List[UUID]:
+    async def count_ranked_tools(
+        self,
+        db: AsyncSession,
+        category_id: Optional[UUID] = None
+    ) -> int:
+        """Count approved tools in a listing."""
+        query = select(func.count(Tool.id)).where(Tool.status == ToolStatus.APPROVED)
+        if category_id:
+            query = query.where(Tool.category_id == category_id)
+        return (await db.execute(query)).scalar() or 0
+
+    async def _get_listing_snapshot(
+        self,
+        db: AsyncSession,
+        category_id: Optional[UUID],
+        ranking_type: str
+    ) -> Dict[str, Any]:
+        """Load (or build and store) the cached snapshot for a listing."""
+        key = listing_cache.make_key(ranking_type, category_id, self.freshness_epoch())
+        snapshot = await listing_cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        async with listing_cache.lock_for(key):
+            snapshot = await listing_cache.get(key)
+            if snapshot is None:
+                tools, cursors, _ = await fetch_keyset_page(
+                    db,
+                    self._listing_query(category_id),
+                    self.ranking_sort_keys(ranking_type),
+                    listing_cache.max_items
+                )
+                total = await self.count_ranked_tools(db, category_id)
+                snapshot = listing_cache.make_snapshot(
+                    [ToolListResponse.model_validate(t).model_dump(mode="json") for t in tools],
+                    cursors,
+                    total
+                )
+                await listing_cache.set(key, snapshot)
+        return snapshot
+
+    async def get_ranked_listing(
+        self,
+        db: AsyncSession,
+        category_id: Optional[UUID] = None,
+        limit: int = 20,
+        offset: int = 0,
+        ranking_type: str = "default",
+        cursor: Optional[str] = None,
+        count_mode: str = "exact"
+    ) -> Page:
         """
-        Detect tools that should be marked as trending.
-        Based on recent engagement growth.
+        Get a page of a ranked listing as serialized ToolListResponse payloads.
+
+        Pages (by offset or cursor) inside the cached snapshot are sliced from
+        it; anything deeper is fetched with a keyset query, so its cost does
+        not grow with depth.
         """
-        # This would typically compare recent vs historical engagement
-        # Simplified version: tools with high recent clicks
-        cutoff_date = datetime.utcnow() - timedelta(days=self.engagement_decay_days)
-
-        query = select(Tool).where(
-            and_(
-                Tool.status == ToolStatus.APPROVED,
-                Tool.click_count >= self.trending_threshold
-            )
+        await self.ensure_effective_scores(db)
+        if listing_cache.enabled and (cursor or offset < listing_cache.max_items):
+            snapshot = await self._get_listing_snapshot(db, category_id, ranking_type)
+            items, total = snapshot["items"], snapshot["total"]
+            cursors = snapshot.get("cursors", [])
+
+            start: Optional[int] = offset
+            if cursor:
+                try:
+                    start = cursors.index(cursor) + 1
+                except ValueError:
+                    start = None  # Cursor from beyond the snapshot
+
+            complete = len(items) >= total
+            if start is not None and len(cursors) == len(items) and (
+                start + limit <= len(items) or complete
+            ):
+                end = min(start + limit, len(items))
+                return Page(
+                    items=items[start:end],
+                    total=total,
+                    next_cursor=cursors[end - 1] if start < end < total else None
+                )
+
+        query = self._listing_query(category_id)
+        tools, cursors, has_more = await fetch_keyset_page(
+            db, query, self.ranking_sort_keys(ranking_type), limit, cursor, offset
         )
+        total, is_estimate = await count_rows(db, query, count_mode)
 
-        result = await db.execute(query)
-        trending_tools = result.scalars().all()
+        return Page(
+            items=[ToolListResponse.model_validate(t).model_dump(mode="json") for t in tools],
+            total=total,
+            next_cursor=cursors[-1] if has_more else None,
+            total_is_estimate=is_estimate
+        )
 
-        trending_ids = []
-        for tool in trending_tools:
-            if not tool.is_trending:
-                tool.is_trending = True
-                trending_ids.append(tool.id)
+    async def detect_trending(self, db: AsyncSession) -> List[UUID]:
+        """
+        Refresh the trending set from recent engagement velocity.
+        Returns the tools that became trending. See TrendingEngine.
+        """
+        from app.services.trending import trending_engine
 
-        await db.commit()
-        return trending_ids
+        return await trending_engine.refresh(db)
 
 
 # Singleton instance
@@ -3,10 +3,17 @@ Web scraper service for extracting content from tool websites.
 Uses lightweight HTTP fetching with BeautifulSoup (no Playwright).
 """
 import asyncio
+import hashlib
+import json
+import socket
+import time
 import httpx
-from typing import Optional, Dict, Any
+import httpcore
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString, CData, Tag
 import re
 import logging
 
@@ -14,9 +21,111 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Subtrees dropped from the cleaned page
+SKIP_TAGS = frozenset({
+    "script", "style", "nav", "footer", "header",
+    "aside", "iframe", "noscript", "form"
+})
+# Common ad/tracking containers
+BOILERPLATE_CLASS = re.compile(
+    r"(ad|ads|advertisement|tracking|analytics|cookie|banner|popup|modal|sidebar)", re.I
+)
+FAVICON_REL = re.compile(r"(icon|apple-touch-icon)", re.I)
+PRICING = re.compile(r"pricing", re.I)
+# Main content area, in order of preference
+CONTAINER_TAGS = {"main": "main", "article": "article", "body": "body"}
+MAIN_CONTAINERS = ("main", "article", "content", "body")
+TEXT_TYPES = (NavigableString, CData)
+RAW_TEXT_LIMIT = 15000
+PRICING_TEXT_LIMIT = 2000
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend that caches host resolution for a TTL.
+
+    Connections are opened to the cached address; TLS still verifies and
+    sends SNI for the original hostname, which httpcore passes separately.
+    """
+
+    def __init__(self, ttl: float, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.ttl = ttl
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[List[str], float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.connects = 0
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        cached = self._cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            self.hits += 1
+            return cached[0]
+
+        self.misses += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[key] = (addresses, time.monotonic() + self.ttl)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        self.connects += 1
+        try:
+            addresses = await self._resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout,
+                    local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        # Every cached address failed; it may be stale
+        self._cache.pop((host, port), None)
+        raise last_error or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+@dataclass
+class FetchResult:
+    """A fetched page and its cache validators."""
+    url: str
+    status_code: int
+    html: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
 
 class WebScraper:
-    """Web scraper using static HTML fetching."""
+    """
+    Web scraper using static HTML fetching.
+
+    All fetches share one pooled httpx client, so repeated requests to a host
+    reuse keep-alive (or HTTP/2) connections and cached DNS. The client is
+    created on first use and closed from the application lifespan.
+    """
 
     def __init__(self):
         self.timeout = settings.SCRAPER_TIMEOUT
@@ -27,173 +136,389 @@ class WebScraper:
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
             "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
         }
+        self.http2 = settings.SCRAPER_HTTP2
+        self.max_per_host = settings.SCRAPER_MAX_CONNECTIONS_PER_HOST
+        self.limits = httpx.Limits(
+            max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SCRAPER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.SCRAPER_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        self.dns = CachingDNSBackend(ttl=settings.SCRAPER_DNS_CACHE_TTL_SECONDS)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+        # Counters
+        self.requests = 0
+        self.failures = 0
+        self.not_modified = 0
+        self.html_truncated = 0
+
+        # HTML parsing pool (process | thread | inline)
+        self.parse_executor = settings.SCRAPER_PARSE_EXECUTOR
+        self.parse_workers = settings.SCRAPER_PARSE_WORKERS
+        self.max_html_bytes = settings.SCRAPER_MAX_HTML_BYTES
+        self._parse_pool: Optional[Executor] = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("SCRAPER_HTTP2 is set but h2 is not installed - using HTTP/1.1")
+                http2 = False
+
+        transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=http2)
+        # httpx does not expose the network backend; swap in the DNS-caching one
+        transport._pool._network_backend = self.dns
+
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=self.timeout,
+            headers=self.headers,
+            follow_redirects=True,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def close(self):
+        """Close the shared client, its pooled connections and the parse pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.dns.clear()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return slot
+
+    async def fetch_page(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Optional[FetchResult]:
+        """
+        Fetch a page over the shared connection pool.
+        When validators from a previous fetch are given the request is
+        conditional; an unchanged page comes back as a 304 result without a body.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
 
-    async def fetch(self, url: str) -> Optional[str]:
-        """Fetch URL content using httpx."""
+        slot = self._host_slot(url)
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(
-                    timeout=self.timeout,
-                    follow_redirects=True
-                ) as client:
-                    response = await client.get(url, headers=self.headers)
+                async with slot:
+                    self.requests += 1
+                    response = await self.client.get(url, headers=headers)
+                    # Checked first: raise_for_status() treats a 304 as an error
+                    if response.status_code == 304:
+                        self.not_modified += 1
+                        return FetchResult(
+                            url=url,
+                            status_code=304,
+                            etag=response.headers.get("etag") or etag,
+                            last_modified=response.headers.get("last-modified") or last_modified,
+                        )
                     response.raise_for_status()
-                    return response.text
+                    return FetchResult(
+                        url=url,
+                        status_code=response.status_code,
+                        html=response.text,
+                        etag=response.headers.get("etag"),
+                        last_modified=response.headers.get("last-modified"),
+                    )
             except httpx.HTTPError as e:
+                self.failures += 1
                 logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
                 if attempt < self.max_retries - 1:
                     await asyncio.sleep(2 ** attempt)
                 continue
         return None
 
+    async def fetch(self, url: str) -> Optional[str]:
+        """Fetch URL content."""
+        result = await self.fetch_page(url)
+        return result.html if result else None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool, per-host and DNS cache statistics."""
+        connections = []
+        if self._client is not None and not self._client.is_closed:
+            connections = self._client._transport._pool.connections
+
+        idle = sum(1 for c in connections if c.is_idle())
+        http2 = sum(1 for c in connections if c.info().startswith("HTTP/2"))
+        lookups = self.dns.hits + self.dns.misses
+
+        return {
+            "open": self._client is not None and not self._client.is_closed,
+            "http2_enabled": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "max_connections_per_host": self.max_per_host,
+            "connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "http2_connections": http2,
+            "hosts_at_cap": sum(1 for slot in self._host_slots.values() if slot.locked()),
+            "requests": self.requests,
+            "failures": self.failures,
+            "not_modified": self.not_modified,
+            "connections_opened": self.dns.connects,
+            "dns_cache_entries": len(self.dns),
+            "dns_hit_rate": round(self.dns.hits / lookups, 4) if lookups else 0.0,
+            "parse_executor": self.parse_executor,
+            "html_truncated": self.html_truncated,
+        }
+
+    # ------------------------------------------------------------------
+    # HTML processing
+    # ------------------------------------------------------------------
+
+    def _executor(self) -> Optional[Executor]:
+        """Lazily create the parse pool; None means parse inline."""
+        if self._parse_pool is None and self.parse_executor != "inline":
+            if self.parse_executor == "process":
+                try:
+                    self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+                except (OSError, NotImplementedError) as e:
+                    # Serverless runtimes often lack the semaphores process pools need
+                    logger.warning(f"Process pool unavailable ({e}) - parsing HTML in threads")
+                    self.parse_executor = "thread"
+            if self._parse_pool is None:
+                self._parse_pool = ThreadPoolExecutor(
+                    max_workers=self.parse_workers, thread_name_prefix="html-parse"
+                )
+        return self._parse_pool
+
+    async def clean_html_async(self, html: str) -> Dict[str, Any]:
+        """clean_html off the event loop, in the configured parse pool."""
+        # Truncate before handing off so oversized pages are never pickled whole
+        html = self._limit_html(html)
+        executor = self._executor()
+        if executor is None:
+            return self.clean_html(html)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, _clean_html, html
+            )
+        except BrokenExecutor:
+            # A worker process died; start a fresh pool next time
+            self._parse_pool = None
+            raise
+
+    def _limit_html(self, html: str) -> str:
+        """Cut html to SCRAPER_MAX_HTML_BYTES (UTF-8), counting truncations."""
+        if len(html) <= self.max_html_bytes:
+            return html
+        encoded = html.encode("utf-8")
+        if len(encoded) <= self.max_html_bytes:
+            return html
+        self.html_truncated += 1
+        return encoded[:self.max_html_bytes].decode("utf-8", errors="ignore")
+
     def clean_html(self, html: str) -> Dict[str, Any]:
         """
         Clean HTML and extract meaningful content.
-        Removes boilerplate (nav, footer, ads, etc.)
+        Boilerplate (nav, footer, ads, etc.) is skipped, and metadata, main
+        content, links, pricing and JSON-LD are collected in one pass over
+        the tree. Input beyond SCRAPER_MAX_HTML_BYTES is ignored.
         """
+        html = self._limit_html(html)
         soup = BeautifulSoup(html, "lxml")
 
-        # Remove unwanted elements
-        for element in soup.find_all([
-            "script", "style", "nav", "footer", "header",
-            "aside", "iframe", "noscript", "form"
-        ]):
-            element.decompose()
+        metadata: Dict[str, Any] = {}
+        structured: Dict[str, Any] = {}
+        links: Dict[str, str] = {}
+        text: List[str] = []
+        text_length = 0
+
+        # First main / article / #content / body element; blocks inside each
+        # are tagged with the containers they sit in
+        containers: Dict[str, Tag] = {}
+        active: Dict[str, bool] = {}
+        headings: List[Tuple[Dict[str, bool], Dict[str, str]]] = []
+        paragraphs: List[Tuple[Dict[str, bool], str]] = []
+        lists: List[Tuple[Dict[str, bool], List[str]]] = []
+        # First element whose id (or class) mentions pricing; its visible text
+        # is gathered during the walk so skipped subtrees stay out of it
+        pricing: Dict[str, Tag] = {}
+        pricing_active: Dict[str, bool] = {}
+        pricing_text: Dict[str, List[str]] = {"id": [], "class": []}
+        pricing_length: Dict[str, int] = {"id": 0, "class": 0}
+
+        stack: List[Tuple[Any, bool]] = [(soup, False)]
+        while stack:
+            node, leaving = stack.pop()
+
+            if leaving:
+                for name, container in containers.items():
+                    if container is node:
+                        active[name] = False
+                for kind, section in pricing.items():
+                    if section is node:
+                        pricing_active[kind] = False
+                continue
 
-        # Remove common ad/tracking divs
-        for div in soup.find_all(["div", "section"], class_=re.compile(
-            r"(ad|ads|advertisement|tracking|analytics|cookie|banner|popup|modal|sidebar)",
-            re.I
-        )):
-            div.decompose()
+            if isinstance(node, NavigableString):
+                if type(node) in TEXT_TYPES:
+                    stripped = node.strip()
+                    if stripped and text_length < RAW_TEXT_LIMIT:
+                        text.append(stripped)
+                        text_length += len(stripped) + 1
+                    if stripped:
+                        for kind, inside in pricing_active.items():
+                            if inside and pricing_length[kind] < PRICING_TEXT_LIMIT:
+                                pricing_text[kind].append(stripped)
+                                pricing_length[kind] += len(stripped) + 1
+                continue
+            if not isinstance(node, Tag):
+                continue
 
-        # Extract metadata
-        metadata = self._extract_metadata(soup)
+            name = node.name
+            if name in SKIP_TAGS:
+                if name == "script" and node.get("type") == "application/ld+json" and "schema" not in structured:
+                    self._collect_json_ld(node, structured)
+                continue
+            classes = node.get("class") or []
+            if name in ("div", "section") and any(BOILERPLATE_CLASS.search(c) for c in classes):
+                continue
 
-        # Extract main content
-        main_content = self._extract_main_content(soup)
+            if name == "title" and "title" not in metadata:
+                metadata["title"] = node.string.strip() if node.string else ""
+            elif name == "meta":
+                self._collect_meta(node, metadata)
+            elif name == "link" and "favicon" not in metadata:
+                if any(FAVICON_REL.search(rel) for rel in node.get("rel") or []):
+                    metadata["favicon"] = node.get("href")
+            elif name == "a" and node.get("href"):
+                self._classify_link(node, links)
+            elif name in ("h1", "h2", "h3"):
+                heading = node.get_text(strip=True)
+                if heading:
+                    headings.append((dict(active), {"level": name, "text": heading}))
+            elif name == "p":
+                paragraph = node.get_text(strip=True)
+                if len(paragraph) > 50:  # Filter short paragraphs
+                    paragraphs.append((dict(active), paragraph))
+            elif name in ("ul", "ol"):
+                items = [li.get_text(strip=True) for li in node.find_all("li")]
+                if 3 <= len(items) <= 20:  # Reasonable feature list
+                    lists.append((dict(active), items))
+
+            container = CONTAINER_TAGS.get(name)
+            if node.get("id") == "content":
+                container = "content"
+            if container and container not in containers:
+                containers[container] = node
+                active[container] = True
+
+            if "id" not in pricing and PRICING.search(node.get("id") or ""):
+                pricing["id"] = node
+                pricing_active["id"] = True
+            if "class" not in pricing and any(PRICING.search(c) for c in classes):
+                pricing["class"] = node
+                pricing_active["class"] = True
+
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.contents))
+
+        main_content: Dict[str, Any] = {}
+        main = next((c for c in MAIN_CONTAINERS if c in containers), None)
+        if main:
+            main_content["headings"] = [h for inside, h in headings if inside.get(main)][:20]
+            main_content["paragraphs"] = [p for inside, p in paragraphs if inside.get(main)][:30]
+            main_content["lists"] = [items for inside, items in lists if inside.get(main)][:10]
+        main_content["links"] = links
 
-        # Extract structured data
-        structured_data = self._extract_structured_data(soup)
+        pricing_kind = "id" if "id" in pricing else "class" if "class" in pricing else None
+        if pricing_kind:
+            main_content["pricing_text"] = "\n".join(pricing_text[pricing_kind])[:PRICING_TEXT_LIMIT]
 
         return {
             "metadata": metadata,
             "main_content": main_content,
-            "structured_data": structured_data,
-            "raw_text": soup.get_text(separator="\n", strip=True)[:15000],
+            "structured_data": structured,
+            "raw_text": "\n".join(text)[:RAW_TEXT_LIMIT],
         }
 
-    def _extract_metadata(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Extract page metadata."""
-        metadata = {}
-
-        # Title
-        if soup.title:
-            metadata["title"] = soup.title.string.strip() if soup.title.string else ""
-
-        # Meta tags
-        for meta in soup.find_all("meta"):
-            name = meta.get("name", meta.get("property", "")).lower()
-            content = meta.get("content", "")
-
-            if name in ["description", "og:description", "twitter:description"]:
-                metadata.setdefault("description", content)
-            elif name in ["og:title", "twitter:title"]:
-                metadata.setdefault("og_title", content)
-            elif name in ["og:image", "twitter:image"]:
-                metadata.setdefault("og_image", content)
-            elif name == "keywords":
-                metadata["keywords"] = [k.strip() for k in content.split(",")]
-
-        # Favicon / Logo
-        for link in soup.find_all("link", rel=re.compile(r"(icon|apple-touch-icon)", re.I)):
-            metadata.setdefault("favicon", link.get("href"))
-            break
-
-        return metadata
-
-    def _extract_main_content(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Extract main page content."""
-        content = {}
-
-        # Try to find main content area
-        main = soup.find("main") or soup.find("article") or soup.find(id="content")
-        if not main:
-            main = soup.find("body")
-
-        if main:
-            # Extract headings
-            headings = []
-            for h in main.find_all(["h1", "h2", "h3"]):
-                text = h.get_text(strip=True)
-                if text:
-                    headings.append({"level": h.name, "text": text})
-            content["headings"] = headings[:20]
-
-            # Extract paragraphs
-            paragraphs = []
-            for p in main.find_all("p"):
-                text = p.get_text(strip=True)
-                if len(text) > 50:  # Filter short paragraphs
-                    paragraphs.append(text)
-            content["paragraphs"] = paragraphs[:30]
-
-            # Extract lists (often feature lists)
-            lists = []
-            for ul in main.find_all(["ul", "ol"]):
-                items = [li.get_text(strip=True) for li in ul.find_all("li")]
-                if 3 <= len(items) <= 20:  # Reasonable feature list
-                    lists.append(items)
-            content["lists"] = lists[:10]
-
-        # Extract links
-        links = {}
-        for a in soup.find_all("a", href=True):
-            href = a.get("href", "").lower()
-            text = a.get_text(strip=True).lower()
-
-            if "github" in href:
-                links["github"] = a["href"]
-            elif "twitter" in href or "x.com" in href:
-                links["twitter"] = a["href"]
-            elif "linkedin" in href:
-                links["linkedin"] = a["href"]
-            elif "discord" in href:
-                links["discord"] = a["href"]
-            elif "docs" in href or "documentation" in text:
-                links["docs"] = a["href"]
-            elif "demo" in href or "demo" in text:
-                links["demo"] = a["href"]
-
-        content["links"] = links
-
-        # Extract pricing info
-        pricing_section = soup.find(id=re.compile(r"pricing", re.I)) or \
-                         soup.find(class_=re.compile(r"pricing", re.I))
-        if pricing_section:
-            content["pricing_text"] = pricing_section.get_text(separator="\n", strip=True)[:2000]
-
-        return content
-
-    def _extract_structured_data(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        """Extract JSON-LD and other structured data."""
-        structured = {}
-
-        for script in soup.find_all("script", type="application/ld+json"):
-            try:
-                import json
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    schema_type = data.get("@type", "")
-                    if schema_type in ["SoftwareApplication", "WebApplication", "Product"]:
-                        structured["schema"] = data
-                        break
-            except (json.JSONDecodeError, TypeError):
-                continue
-
-        return structured
+    def content_hash(self, cleaned: Dict[str, Any]) -> str:
+        """
+        Hash of the content extraction depends on, with whitespace and key
+        order normalized, so cosmetic page changes do not count as changes.
+        raw_text is left out: it carries footers, dates and other noise.
+        """
+        content = {
+            "metadata": cleaned.get("metadata", {}),
+            "main_content": cleaned.get("main_content", {}),
+            "structured_data": cleaned.get("structured_data", {}),
+        }
+        normalized = re.sub(r"\s+", " ", json.dumps(content, sort_keys=True, ensure_ascii=False))
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _collect_meta(self, meta: Tag, metadata: Dict[str, Any]):
+        """Page metadata from a meta tag."""
+        name = meta.get("name", meta.get("property", "")).lower()
+        content = meta.get("content", "")
+
+        if name in ["description", "og:description", "twitter:description"]:
+            metadata.setdefault("description", content)
+        elif name in ["og:title", "twitter:title"]:
+            metadata.setdefault("og_title", content)
+        elif name in ["og:image", "twitter:image"]:
+            metadata.setdefault("og_image", content)
+        elif name == "keywords":
+            metadata["keywords"] = [k.strip() for k in content.split(",")]
+
+    def _classify_link(self, a: Tag, links: Dict[str, str]):
+        """Social, docs and demo links; later links win."""
+        href = a["href"].lower()
+        text = a.get_text(strip=True).lower()
+
+        if "github" in href:
+            links["github"] = a["href"]
+        elif "twitter" in href or "x.com" in href:
+            links["twitter"] = a["href"]
+        elif "linkedin" in href:
+            links["linkedin"] = a["href"]
+        elif "discord" in href:
+            links["discord"] = a["href"]
+        elif "docs" in href or "documentation" in text:
+            links["docs"] = a["href"]
+        elif "demo" in href or "demo" in text:
+            links["demo"] = a["href"]
+
+    def _collect_json_ld(self, script: Tag, structured: Dict[str, Any]):
+        """JSON-LD describing the product, if the script holds one."""
+        try:
+            data = json.loads(script.string)
+        except (json.JSONDecodeError, TypeError):
+            return
+        if isinstance(data, dict):
+            schema_type = data.get("@type", "")
+            if schema_type in ["SoftwareApplication", "WebApplication", "Product"]:
+                structured["schema"] = data
+
+
+def _clean_html(html: str) -> Dict[str, Any]:
+    """Pool entry point (module level so process pools can pickle it)."""
+    return scraper.clean_html(html)
 
 
 # Singleton instance
@@ -0,0 +1,262 @@
+"""
+Write-behind capture of search telemetry.
+Search requests enqueue a SearchLog row (and later, result clicks) on a
+bounded in-process queue; a background task drains it and bulk-inserts, so
+logging adds no database round trip to /tools/search.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Union
+from uuid import UUID, uuid4
+from sqlalchemy import insert, update, bindparam, cast
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.analytics import SearchLog
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchEvent:
+    """A search to be logged."""
+    query: str
+    search_type: str
+    results_count: int
+    result_tool_ids: List[str]
+    filters: Dict[str, Any]
+    response_time_ms: int
+    user_id: Optional[UUID] = None
+    session_id: Optional[str] = None
+    user_agent: Optional[str] = None
+    ip_hash: Optional[str] = None
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+@dataclass
+class SearchClick:
+    """A click on a search result, linked back to its search."""
+    search_id: UUID
+    tool_id: UUID
+    position: int
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+def hash_ip(ip: Optional[str]) -> Optional[str]:
+    if not ip:
+        return None
+    return hashlib.sha256(f"{settings.SECRET_KEY}:{ip}".encode("utf-8")).hexdigest()
+
+
+class SearchLogBuffer:
+    """
+    Bounded queue of search events and clicks, flushed on a timer.
+
+    When the queue is full new items are dropped and counted rather than
+    slowing searches down. When the buffer is not running (serverless
+    deployments) items are written through immediately.
+    """
+
+    def __init__(self):
+        self.enabled = settings.SEARCH_LOG_ENABLED
+        self.flush_interval = settings.SEARCH_LOG_FLUSH_INTERVAL_SECONDS
+        self.batch_size = settings.SEARCH_LOG_FLUSH_BATCH_SIZE
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SEARCH_LOG_MAX_EVENTS)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        # Counters
+        self.searches_written = 0
+        self.clicks_recorded = 0
+        self.dropped = 0
+        self.flush_count = 0
+        self.last_flush_at: Optional[datetime] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start the background flush loop."""
+        if not self.enabled or self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write out anything still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _put(self, item: Union[SearchEvent, SearchClick], db: Optional[AsyncSession]):
+        if not self.enabled:
+            return
+
+        if not self.is_running:
+            if db is not None:
+                await self.write(db, [item])
+            else:
+                async with AsyncSessionLocal() as session:
+                    await self.write(session, [item])
+            return
+
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    async def record_search(self, event: SearchEvent, db: Optional[AsyncSession] = None) -> UUID:
+        """Queue a search event. Returns the search ID clicks should reference."""
+        try:
+            await self._put(event, db)
+        except Exception as e:
+            # Telemetry must never fail a search
+            logger.warning(f"Could not log search: {e}")
+        return event.id
+
+    async def record_click(
+        self,
+        search_id: UUID,
+        tool_id: UUID,
+        position: int,
+        db: Optional[AsyncSession] = None
+    ):
+        """Queue a result click for its search."""
+        try:
+            await self._put(SearchClick(search_id=search_id, tool_id=tool_id, position=position), db)
+        except Exception as e:
+            logger.warning(f"Could not log search click: {e}")
+
+    async def _run(self):
+        """Background loop: flush every interval or when a batch fills up."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Search log flush failed: {e}", exc_info=True)
+
+    async def flush(self) -> int:
+        """Flush pending items until the queue is empty. Returns items written."""
+        total = 0
+        async with self._flush_lock:
+            while not self._queue.empty():
+                items = []
+                while len(items) < self.batch_size and not self._queue.empty():
+                    items.append(self._queue.get_nowait())
+
+                try:
+                    async with AsyncSessionLocal() as session:
+                        total += await self.write(session, items)
+                except Exception as e:
+                    # Telemetry is best effort: count the batch as dropped
+                    self.dropped += len(items)
+                    logger.error(f"Dropped {len(items)} search log items: {e}")
+                    break
+
+        if total:
+            self.flush_count += 1
+            self.last_flush_at = datetime.now(timezone.utc)
+        return total
+
+    async def write(self, db: AsyncSession, items: List[Union[SearchEvent, SearchClick]]) -> int:
+        """
+        Persist a batch: one multi-row INSERT for searches, then one
+        executemany UPDATE linking clicks (after the inserts, so clicks on
+        searches from the same batch are linked too).
+        """
+        searches = [i for i in items if isinstance(i, SearchEvent)]
+        clicks = [i for i in items if isinstance(i, SearchClick)]
+
+        if searches:
+            await db.execute(
+                insert(SearchLog),
+                [
+                    {
+                        "id": e.id,
+                        "query": e.query[:500],
+                        "query_normalized": normalize_query(e.query)[:500],
+                        "results_count": e.results_count,
+                        "result_tool_ids": e.result_tool_ids,
+                        "search_type": e.search_type,
+                        "filters": e.filters,
+                        "user_id": e.user_id,
+                        "session_id": e.session_id,
+                        "user_agent": e.user_agent[:512] if e.user_agent else None,
+                        "ip_hash": e.ip_hash,
+                        "response_time_ms": e.response_time_ms,
+                        "created_at": e.created_at,
+                    }
+                    for e in searches
+                ]
+            )
+
+        if clicks:
+            table = SearchLog.__table__
+            # First click wins, and only on a tool the search actually returned
+            await db.execute(
+                update(table)
+                .where(
+                    table.c.id == bindparam("b_search_id"),
+                    table.c.clicked_tool_id.is_(None),
+                    cast(table.c.result_tool_ids, JSONB).contains(bindparam("b_tool_ids", type_=JSONB)),
+                )
+                .values(
+                    clicked_tool_id=bindparam("b_tool_id"),
+                    clicked_position=bindparam("b_position"),
+                ),
+                [
+                    {
+                        "b_search_id": c.search_id,
+                        "b_tool_id": c.tool_id,
+                        "b_tool_ids": [str(c.tool_id)],
+                        "b_position": c.position,
+                    }
+                    for c in clicks
+                ]
+            )
+
+        await db.commit()
+        self.searches_written += len(searches)
+        self.clicks_recorded += len(clicks)
+        return len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "pending": self._queue.qsize(),
+            "searches_written": self.searches_written,
+            "clicks_recorded": self.clicks_recorded,
+            "dropped": self.dropped,
+            "flush_count": self.flush_count,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+        }
+
+
+# Singleton instance
+search_log_buffer = SearchLogBuffer()
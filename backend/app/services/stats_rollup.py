@@ -0,0 +1,286 @@
+"""
+Incremental rollup of event tables into daily_stats.
+Each source (engagements, saved_tools, reviews, search_logs) keeps a
+watermark; a run aggregates only events created since it, per tool, per
+category and platform-wide in one GROUPING SETS query, and adds the counts
+into daily_stats with INSERT ... ON CONFLICT DO UPDATE.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+from sqlalchemy import (
+    String, select, func, case, cast, null, literal, literal_column, tuple_, or_
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.tool import Tool
+from app.models.engagement import Engagement, EngagementType, SavedTool, Review
+from app.models.analytics import SearchLog, DailyStats, RollupWatermark, DAILY_STATS_KEY
+
+logger = logging.getLogger(__name__)
+
+METRIC_COLUMNS = ("views", "unique_views", "clicks", "saves", "reviews", "searches")
+
+
+@dataclass
+class RollupSource:
+    """An event table rolled up into daily_stats."""
+    name: str
+    model: Any
+    tool_column: Any           # None for platform-only sources
+    metrics: Dict[str, Any]    # daily_stats column -> aggregate expression
+
+
+ROLLUP_SOURCES = [
+    RollupSource(
+        name="engagements",
+        model=Engagement,
+        tool_column=Engagement.tool_id,
+        metrics={
+            "views": func.count().filter(Engagement.engagement_type == EngagementType.VIEW),
+            "clicks": func.count().filter(Engagement.engagement_type == EngagementType.CLICK),
+        },
+    ),
+    RollupSource(
+        name="saved_tools",
+        model=SavedTool,
+        tool_column=SavedTool.tool_id,
+        metrics={"saves": func.count()},
+    ),
+    RollupSource(
+        name="reviews",
+        model=Review,
+        tool_column=Review.tool_id,
+        metrics={"reviews": func.count()},
+    ),
+    RollupSource(
+        name="search_logs",
+        model=SearchLog,
+        tool_column=None,
+        metrics={"searches": func.count()},
+    ),
+]
+
+
+def _utc_day(column):
+    """UTC calendar day of a timestamptz column (matches DailyStats.date)."""
+    return func.date_trunc(literal_column("'day'"), func.timezone(literal_column("'UTC'"), column))
+
+
+def utc_today() -> datetime:
+    now = datetime.now(timezone.utc)
+    return datetime(now.year, now.month, now.day)
+
+
+class StatsRollup:
+    """
+    Watermarked, additive daily_stats rollup.
+
+    Only events older than STATS_ROLLUP_LAG_SECONDS are rolled up, so rows
+    written late by the engagement buffer are not skipped. Each source is
+    processed in windows of at most STATS_ROLLUP_MAX_WINDOW_HOURS under a
+    transaction-scoped advisory lock, with the watermark advanced in the
+    same transaction, so concurrent workers never double count.
+    """
+
+    def __init__(self):
+        self.enabled = settings.STATS_ROLLUP_ENABLED
+        self.interval = settings.STATS_ROLLUP_INTERVAL_SECONDS
+        self.lag = timedelta(seconds=settings.STATS_ROLLUP_LAG_SECONDS)
+        self.max_window = timedelta(hours=settings.STATS_ROLLUP_MAX_WINDOW_HOURS)
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.run_count = 0
+        self.last_run_at: Optional[datetime] = None
+
+    # ------------------------------------------------------------------
+    # Statements
+    # ------------------------------------------------------------------
+
+    def _aggregate_query(self, source: RollupSource, metrics: Dict[str, Any], lower, upper):
+        """Per-day aggregates of a source for created_at in [lower, upper)."""
+        model = source.model
+        day = _utc_day(model.created_at)
+        metric_columns = [expr.label(name) for name, expr in metrics.items()]
+        in_window = [model.created_at >= lower, model.created_at < upper]
+
+        if source.tool_column is None:
+            return (
+                select(
+                    func.gen_random_uuid(), day, literal("platform"),
+                    cast(null(), PGUUID(as_uuid=True)), *metric_columns
+                )
+                .where(*in_window)
+                .group_by(day)
+            )
+
+        tool_id = source.tool_column
+        category_id = Tool.category_id
+        stat_type = case(
+            (func.grouping(tool_id) == 0, "tool"),
+            (func.grouping(category_id) == 0, "category"),
+            else_="platform",
+        )
+        return (
+            select(
+                func.gen_random_uuid(), day, stat_type,
+                func.coalesce(tool_id, category_id), *metric_columns
+            )
+            .select_from(model)
+            .join(Tool, Tool.id == tool_id)
+            .where(*in_window)
+            .group_by(func.grouping_sets(
+                tuple_(day, tool_id), tuple_(day, category_id), tuple_(day)
+            ))
+            # Uncategorized tools only count toward tool and platform rows
+            .having(or_(func.grouping(category_id) == 1, category_id.isnot(None)))
+        )
+
+    def _upsert(self, query, metric_names: List[str], replace: bool = False):
+        stmt = pg_insert(DailyStats).from_select(
+            ["id", "date", "stat_type", "entity_id", *metric_names], query
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=list(DAILY_STATS_KEY),
+            set_={
+                name: stmt.excluded[name] if replace else getattr(DailyStats, name) + stmt.excluded[name]
+                for name in metric_names
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    async def _rollup_window(self, db: AsyncSession, source: RollupSource, target: datetime) -> bool:
+        """
+        Roll up one window of a source. Returns False once the source has
+        caught up with target.
+        """
+        await db.execute(
+            select(func.pg_advisory_xact_lock(func.hashtext(f"stats_rollup:{source.name}")))
+        )
+        lower = (await db.execute(
+            select(RollupWatermark.watermark).where(RollupWatermark.source == source.name)
+        )).scalar_one_or_none()
+        if lower is None:
+            # First run: start from the oldest event (or now, if there are none)
+            lower = (await db.execute(select(func.min(source.model.created_at)))).scalar() or target
+
+        upper = max(lower, min(target, lower + self.max_window))
+        if upper > lower:
+            await db.execute(self._upsert(
+                self._aggregate_query(source, source.metrics, lower, upper),
+                list(source.metrics)
+            ))
+
+            # Distinct visitors are not additive; recount the touched days
+            if source.model is Engagement:
+                day_start = lower.astimezone(timezone.utc).replace(
+                    hour=0, minute=0, second=0, microsecond=0
+                )
+                unique_views = func.count(func.distinct(func.coalesce(
+                    cast(Engagement.user_id, String), Engagement.session_id
+                ))).filter(Engagement.engagement_type == EngagementType.VIEW)
+                await db.execute(self._upsert(
+                    self._aggregate_query(source, {"unique_views": unique_views}, day_start, upper),
+                    ["unique_views"],
+                    replace=True
+                ))
+
+        watermark = pg_insert(RollupWatermark).values(source=source.name, watermark=upper)
+        await db.execute(watermark.on_conflict_do_update(
+            index_elements=[RollupWatermark.source],
+            set_={"watermark": watermark.excluded.watermark, "updated_at": func.now()},
+        ))
+        await db.commit()
+        return upper < target
+
+    async def run(self, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
+        """Roll every source up to now minus the lag."""
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                return await self.run(session)
+
+        target = datetime.now(timezone.utc) - self.lag
+        windows: Dict[str, int] = {}
+        for source in ROLLUP_SOURCES:
+            windows[source.name] = 1
+            while await self._rollup_window(db, source, target):
+                windows[source.name] += 1
+
+        self.run_count += 1
+        self.last_run_at = datetime.now(timezone.utc)
+        return {"rolled_up_to": target.isoformat(), "windows": windows}
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get_totals(
+        self,
+        db: AsyncSession,
+        stat_type: str,
+        entity_id: Optional[UUID] = None,
+        since: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Sum daily_stats metrics for one entity from a UTC day onward."""
+        query = select(*[
+            func.coalesce(func.sum(getattr(DailyStats, name)), 0).label(name)
+            for name in METRIC_COLUMNS
+        ]).where(DailyStats.stat_type == stat_type)
+        if entity_id is None:
+            query = query.where(DailyStats.entity_id.is_(None))
+        else:
+            query = query.where(DailyStats.entity_id == entity_id)
+        if since is not None:
+            query = query.where(DailyStats.date >= since)
+
+        row = (await db.execute(query)).one()
+        return {name: int(getattr(row, name)) for name in METRIC_COLUMNS}
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if not self.enabled or self.is_running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        from app.services.platform_stats import platform_stats
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self.run(session)
+                    # Keep the dashboard snapshot warm with the fresh totals
+                    await platform_stats.refresh(session)
+            except Exception as e:
+                logger.error(f"Daily stats rollup failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+
+# Singleton instance
+stats_rollup = StatsRollup()
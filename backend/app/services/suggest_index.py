@@ -0,0 +1,354 @@
+"""
+In-memory prefix index for search-as-you-type suggestions.
+Holds approved tool names, tags and category names in a sorted term array
+so prefix lookups are a binary search plus a short scan, with no database
+or OpenAI round trip. Each worker keeps its own copy, rebuilt in the
+background when another worker changed the catalog or when it is older
+than SUGGEST_REBUILD_SECONDS.
+"""
+import asyncio
+import bisect
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Tuple, Any
+from uuid import UUID
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.models.tool import Tool, ToolStatus
+from app.models.category import Category
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "suggest:generation"
+
+
+@dataclass
+class Suggestion:
+    """A single suggestable entry."""
+    key: str          # "tool:<id>", "tag:<tag>" or "category:<id>"
+    type: str         # tool | tag | category
+    label: str
+    score: float
+    slug: Optional[str] = None
+    id: Optional[UUID] = None
+
+
+class SuggestIndex:
+    """
+    Sorted-array prefix index over suggestion terms.
+
+    Every entry is indexed under its full normalized label and under each of
+    its words, so "gen" finds both "Gen-2" and "AI Image Generator".
+
+    Local upserts and removals bump a generation counter in Redis (like the
+    listing cache), so other workers know to rebuild.
+    """
+
+    def __init__(self):
+        self.max_results = settings.SUGGEST_MAX_RESULTS
+        self._terms: List[Tuple[str, str]] = []  # (term, entry key), kept sorted
+        self._entries: Dict[str, Suggestion] = {}
+        self._entry_terms: Dict[str, List[str]] = {}
+        self._tag_tools: Dict[str, Dict[UUID, float]] = {}
+        self._tool_tags: Dict[UUID, List[str]] = {}
+        self._prefix_cache: Dict[Tuple[str, int], List[Suggestion]] = {}
+        self._built = False
+        self._built_at = 0.0
+        self._built_generation = 0
+        self._build_lock = asyncio.Lock()
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.rebuild_interval = settings.SUGGEST_REBUILD_SECONDS
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return re.sub(r"\s+", " ", text.strip().lower())
+
+    def _terms_for(self, label: str) -> List[str]:
+        normalized = self.normalize(label)
+        if not normalized:
+            return []
+        terms = {normalized}
+        terms.update(w for w in re.split(r"[\s\-_./]+", normalized) if w)
+        return sorted(terms)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _put(self, entry: Suggestion):
+        self._remove(entry.key)
+        terms = self._terms_for(entry.label)
+        for term in terms:
+            bisect.insort(self._terms, (term, entry.key))
+        self._entries[entry.key] = entry
+        self._entry_terms[entry.key] = terms
+
+    def _remove(self, key: str):
+        terms = self._entry_terms.pop(key, None)
+        if terms is None:
+            return
+        for term in terms:
+            i = bisect.bisect_left(self._terms, (term, key))
+            if i < len(self._terms) and self._terms[i] == (term, key):
+                del self._terms[i]
+        self._entries.pop(key, None)
+
+    def _update_tag(self, tag: str):
+        tools = self._tag_tools.get(tag)
+        key = f"tag:{tag}"
+        if not tools:
+            self._tag_tools.pop(tag, None)
+            self._remove(key)
+            return
+        self._put(Suggestion(key=key, type="tag", label=tag, score=max(tools.values())))
+
+    def upsert_tool(self, tool: Tool):
+        """Add or refresh a tool; non-approved tools are removed."""
+        if tool.status != ToolStatus.APPROVED:
+            self.remove_tool(tool.id)
+            return
+
+        score = tool.rank_score or 0.0
+        self._put(Suggestion(
+            key=f"tool:{tool.id}",
+            type="tool",
+            label=tool.name,
+            score=score,
+            slug=tool.slug,
+            id=tool.id,
+        ))
+
+        # Re-link tags
+        old_tags = set(self._tool_tags.get(tool.id, []))
+        new_tags = {self.normalize(t) for t in (tool.tags or []) if t and t.strip()}
+        for tag in old_tags - new_tags:
+            self._tag_tools.get(tag, {}).pop(tool.id, None)
+            self._update_tag(tag)
+        for tag in new_tags:
+            self._tag_tools.setdefault(tag, {})[tool.id] = score
+            self._update_tag(tag)
+        self._tool_tags[tool.id] = sorted(new_tags)
+
+        # Categories rank by their best tool
+        if tool.category_id:
+            category = self._entries.get(f"category:{tool.category_id}")
+            if category and score > category.score:
+                category.score = score
+
+        self._prefix_cache.clear()
+        self._publish_change()
+
+    def remove_tool(self, tool_id: UUID):
+        """Drop a tool and unlink its tags."""
+        self._remove(f"tool:{tool_id}")
+        for tag in self._tool_tags.pop(tool_id, []):
+            self._tag_tools.get(tag, {}).pop(tool_id, None)
+            self._update_tag(tag)
+        self._prefix_cache.clear()
+        self._publish_change()
+
+    def upsert_category(self, category: Category, score: float = 0.0):
+        """Add or refresh a category; inactive categories are removed."""
+        key = f"category:{category.id}"
+        if not category.is_active:
+            self._remove(key)
+        else:
+            existing = self._entries.get(key)
+            self._put(Suggestion(
+                key=key,
+                type="category",
+                label=category.name,
+                score=max(score, existing.score if existing else 0.0),
+                slug=category.slug,
+                id=category.id,
+            ))
+        self._prefix_cache.clear()
+        self._publish_change()
+
+    def remove_category(self, category_id: UUID):
+        self._remove(f"category:{category_id}")
+        self._prefix_cache.clear()
+        self._publish_change()
+
+    # ------------------------------------------------------------------
+    # Cross-worker freshness
+    # ------------------------------------------------------------------
+
+    def _publish_change(self):
+        """Tell other workers the catalog changed (mutations are synchronous)."""
+        if not redis_client.is_connected:
+            return
+        try:
+            asyncio.get_running_loop().create_task(self._bump_generation())
+        except RuntimeError:
+            pass  # No running loop (e.g. scripts); nothing to notify
+
+    async def _bump_generation(self):
+        try:
+            generation = int(await redis_client.client.incr(GENERATION_KEY))
+            # Our own change is already applied here
+            if generation == self._built_generation + 1:
+                self._built_generation = generation
+        except Exception as e:
+            logger.warning(f"Suggest index generation bump failed: {e}")
+
+    async def _current_generation(self) -> int:
+        if redis_client.is_connected:
+            try:
+                return int(await redis_client.get(GENERATION_KEY) or 0)
+            except Exception as e:
+                logger.warning(f"Suggest index generation lookup failed: {e}")
+        return self._built_generation
+
+    async def _is_stale(self) -> bool:
+        if time.monotonic() - self._built_at > self.rebuild_interval:
+            return True
+        return await self._current_generation() != self._built_generation
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    async def rebuild(self):
+        """Rebuild the whole index from the database."""
+        async with self._build_lock:
+            generation = await self._current_generation()
+            async with AsyncSessionLocal() as session:
+                tool_rows = (await session.execute(
+                    select(
+                        Tool.id, Tool.name, Tool.slug, Tool.tags,
+                        Tool.category_id, Tool.rank_score
+                    ).where(Tool.status == ToolStatus.APPROVED)
+                )).all()
+                categories = (await session.execute(
+                    select(Category).where(Category.is_active == True)
+                )).scalars().all()
+
+            best_by_category: Dict[UUID, float] = {}
+            for row in tool_rows:
+                if row.category_id:
+                    best_by_category[row.category_id] = max(
+                        best_by_category.get(row.category_id, 0.0), row.rank_score or 0.0
+                    )
+
+            entries: Dict[str, Suggestion] = {}
+            tag_tools: Dict[str, Dict[UUID, float]] = {}
+            tool_tags: Dict[UUID, List[str]] = {}
+
+            for row in tool_rows:
+                score = row.rank_score or 0.0
+                entries[f"tool:{row.id}"] = Suggestion(
+                    key=f"tool:{row.id}", type="tool", label=row.name,
+                    score=score, slug=row.slug, id=row.id,
+                )
+                tags = sorted({self.normalize(t) for t in (row.tags or []) if t and t.strip()})
+                tool_tags[row.id] = tags
+                for tag in tags:
+                    tag_tools.setdefault(tag, {})[row.id] = score
+
+            for tag, tools in tag_tools.items():
+                entries[f"tag:{tag}"] = Suggestion(
+                    key=f"tag:{tag}", type="tag", label=tag, score=max(tools.values())
+                )
+
+            for category in categories:
+                entries[f"category:{category.id}"] = Suggestion(
+                    key=f"category:{category.id}", type="category", label=category.name,
+                    score=best_by_category.get(category.id, 0.0),
+                    slug=category.slug, id=category.id,
+                )
+
+            # Bulk build: sort once instead of inserting term by term
+            terms: List[Tuple[str, str]] = []
+            entry_terms: Dict[str, List[str]] = {}
+            for key, entry in entries.items():
+                entry_terms[key] = self._terms_for(entry.label)
+                terms.extend((term, key) for term in entry_terms[key])
+            terms.sort()
+
+            self._terms = terms
+            self._entries = entries
+            self._entry_terms = entry_terms
+            self._tag_tools = tag_tools
+            self._tool_tags = tool_tags
+            self._prefix_cache.clear()
+            self._built = True
+            self._built_at = time.monotonic()
+            self._built_generation = generation
+
+            logger.info(f"Suggest index built: {len(entries)} entries, {len(terms)} terms")
+
+    async def ensure_built(self):
+        """
+        Build on first use. A stale index keeps serving while a background
+        rebuild replaces it.
+        """
+        if not self._built:
+            await self.rebuild()
+            return
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            return
+        if await self._is_stale():
+            self._rebuild_task = asyncio.create_task(self._rebuild_in_background())
+
+    async def _rebuild_in_background(self):
+        try:
+            await self.rebuild()
+        except Exception as e:
+            # Retry after another interval rather than on every request
+            self._built_at = time.monotonic()
+            self._built_generation = await self._current_generation()
+            logger.error(f"Suggest index rebuild failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> List[Suggestion]:
+        """Return the highest-scoring entries with a term starting with prefix."""
+        limit = min(limit or self.max_results, self.max_results)
+        prefix = self.normalize(prefix)
+        if not prefix:
+            return []
+
+        cache_key = (prefix, limit)
+        cached = self._prefix_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        best: Dict[str, Suggestion] = {}
+        i = bisect.bisect_left(self._terms, (prefix, ""))
+        while i < len(self._terms) and self._terms[i][0].startswith(prefix):
+            key = self._terms[i][1]
+            best[key] = self._entries[key]
+            i += 1
+
+        # Exact label matches first, then by rank score
+        results = sorted(
+            best.values(),
+            key=lambda e: (self.normalize(e.label) != prefix, -e.score, e.label)
+        )[:limit]
+
+        # Short prefixes match the most terms; memoize them until the next mutation
+        if len(prefix) <= 3:
+            self._prefix_cache[cache_key] = results
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "built": self._built,
+            "generation": self._built_generation,
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if self._built else None,
+            "entries": len(self._entries),
+            "terms": len(self._terms),
+            "cached_prefixes": len(self._prefix_cache),
+        }
+
+
+# Singleton instance
+suggest_index = SuggestIndex()
@@ -2,24 +2,29 @@
 Tool service - main business logic for tool operations.
 """
 import re
+import asyncio
 import logging
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Callable, Awaitable
 from uuid import UUID
 from datetime import datetime
 from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.models.tool import Tool, ToolStatus, PricingModel
 from app.models.category import Category
-from app.models.engagement import Engagement, EngagementType, Review
+from app.models.engagement import EngagementType, Review
 from app.schemas.tool import (
     ToolCreate, ToolUpdate, ToolURLSubmit,
     ToolExtractionResult, ToolSearchQuery, ToolRankingUpdate
 )
-from app.services.scraper import scraper
+from app.services.scraper import scraper, FetchResult
 from app.services.llm_extractor import llm_extractor
 from app.services.embeddings import embedding_service
-from app.services.ranking import ranking_service
+from app.services.engagement_buffer import engagement_buffer
+from app.services.suggest_index import suggest_index
+from app.services.listing_cache import listing_cache
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +69,7 @@ class ToolService:
             return None
 
         # Step 2: Clean and structure HTML content
-        cleaned_content = scraper.clean_html(html)
+        cleaned_content = await scraper.clean_html_async(html)
 
         # Step 3: Use LLM to extract structured data
         extraction_result = await llm_extractor.extract_tool_data(url, cleaned_content)
@@ -79,9 +84,15 @@ class ToolService:
         db: AsyncSession,
         extraction: ToolExtractionResult,
         website_url: str,
-        owner_id: UUID
+        owner_id: UUID,
+        page: Optional[FetchResult] = None,
+        content_hash: Optional[str] = None
     ) -> Tool:
-        """Create a tool from extraction result."""
+        """
+        Create a tool from extraction result.
+        The fetched page's validators and content hash, when given, are kept
+        so later refreshes can be conditional.
+        """
         # Find or create category
         category = await self._get_or_create_category(db, extraction.category)
 
@@ -89,16 +100,7 @@ class ToolService:
         slug = await self.get_unique_slug(db, self.slugify(extraction.name))
 
         # Map pricing model
-        pricing_map = {
-            "free": PricingModel.FREE,
-            "freemium": PricingModel.FREEMIUM,
-            "paid": PricingModel.PAID,
-            "subscription": PricingModel.SUBSCRIPTION,
-            "usage_based": PricingModel.USAGE_BASED,
-            "contact": PricingModel.CONTACT,
-            "open_source": PricingModel.OPEN_SOURCE,
-        }
-        pricing_model = pricing_map.get(extraction.pricing_model, PricingModel.FREEMIUM)
+        pricing_model = self._pricing_model(extraction.pricing_model)
 
         # Create tool
         tool = Tool(
@@ -119,6 +121,9 @@ class ToolService:
             status=ToolStatus.PENDING,
             extracted_data=extraction.raw_data,
             last_scraped_at=datetime.utcnow().isoformat(),
+            scrape_etag=page.etag if page else None,
+            scrape_last_modified=page.last_modified if page else None,
+            content_hash=content_hash,
         )
 
         db.add(tool)
@@ -131,12 +136,109 @@ class ToolService:
             name=tool.name,
             description=tool.short_description,
             category=extraction.category,
-            tags=extraction.tags
+            tags=extraction.tags,
+            attributes=embedding_service.attributes_for(tool)
         )
 
         logger.info(f"Created tool: {tool.name} ({tool.id})")
         return tool
 
+    def _pricing_model(self, value: Optional[str]) -> PricingModel:
+        try:
+            return PricingModel(value)
+        except ValueError:
+            return PricingModel.FREEMIUM
+
+    async def refresh_from_source(
+        self,
+        db: AsyncSession,
+        tool: Tool,
+        force: bool = False
+    ) -> str:
+        """
+        Re-scrape a tool's website and update it if the content changed.
+
+        The fetch is conditional on the stored ETag/Last-Modified, and a page
+        whose normalized content hash is unchanged skips LLM extraction and
+        re-embedding. Returns one of: not_modified, unchanged, updated, failed.
+        """
+        page = await scraper.fetch_page(
+            tool.website_url,
+            etag=None if force else tool.scrape_etag,
+            last_modified=None if force else tool.scrape_last_modified,
+        )
+        now = datetime.utcnow().isoformat()
+        if page is None:
+            # Record the attempt so catalog refreshes rotate past dead sites
+            tool.last_scraped_at = now
+            await db.commit()
+            return "failed"
+
+        if page.not_modified:
+            tool.last_scraped_at = now
+            await db.commit()
+            return "not_modified"
+
+        cleaned = await scraper.clean_html_async(page.html)
+        content_hash = scraper.content_hash(cleaned)
+        if content_hash == tool.content_hash and not force:
+            tool.scrape_etag = page.etag
+            tool.scrape_last_modified = page.last_modified
+            tool.last_scraped_at = now
+            await db.commit()
+            return "unchanged"
+
+        extraction = await llm_extractor.extract_tool_data(tool.website_url, cleaned)
+        if extraction is None:
+            # Keep the old validators so the next refresh fetches in full again
+            tool.last_scraped_at = now
+            await db.commit()
+            return "failed"
+
+        previous = (tool.name, tool.short_description, list(tool.tags or []))
+        tool.short_description = extraction.short_description
+        tool.long_description = extraction.long_description
+        tool.tags = extraction.tags
+        tool.use_cases = extraction.use_cases
+        tool.pricing_model = self._pricing_model(extraction.pricing_model)
+        tool.pricing_details = extraction.pricing_details
+        tool.logo_url = tool.logo_url or extraction.logo_url
+        tool.github_url = tool.github_url or extraction.github_url
+        tool.twitter_url = tool.twitter_url or extraction.twitter_url
+        tool.extracted_data = extraction.raw_data
+        tool.scrape_etag = page.etag
+        tool.scrape_last_modified = page.last_modified
+        tool.content_hash = content_hash
+        tool.last_scraped_at = now
+        tool.scrape_version = (tool.scrape_version or 1) + 1
+        tool.updated_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(tool)
+
+        if previous != (tool.name, tool.short_description, list(tool.tags or [])):
+            category_name = "Other"
+            if tool.category_id:
+                cat = await db.get(Category, tool.category_id)
+                category_name = cat.name if cat else "Other"
+
+            await embedding_service.update_tool(
+                tool_id=tool.id,
+                name=tool.name,
+                description=tool.short_description,
+                category=category_name,
+                tags=tool.tags or [],
+                attributes=embedding_service.attributes_for(tool)
+            )
+        else:
+            # The pricing model can change without the embedded text changing
+            await embedding_service.sync_attributes([tool])
+
+        suggest_index.upsert_tool(tool)
+        if tool.status == ToolStatus.APPROVED:
+            await listing_cache.invalidate()
+
+        return "updated"
+
     async def create(
         self,
         db: AsyncSession,
@@ -188,9 +290,12 @@ class ToolService:
             name=tool.name,
             description=tool.short_description,
             category=category_name,
-            tags=data.tags
+            tags=data.tags,
+            attributes=embedding_service.attributes_for(tool)
         )
 
+        suggest_index.upsert_tool(tool)
+
         return tool
 
     async def get(self, db: AsyncSession, tool_id: UUID) -> Optional[Tool]:
@@ -220,8 +325,9 @@ class ToolService:
         await db.commit()
         await db.refresh(tool)
 
-        # Update embedding if relevant fields changed
-        if any(f in update_data for f in ["name", "short_description", "tags"]):
+        # Update embedding if relevant fields changed; the category is part
+        # of the embedded text
+        if any(f in update_data for f in ["name", "short_description", "tags", "category_id"]):
             category_name = "Other"
             if tool.category_id:
                 cat = await db.get(Category, tool.category_id)
@@ -232,19 +338,32 @@ class ToolService:
                 name=tool.name,
                 description=tool.short_description,
                 category=category_name,
-                tags=tool.tags or []
+                tags=tool.tags or [],
+                attributes=embedding_service.attributes_for(tool)
             )
+        elif any(f in update_data for f in ["pricing_model", "status"]):
+            await embedding_service.sync_attributes([tool])
+
+        suggest_index.upsert_tool(tool)
+        if tool.status == ToolStatus.APPROVED:
+            await listing_cache.invalidate()
 
         return tool
 
     async def delete(self, db: AsyncSession, tool: Tool):
         """Delete a tool."""
-        # Remove from vector database
+        # Remove from vector database and suggestions
         await embedding_service.delete_tool(tool.id)
+        suggest_index.remove_tool(tool.id)
+
+        was_listed = tool.status == ToolStatus.APPROVED
 
         await db.delete(tool)
         await db.commit()
 
+        if was_listed:
+            await listing_cache.invalidate()
+
     async def search(
         self,
         db: AsyncSession,
@@ -269,35 +388,35 @@ class ToolService:
         limit: int,
         offset: int
     ) -> Tuple[List[Tool], int]:
-        """Perform keyword-based search."""
-        search_query = select(Tool).where(Tool.status == ToolStatus.APPROVED)
+        """
+        Perform full-text keyword search.
+        Matches against the weighted tools.search_vector (GIN indexed) and
+        orders by ts_rank_cd blended with the stored rank_score.
+        """
+        ts_query = func.websearch_to_tsquery("english", query.query)
+        text_rank = func.ts_rank_cd(Tool.search_vector, ts_query, 32)  # 32: rank / (rank + 1)
 
-        # Text search on name and description
-        search_term = f"%{query.query}%"
-        search_query = search_query.where(
-            or_(
-                Tool.name.ilike(search_term),
-                Tool.short_description.ilike(search_term),
-                Tool.tags.any(query.query.lower())
-            )
+        search_query = select(Tool).where(
+            Tool.status == ToolStatus.APPROVED,
+            Tool.search_vector.op("@@")(ts_query)
         )
 
-        # Apply filters
-        if query.category_id:
-            search_query = search_query.where(Tool.category_id == query.category_id)
-        if query.pricing_models:
-            search_query = search_query.where(Tool.pricing_model.in_(query.pricing_models))
-        if query.min_rating:
-            search_query = search_query.where(Tool.average_rating >= query.min_rating)
-        if query.tags:
-            search_query = search_query.where(Tool.tags.overlap(query.tags))
+        search_query = self._apply_search_filters(search_query, query)
 
         # Get total count
         count_query = select(func.count()).select_from(search_query.subquery())
         total = (await db.execute(count_query)).scalar() or 0
 
-        # Apply ordering and pagination
-        search_query = search_query.order_by(Tool.rank_score.desc())
+        # Nothing matched as words - try typo-tolerant matching before giving up
+        if total == 0 and settings.SEARCH_FUZZY_ENABLED:
+            return await self._fuzzy_search(db, query, limit, offset)
+
+        # Apply relevance ordering and pagination
+        relevance = (
+            text_rank * settings.SEARCH_TEXT_RANK_WEIGHT
+            + func.ln(1 + func.greatest(Tool.rank_score, 0)) * settings.SEARCH_RANK_SCORE_WEIGHT
+        )
+        search_query = search_query.order_by(relevance.desc(), Tool.id)
         search_query = search_query.offset(offset).limit(limit)
 
         result = await db.execute(search_query)
@@ -305,49 +424,107 @@ class ToolService:
 
         return tools, total
 
-    async def _semantic_search(
+    async def _fuzzy_search(
         self,
         db: AsyncSession,
         query: ToolSearchQuery,
         limit: int,
         offset: int
     ) -> Tuple[List[Tool], int]:
-        """Perform semantic vector search."""
-        # Get category name if filter applied
-        category_name = None
+        """
+        Perform typo-tolerant search using pg_trgm.
+        Matches names and slugs by trigram similarity, plus name prefixes,
+        all served by the trigram GIN indexes.
+        """
+        term = query.query.strip().lower()
+        slug_term = self.slugify(term) or term
+        prefix = re.sub(r"([%_\\])", r"\\\1", term) + "%"
+
+        # Scope the similarity threshold for the % operator to this transaction
+        await db.execute(
+            select(func.set_config(
+                "pg_trgm.similarity_threshold", str(settings.SEARCH_FUZZY_THRESHOLD), True
+            ))
+        )
+
+        search_query = select(Tool).where(
+            Tool.status == ToolStatus.APPROVED,
+            or_(
+                Tool.name.op("%")(term),
+                Tool.slug.op("%")(slug_term),
+                Tool.name.ilike(prefix)
+            )
+        )
+        search_query = self._apply_search_filters(search_query, query)
+
+        count_query = select(func.count()).select_from(search_query.subquery())
+        total = (await db.execute(count_query)).scalar() or 0
+        if total == 0:
+            return [], 0
+
+        similarity = func.greatest(
+            func.similarity(Tool.name, term),
+            func.similarity(Tool.slug, slug_term)
+        )
+        search_query = search_query.order_by(
+            Tool.name.ilike(prefix).desc(),
+            similarity.desc(),
+            Tool.rank_score.desc()
+        )
+        search_query = search_query.offset(offset).limit(limit)
+
+        result = await db.execute(search_query)
+        return list(result.scalars().all()), total
+
+    def _apply_search_filters(self, search_query, query: ToolSearchQuery):
+        """Apply the shared category/pricing/rating/tag filters."""
         if query.category_id:
-            cat = await db.get(Category, query.category_id)
-            category_name = cat.name if cat else None
+            search_query = search_query.where(Tool.category_id == query.category_id)
+        if query.pricing_models:
+            search_query = search_query.where(Tool.pricing_model.in_(query.pricing_models))
+        if query.min_rating:
+            search_query = search_query.where(Tool.average_rating >= query.min_rating)
+        if query.tags:
+            search_query = search_query.where(Tool.tags.overlap(query.tags))
+        return search_query
 
-        # Search vector database
+    async def _semantic_search(
+        self,
+        db: AsyncSession,
+        query: ToolSearchQuery,
+        limit: int,
+        offset: int
+    ) -> Tuple[List[Tool], int]:
+        """
+        Perform semantic vector search.
+        Every filter, including the approved-status check, runs inside the
+        vector search, so pages are full and the offset is applied there.
+        """
         semantic_results = await embedding_service.search_similar(
             query=query.query,
-            limit=limit + offset,  # Get extra for offset
-            category=category_name,
-            tags=query.tags
+            limit=limit,
+            offset=offset,
+            category_id=query.category_id,
+            tags=query.tags,
+            pricing_models=query.pricing_models,
+            min_rating=query.min_rating,
+            status=ToolStatus.APPROVED
         )
 
         if not semantic_results:
             return [], 0
 
-        # Get tool IDs
+        # Fetch full tool objects; the status guard only drops tools whose
+        # payload has not caught up with a moderation change yet
         tool_ids = [UUID(r["tool_id"]) for r in semantic_results]
-
-        # Fetch full tool objects
-        tools_query = select(Tool).where(
-            and_(
-                Tool.id.in_(tool_ids),
-                Tool.status == ToolStatus.APPROVED
+        result = await db.execute(
+            select(Tool).where(
+                and_(
+                    Tool.id.in_(tool_ids),
+                    Tool.status == ToolStatus.APPROVED
+                )
             )
         )
-
-        # Apply additional filters
-        if query.pricing_models:
-            tools_query = tools_query.where(Tool.pricing_model.in_(query.pricing_models))
-        if query.min_rating:
-            tools_query = tools_query.where(Tool.average_rating >= query.min_rating)
-
-        result = await db.execute(tools_query)
         tools_map = {t.id: t for t in result.scalars().all()}
 
         # Order by semantic score
@@ -357,10 +534,7 @@ class ToolService:
             if UUID(r["tool_id"]) in tools_map
         ]
 
-        # Apply offset
-        ordered_tools = ordered_tools[offset:offset + limit]
-
-        return ordered_tools, len(semantic_results)
+        return ordered_tools, offset + len(semantic_results)
 
     async def _hybrid_search(
         self,
@@ -369,33 +543,58 @@ class ToolService:
         limit: int,
         offset: int
     ) -> Tuple[List[Tool], int]:
-        """Combine keyword and semantic search with score fusion."""
-        # Get results from both methods
-        keyword_results, _ = await self._keyword_search(db, query, limit * 2, 0)
-        semantic_results, _ = await self._semantic_search(db, query, limit * 2, 0)
+        """
+        Combine keyword and semantic search with score fusion.
+        Both legs run concurrently on their own sessions; a leg that fails or
+        misses its deadline contributes no results (degraded mode).
+        """
+        keyword_results, semantic_results = await asyncio.gather(
+            self._run_search_leg("keyword", self._keyword_search, query, limit * 2),
+            self._run_search_leg("semantic", self._semantic_search, query, limit * 2),
+        )
 
         # Score fusion using Reciprocal Rank Fusion (RRF)
         k = 60  # RRF constant
         scores = {}
+        tools_map = {}
 
         for rank, tool in enumerate(keyword_results):
             scores[tool.id] = scores.get(tool.id, 0) + 1 / (k + rank + 1)
+            tools_map[tool.id] = tool
 
         for rank, tool in enumerate(semantic_results):
             scores[tool.id] = scores.get(tool.id, 0) + 1 / (k + rank + 1)
+            tools_map.setdefault(tool.id, tool)
 
-        # Sort by combined score
+        # Sort by combined score; both legs already loaded the Tool rows
         sorted_ids = sorted(scores.keys(), key=lambda x: scores[x], reverse=True)
-
-        # Fetch tools in order
-        tools_query = select(Tool).where(Tool.id.in_(sorted_ids))
-        result = await db.execute(tools_query)
-        tools_map = {t.id: t for t in result.scalars().all()}
-
-        ordered_tools = [tools_map[tid] for tid in sorted_ids if tid in tools_map]
+        ordered_tools = [tools_map[tid] for tid in sorted_ids]
 
         return ordered_tools[offset:offset + limit], len(ordered_tools)
 
+    async def _run_search_leg(
+        self,
+        name: str,
+        leg: Callable[..., Awaitable[Tuple[List[Tool], int]]],
+        query: ToolSearchQuery,
+        limit: int
+    ) -> List[Tool]:
+        """Run one hybrid search leg on its own session under a deadline."""
+        async def run() -> List[Tool]:
+            async with AsyncSessionLocal() as session:
+                tools, _ = await leg(session, query, limit, 0)
+                return tools
+
+        try:
+            return await asyncio.wait_for(
+                run(), timeout=settings.HYBRID_SEARCH_LEG_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Hybrid search {name} leg timed out for query: {query.query[:100]}")
+        except Exception as e:
+            logger.error(f"Hybrid search {name} leg failed: {e}")
+        return []
+
     async def record_engagement(
         self,
         db: AsyncSession,
@@ -405,30 +604,19 @@ class ToolService:
         session_id: Optional[str] = None,
         source: Optional[str] = None
     ):
-        """Record user engagement with a tool."""
-        engagement = Engagement(
+        """
+        Record user engagement with a tool.
+        Events are buffered and flushed in batches; counters are applied as
+        atomic deltas so concurrent requests never lose increments.
+        """
+        await engagement_buffer.record(
             tool_id=tool_id,
+            engagement_type=engagement_type,
             user_id=user_id,
             session_id=session_id,
-            engagement_type=engagement_type,
-            source=source
+            source=source,
+            db=db
         )
-        db.add(engagement)
-
-        # Update denormalized counts on tool
-        tool = await db.get(Tool, tool_id)
-        if tool:
-            if engagement_type == EngagementType.VIEW:
-                tool.view_count += 1
-            elif engagement_type == EngagementType.CLICK:
-                tool.click_count += 1
-            elif engagement_type == EngagementType.SAVE:
-                tool.save_count += 1
-
-            # Recalculate ranking
-            tool.rank_score = ranking_service.calculate_rank_score(tool)
-
-        await db.commit()
 
     async def _get_or_create_category(
         self,
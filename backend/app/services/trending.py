@@ -0,0 +1,365 @@
+"""
+Sliding-window trending detection.
+Engagements are counted into hourly buckets as they are flushed, and tools
+are ranked by how fast their recent activity is growing relative to their
+own baseline. The engagements table is only read once, to warm the buckets
+after a restart.
+"""
+import asyncio
+import heapq
+import logging
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from uuid import UUID
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import redis_client
+from app.models.engagement import Engagement, EngagementType
+from app.services.ranking import ranking_service
+
+logger = logging.getLogger(__name__)
+
+REDIS_BUCKET_PREFIX = "trending:h:"
+
+# Contribution of each engagement type to trend activity
+ACTIVITY_WEIGHTS = {
+    EngagementType.VIEW: 0.1,
+    EngagementType.CLICK: 1.0,
+    EngagementType.SAVE: 2.0,
+    EngagementType.SHARE: 2.0,
+}
+
+# Flag new trending tools; tools an admin already flagged stay manual
+TRENDING_SET = text("""
+    UPDATE tools SET is_trending = true, trending_auto = true
+    WHERE id = ANY(CAST(:ids AS uuid[])) AND NOT coalesce(is_trending, false)
+    RETURNING id
+""")
+
+# Clear only the flags this engine set
+TRENDING_CLEAR = text("""
+    UPDATE tools SET is_trending = false, trending_auto = false
+    WHERE trending_auto AND NOT (id = ANY(CAST(:ids AS uuid[])))
+    RETURNING id
+""")
+
+
+def _hour_of(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp()) // 3600
+
+
+class TrendingEngine:
+    """
+    Hourly ring buffers of per-tool activity with an incrementally
+    maintained top-K.
+
+    Velocity compares the hourly activity rate in the recent window
+    (TRENDING_RECENT_HOURS) with the rate over the preceding baseline
+    window (engagement_decay_days). A tool is eligible when its recent
+    activity reaches trending_threshold and its velocity reaches
+    TRENDING_MIN_VELOCITY; the TRENDING_TOP_K most eligible are trending.
+
+    With the memory backend, window totals are kept as running sums and only
+    tools touched since the last refresh are re-scored (everything is
+    re-scored when the hour rolls over). The redis backend shares buckets
+    across workers and sums them at refresh time; while Redis is down the
+    refresh is skipped rather than publishing one worker's partial counts.
+    Only flags set by the engine (trending_auto) are ever cleared.
+    """
+
+    def __init__(self):
+        self.use_redis = settings.TRENDING_BACKEND == "redis"
+        self.recent_hours = settings.TRENDING_RECENT_HOURS
+        self.top_k = settings.TRENDING_TOP_K
+        self.min_velocity = settings.TRENDING_MIN_VELOCITY
+        self.refresh_interval = settings.TRENDING_REFRESH_SECONDS
+
+        self._buckets: Dict[int, Dict[UUID, float]] = {}
+        self._recent: Dict[UUID, float] = defaultdict(float)
+        self._baseline: Dict[UUID, float] = defaultdict(float)
+        self._hour: Optional[int] = None
+        self._baseline_hours: Optional[int] = None
+        self._scores: Dict[UUID, float] = {}
+        self._dirty: set = set()
+        self._scored_hour: Optional[int] = None
+        self._trending: List[UUID] = []
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+        # Counters
+        self.refresh_count = 0
+        self.last_refresh_at: Optional[datetime] = None
+
+    @property
+    def baseline_hours(self) -> int:
+        return max(ranking_service.engagement_decay_days, 1) * 24
+
+    @property
+    def _redis_enabled(self) -> bool:
+        return self.use_redis and redis_client.is_connected
+
+    # ------------------------------------------------------------------
+    # Window maintenance (memory backend)
+    # ------------------------------------------------------------------
+
+    def _rebuild_totals(self, now_hour: int):
+        """Recompute the running window sums from the buckets."""
+        self._recent = defaultdict(float)
+        self._baseline = defaultdict(float)
+        recent_start = now_hour - self.recent_hours + 1
+        baseline_start = recent_start - self.baseline_hours
+        for hour in list(self._buckets):
+            if hour < baseline_start:
+                del self._buckets[hour]
+                continue
+            target = self._recent if hour >= recent_start else self._baseline
+            for tool_id, value in self._buckets[hour].items():
+                target[tool_id] += value
+        self._hour = now_hour
+        self._baseline_hours = self.baseline_hours
+        self._dirty.update(self._recent.keys())
+
+    def _advance(self, now_hour: int):
+        """Slide both windows forward to now_hour."""
+        if self._hour is None or self._baseline_hours != self.baseline_hours:
+            self._rebuild_totals(now_hour)
+            return
+        if now_hour <= self._hour:
+            return
+        if now_hour - self._hour > self.recent_hours + self.baseline_hours:
+            self._rebuild_totals(now_hour)
+            return
+
+        for hour in range(self._hour + 1, now_hour + 1):
+            # Bucket leaving the recent window joins the baseline
+            for tool_id, value in self._buckets.get(hour - self.recent_hours, {}).items():
+                self._recent[tool_id] -= value
+                self._baseline[tool_id] += value
+            # Bucket leaving the baseline window is dropped
+            expired = self._buckets.pop(hour - self.recent_hours - self.baseline_hours, {})
+            for tool_id, value in expired.items():
+                self._baseline[tool_id] -= value
+        self._hour = now_hour
+
+    def _add(self, hour: int, tool_id: UUID, value: float):
+        self._buckets.setdefault(hour, {})
+        self._buckets[hour][tool_id] = self._buckets[hour].get(tool_id, 0.0) + value
+        recent_start = self._hour - self.recent_hours + 1
+        if hour >= recent_start:
+            self._recent[tool_id] += value
+        elif hour >= recent_start - self.baseline_hours:
+            self._baseline[tool_id] += value
+        self._dirty.add(tool_id)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    async def record(self, events: Iterable[Tuple[UUID, EngagementType, datetime]]):
+        """Count a batch of (tool_id, engagement_type, created_at) events."""
+        deltas: Dict[Tuple[int, UUID], float] = defaultdict(float)
+        for tool_id, engagement_type, created_at in events:
+            weight = ACTIVITY_WEIGHTS.get(engagement_type)
+            if weight:
+                deltas[(_hour_of(created_at), tool_id)] += weight
+        if not deltas:
+            return
+
+        if self._redis_enabled:
+            try:
+                ttl = (self.recent_hours + self.baseline_hours + 1) * 3600
+                pipe = redis_client.client.pipeline(transaction=False)
+                for (hour, tool_id), value in deltas.items():
+                    key = f"{REDIS_BUCKET_PREFIX}{hour}"
+                    pipe.hincrbyfloat(key, str(tool_id), value)
+                    pipe.expire(key, ttl)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Redis trending buckets unavailable, counting locally: {e}")
+
+        self._advance(_hour_of(datetime.now(timezone.utc)))
+        window_start = self._hour - self.recent_hours - self.baseline_hours + 1
+        for (hour, tool_id), value in deltas.items():
+            if window_start <= hour <= self._hour:
+                self._add(hour, tool_id, value)
+
+    async def warm(self, db: AsyncSession):
+        """Fill the memory buckets from engagements in the current window."""
+        if self._redis_enabled:
+            return
+        now_hour = _hour_of(datetime.now(timezone.utc))
+        since = datetime.fromtimestamp(
+            (now_hour - self.recent_hours - self.baseline_hours + 1) * 3600, tz=timezone.utc
+        )
+        hour = func.date_trunc("hour", Engagement.created_at)
+        rows = (await db.execute(
+            select(Engagement.tool_id, Engagement.engagement_type, hour, func.count())
+            .where(
+                Engagement.created_at >= since,
+                Engagement.engagement_type.in_(list(ACTIVITY_WEIGHTS))
+            )
+            .group_by(Engagement.tool_id, Engagement.engagement_type, hour)
+        )).all()
+
+        self._buckets = {}
+        for tool_id, engagement_type, bucket, count in rows:
+            bucket_hour = _hour_of(bucket)
+            self._buckets.setdefault(bucket_hour, {})
+            self._buckets[bucket_hour][tool_id] = (
+                self._buckets[bucket_hour].get(tool_id, 0.0) +
+                ACTIVITY_WEIGHTS[engagement_type] * count
+            )
+        self._rebuild_totals(now_hour)
+        logger.info(f"Trending buckets warmed from {len(rows)} hourly aggregates")
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _score(self, recent: float, baseline: float) -> Optional[float]:
+        """Trend score, or None if the tool is not eligible."""
+        if recent < ranking_service.trending_threshold:
+            return None
+        recent_rate = recent / self.recent_hours
+        baseline_rate = max(baseline, 0.0) / self.baseline_hours
+        velocity = (recent_rate + 1.0) / (baseline_rate + 1.0)
+        if velocity < self.min_velocity:
+            return None
+        return velocity * math.log1p(recent)
+
+    async def _redis_window(self, now_hour: int) -> Tuple[Dict[UUID, float], Dict[UUID, float]]:
+        recent: Dict[UUID, float] = defaultdict(float)
+        baseline: Dict[UUID, float] = defaultdict(float)
+        recent_start = now_hour - self.recent_hours + 1
+        hours = list(range(recent_start - self.baseline_hours, now_hour + 1))
+
+        pipe = redis_client.client.pipeline(transaction=False)
+        for hour in hours:
+            pipe.hgetall(f"{REDIS_BUCKET_PREFIX}{hour}")
+        for hour, bucket in zip(hours, await pipe.execute()):
+            target = recent if hour >= recent_start else baseline
+            for tool_id, value in (bucket or {}).items():
+                target[UUID(tool_id)] += float(value)
+        return recent, baseline
+
+    async def compute_top(self) -> List[UUID]:
+        """Current top-K trending tool IDs, best first."""
+        now_hour = _hour_of(datetime.now(timezone.utc))
+
+        if self._redis_enabled:
+            recent, baseline = await self._redis_window(now_hour)
+            scores = {}
+            for tool_id, value in recent.items():
+                score = self._score(value, baseline.get(tool_id, 0.0))
+                if score is not None:
+                    scores[tool_id] = score
+        else:
+            self._advance(now_hour)
+            # Only re-score what changed, unless the windows slid
+            if self._scored_hour != now_hour:
+                self._scores = {}
+                candidates = set(self._recent.keys())
+            else:
+                candidates = self._dirty
+            for tool_id in candidates:
+                score = self._score(self._recent.get(tool_id, 0.0), self._baseline.get(tool_id, 0.0))
+                if score is None:
+                    self._scores.pop(tool_id, None)
+                else:
+                    self._scores[tool_id] = score
+            self._dirty = set()
+            self._scored_hour = now_hour
+            scores = self._scores
+
+        return heapq.nlargest(self.top_k, scores, key=scores.get)
+
+    async def refresh(self, db: AsyncSession) -> List[UUID]:
+        """
+        Recompute the trending set and persist it with two batched updates.
+        Returns the tools that became trending.
+        """
+        if self.use_redis and not redis_client.is_connected:
+            logger.warning("Redis unavailable - skipping trending refresh")
+            return []
+
+        async with self._refresh_lock:
+            top = await self.compute_top()
+
+            added = (await db.execute(TRENDING_SET, {"ids": top})).scalars().all()
+            cleared = (await db.execute(TRENDING_CLEAR, {"ids": top})).scalars().all()
+            changed = list(added) + list(cleared)
+            await db.commit()
+
+            # The trending bonus is part of the stored base score
+            if changed:
+                await ranking_service.bulk_update_rankings(db, changed)
+
+            self._trending = top
+            self.refresh_count += 1
+            self.last_refresh_at = datetime.now(timezone.utc)
+
+            if changed:
+                logger.info(f"Trending set updated: {len(top)} trending, {len(changed)} changed")
+            added_ids = set(added)
+            return [tool_id for tool_id in top if tool_id in added_ids]
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Warm the buckets and start the periodic refresh loop."""
+        if self.is_running:
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                await ranking_service.load_config(session)
+                await self.warm(session)
+        except Exception as e:
+            logger.warning(f"Could not warm trending buckets: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self.refresh(session)
+            except Exception as e:
+                logger.error(f"Trending refresh failed: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "backend": "redis" if self._redis_enabled else "memory",
+            "buckets": len(self._buckets),
+            "tracked_tools": len(self._recent),
+            "trending": [str(tool_id) for tool_id in self._trending],
+            "refresh_count": self.refresh_count,
+            "last_refresh_at": self.last_refresh_at.isoformat() if self.last_refresh_at else None,
+        }
+
+
+# Singleton instance
+trending_engine = TrendingEngine()
@@ -0,0 +1,225 @@
+"""
+Resumable full rebuild of the tool vector index.
+Approved tools are streamed from Postgres through a server-side cursor in
+id order, embedded EMBEDDING_BATCH_SIZE at a time with several batches in
+flight, and upserted in bulk. Progress is checkpointed after every group of
+batches, so an interrupted or failed rebuild resumes where it stopped.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+from uuid import UUID
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.tool import Tool, ToolStatus
+from app.models.category import Category
+from app.models.analytics import JobCheckpoint
+from app.services.embeddings import embedding_service
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "vector_reindex"
+
+
+class VectorReindexer:
+    """
+    Background full reindex with a checkpoint in job_checkpoints.
+
+    The checkpoint holds the last tool id up to which every batch was
+    fully written. A batch that could not be embedded or upserted in full
+    (e.g. during an OpenAI or Qdrant outage) stops the run as failed, so a
+    resumed run retries it.
+    """
+
+    def __init__(self):
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.concurrency = settings.REINDEX_CONCURRENCY
+        self._task: Optional[asyncio.Task] = None
+
+        # Progress of the current (or last) run in this process
+        self.status = "idle"
+        self.position: Optional[str] = None
+        self.processed = 0
+        self.indexed = 0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._processed_at_start = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, resume: bool = True) -> bool:
+        """Start a rebuild in the background. Returns False if one is running."""
+        if self.is_running:
+            return False
+        if not embedding_service.is_connected:
+            raise RuntimeError("Vector database is not connected")
+        self.status = "running"
+        self._task = asyncio.create_task(self.run(resume=resume))
+        return True
+
+    def cancel(self) -> bool:
+        if not self.is_running:
+            return False
+        self._task.cancel()
+        return True
+
+    async def stop(self):
+        """Cancel a running rebuild (on shutdown); it can be resumed later."""
+        if self.is_running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _query(self, after: Optional[UUID]):
+        query = (
+            select(
+                Tool.id.label("tool_id"),
+                Tool.name,
+                Tool.short_description.label("description"),
+                Tool.tags,
+                func.coalesce(Category.name, "Other").label("category"),
+                Tool.category_id,
+                Tool.pricing_model,
+                Tool.status,
+                Tool.average_rating.label("rating"),
+            )
+            .outerjoin(Category, Category.id == Tool.category_id)
+            .where(Tool.status == ToolStatus.APPROVED)
+            .order_by(Tool.id)
+        )
+        if after is not None:
+            query = query.where(Tool.id > after)
+        return query.execution_options(yield_per=self.batch_size)
+
+    async def _checkpoint(self, db: AsyncSession, status: str):
+        stmt = pg_insert(JobCheckpoint).values(
+            name=CHECKPOINT_NAME, status=status, position=self.position, processed=self.processed
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[JobCheckpoint.name],
+            set_={
+                "status": stmt.excluded.status,
+                "position": stmt.excluded.position,
+                "processed": stmt.excluded.processed,
+                "updated_at": func.now(),
+            },
+        ))
+        await db.commit()
+
+    async def _index_group(self, group: List[List[Dict[str, Any]]]):
+        """
+        Embed and upsert several batches concurrently, then advance past the
+        leading batches that were written in full. Raises if any fell short.
+        """
+        written = await asyncio.gather(*(embedding_service.index_tools(batch) for batch in group))
+        for batch, count in zip(group, written):
+            if count < len(batch):
+                raise RuntimeError(
+                    f"Only {count} of {len(batch)} tools indexed in the batch after {self.position or 'the start'}"
+                )
+            self.indexed += count
+            self.processed += len(batch)
+            self.position = str(batch[-1]["tool_id"])
+
+    async def run(self, resume: bool = True) -> Dict[str, Any]:
+        """Rebuild the index, continuing from the checkpoint when resume is set."""
+        if not embedding_service.is_connected:
+            self.status = "failed"
+            raise RuntimeError("Vector database is not connected")
+
+        self.status = "running"
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.position = None
+        self.processed = 0
+        self.indexed = 0
+
+        async with AsyncSessionLocal() as checkpoint_db, AsyncSessionLocal() as cursor_db:
+            checkpoint = await checkpoint_db.get(JobCheckpoint, CHECKPOINT_NAME)
+            if resume and checkpoint and checkpoint.status != "completed":
+                self.position = checkpoint.position
+                self.processed = checkpoint.processed
+            self._processed_at_start = self.processed
+            await self._checkpoint(checkpoint_db, "running")
+
+            try:
+                after = UUID(self.position) if self.position else None
+                result = await cursor_db.stream(self._query(after))
+
+                group: List[List[Dict[str, Any]]] = []
+                async for rows in result.mappings().partitions(self.batch_size):
+                    group.append([dict(row) for row in rows])
+                    if len(group) >= self.concurrency:
+                        await self._index_group(group)
+                        await self._checkpoint(checkpoint_db, "running")
+                        group = []
+                if group:
+                    await self._index_group(group)
+
+                self.status = "completed"
+            except asyncio.CancelledError:
+                self.status = "cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Vector reindex failed: {e}", exc_info=True)
+                self.status = "failed"
+                raise
+            finally:
+                self.finished_at = datetime.now(timezone.utc)
+                try:
+                    await self._checkpoint(checkpoint_db, self.status)
+                except Exception as e:
+                    logger.error(f"Could not save reindex checkpoint: {e}")
+                logger.info(
+                    f"Vector reindex {self.status}: {self.processed} tools processed, "
+                    f"{self.indexed} indexed this run"
+                )
+
+        return self.progress()
+
+    def progress(self) -> Dict[str, Any]:
+        elapsed = 0.0
+        if self.started_at:
+            elapsed = ((self.finished_at or datetime.now(timezone.utc)) - self.started_at).total_seconds()
+        run_processed = self.processed - self._processed_at_start
+        return {
+            "status": self.status,
+            "running": self.is_running,
+            "position": self.position,
+            "processed": self.processed,
+            "indexed": self.indexed,
+            "failed": run_processed - self.indexed,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(elapsed, 1),
+            "tools_per_second": round(run_processed / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    async def get_progress(self, db: AsyncSession) -> Dict[str, Any]:
+        """Progress of this process's run, or the stored checkpoint if none ran here."""
+        if self.status != "idle":
+            return self.progress()
+
+        checkpoint = await db.get(JobCheckpoint, CHECKPOINT_NAME)
+        progress = self.progress()
+        if checkpoint:
+            progress.update(
+                status=checkpoint.status,
+                position=checkpoint.position,
+                processed=checkpoint.processed,
+            )
+        return progress
+
+
+# Singleton instance
+vector_reindexer = VectorReindexer()
@@ -0,0 +1,392 @@
+"""
+In-process vector index backed by NumPy memory-mapped arrays.
+A drop-in alternative to Qdrant for catalogs up to around a million
+vectors: unit-normalized float32 (or per-row scaled int8) vectors live in
+one contiguous file, top-k is a matrix-vector product (optionally over the
+nearest IVF lists only), and ids and payloads are persisted alongside.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Optional, List, Dict, Any, Tuple, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows scored per matrix product, bounding temporary memory for int8 upcasts
+SCORE_CHUNK_ROWS = 16384
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+
+
+class LocalVectorIndex:
+    """
+    Memory-mapped cosine-similarity index with payloads.
+
+    Rows are kept dense: deleting a point moves the last row into its
+    slot. Writes go to the memory map immediately; ids, payloads and IVF
+    lists are written to disk by flush(). The index is derived data, so a
+    crash between flushes is repaired by a full reindex.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimensions: int,
+        dtype: str = "float32",
+        algorithm: str = "brute",
+        ivf_min_points: int = 50000,
+        ivf_lists: int = 0,
+        ivf_probes: int = 8,
+    ):
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.path = path
+        self.dimensions = dimensions
+        self.dtype = dtype
+        self.algorithm = algorithm
+        self.ivf_min_points = ivf_min_points
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+
+        self._lock = threading.RLock()
+        self._capacity = 0
+        self._count = 0
+        self._vectors: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None  # int8 only
+        self._ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_count = 0
+        self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _map(self, name: str, dtype, shape) -> np.memmap:
+        path = self._file(name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, "ab"):
+            pass
+        if os.path.getsize(path) < size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _reserve(self, capacity: int):
+        """Grow the mapped arrays to hold at least capacity rows."""
+        if capacity <= self._capacity:
+            return
+        capacity = max(capacity, self._capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = self._map(
+            "vectors.bin", np.int8 if self.dtype == "int8" else np.float32,
+            (capacity, self.dimensions)
+        )
+        if self.dtype == "int8":
+            if self._scales is not None:
+                self._scales.flush()
+            self._scales = self._map("scales.bin", np.float32, (capacity,))
+        # load() sets the row count before the arrays exist, so only copy
+        # the assignments the old array actually holds
+        assign = np.zeros(capacity, dtype=np.int32)
+        kept = min(self._count, len(self._assign))
+        assign[:kept] = self._assign[:kept]
+        self._assign = assign
+        self._capacity = capacity
+
+    def load(self):
+        """Open the index at path, creating it (or resetting an incompatible one)."""
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            meta = None
+            try:
+                with open(self._file("meta.json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable local vector index metadata, starting empty: {e}")
+
+            if meta and (meta.get("dimensions") != self.dimensions or meta.get("dtype") != self.dtype):
+                logger.warning("Local vector index has a different shape or dtype - starting empty")
+                meta = None
+            if meta is None:
+                for name in ("vectors.bin", "scales.bin", "centroids.npy", "assign.npy"):
+                    try:
+                        os.remove(self._file(name))
+                    except FileNotFoundError:
+                        pass
+
+            self._ids = meta["ids"] if meta else []
+            self._payloads = meta["payloads"] if meta else []
+            self._count = len(self._ids)
+            self._rows = {point_id: row for row, point_id in enumerate(self._ids)}
+            self._trained_count = meta.get("trained_count", 0) if meta else 0
+            self._reserve(self._count)
+
+            if meta and meta.get("trained_count"):
+                try:
+                    self._centroids = np.load(self._file("centroids.npy"))
+                    self._assign[:self._count] = np.load(self._file("assign.npy"))[:self._count]
+                except (OSError, ValueError):
+                    self._centroids = None
+                    self._trained_count = 0
+            self._dirty = False
+            logger.info(f"Loaded local vector index: {self._count} vectors ({self.dtype})")
+
+    def flush(self):
+        """Persist ids, payloads and IVF lists; vectors are already on disk."""
+        with self._lock:
+            if not self._dirty:
+                return
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+            if self._centroids is not None:
+                np.save(self._file("centroids.npy"), self._centroids)
+                np.save(self._file("assign.npy"), self._assign[:self._count])
+
+            meta = {
+                "dimensions": self.dimensions,
+                "dtype": self.dtype,
+                "trained_count": self._trained_count if self._centroids is not None else 0,
+                "ids": self._ids,
+                "payloads": self._payloads,
+            }
+            tmp = self._file("meta.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._file("meta.json"))
+            self._dirty = False
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _write_row(self, row: int, vector: np.ndarray):
+        if self.dtype == "int8":
+            scale = float(np.abs(vector).max()) / 127.0 or 1.0
+            self._vectors[row] = np.round(vector / scale).astype(np.int8)
+            self._scales[row] = scale
+        else:
+            self._vectors[row] = vector
+
+    def upsert(self, points: List[Tuple[str, List[float], Dict[str, Any]]]):
+        """Insert or replace points given as (id, vector, payload)."""
+        if not points:
+            return
+        with self._lock:
+            self._reserve(self._count + len(points))
+            for point_id, vector, payload in points:
+                v = np.asarray(vector, dtype=np.float32)
+                norm = float(np.linalg.norm(v))
+                if norm:
+                    v = v / norm
+
+                row = self._rows.get(point_id)
+                if row is None:
+                    row = self._count
+                    self._count += 1
+                    self._ids.append(point_id)
+                    self._payloads.append(payload)
+                    self._rows[point_id] = row
+                else:
+                    self._payloads[row] = payload
+                self._write_row(row, v)
+                if self._centroids is not None:
+                    self._assign[row] = int(np.argmax(self._centroids @ v))
+            self._dirty = True
+            self._maybe_train()
+
+    def delete(self, point_ids: List[str]) -> int:
+        """Remove points; returns how many existed."""
+        removed = 0
+        with self._lock:
+            for point_id in point_ids:
+                row = self._rows.pop(point_id, None)
+                if row is None:
+                    continue
+                last = self._count - 1
+                if row != last:
+                    # Keep rows dense: move the last row into the freed slot
+                    self._vectors[row] = self._vectors[last]
+                    if self._scales is not None:
+                        self._scales[row] = self._scales[last]
+                    self._assign[row] = self._assign[last]
+                    self._ids[row] = self._ids[last]
+                    self._payloads[row] = self._payloads[last]
+                    self._rows[self._ids[row]] = row
+                self._ids.pop()
+                self._payloads.pop()
+                self._count -= 1
+                removed += 1
+            if removed:
+                self._dirty = True
+        return removed
+
+    def set_payload(self, updates: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Merge fields into existing points' payloads; returns how many existed."""
+        updated = 0
+        with self._lock:
+            for point_id, fields in updates:
+                row = self._rows.get(point_id)
+                if row is None:
+                    continue
+                self._payloads[row] = {**self._payloads[row], **fields}
+                updated += 1
+            if updated:
+                self._dirty = True
+        return updated
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def _use_ivf(self) -> bool:
+        return self.algorithm == "ivf" and self._count >= self.ivf_min_points
+
+    def _maybe_train(self):
+        # Retrain when the index has doubled since the lists were built
+        if self._use_ivf() and (self._centroids is None or self._count >= 2 * self._trained_count):
+            self.train()
+
+    def _dense(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Float32 copy of the given rows (all rows if None)."""
+        vectors = self._vectors[:self._count] if rows is None else self._vectors[rows]
+        if self.dtype == "int8":
+            scales = self._scales[:self._count] if rows is None else self._scales[rows]
+            return vectors.astype(np.float32) * scales[:, None]
+        return np.asarray(vectors, dtype=np.float32)
+
+    def train(self):
+        """Build IVF lists with spherical k-means over a sample of the rows."""
+        with self._lock:
+            n = self._count
+            if n == 0:
+                return
+            lists = self.ivf_lists or max(1, int(np.sqrt(n)))
+            lists = min(lists, n)
+            rng = np.random.default_rng(0)
+            sample_rows = np.sort(rng.choice(n, size=min(n, lists * KMEANS_SAMPLE_PER_LIST), replace=False))
+            sample = self._dense(sample_rows)
+
+            centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+            for _ in range(KMEANS_ITERATIONS):
+                nearest = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(lists):
+                    members = sample[nearest == c]
+                    if len(members):
+                        centroids[c] = members.sum(axis=0)
+                    else:
+                        centroids[c] = sample[rng.integers(len(sample))]
+                centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+            for start in range(0, n, SCORE_CHUNK_ROWS):
+                rows = np.arange(start, min(n, start + SCORE_CHUNK_ROWS))
+                self._assign[rows] = np.argmax(self._dense(rows) @ centroids.T, axis=1)
+            self._centroids = centroids
+            self._trained_count = n
+            self._dirty = True
+            logger.info(f"Trained local vector index: {lists} IVF lists over {n} vectors")
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _score(self, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Cosine scores of query against rows (or all rows), chunked."""
+        total = self._count if rows is None else len(rows)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, SCORE_CHUNK_ROWS):
+            end = min(total, start + SCORE_CHUNK_ROWS)
+            if rows is None:
+                block = self._vectors[start:end]
+                scales = self._scales[start:end] if self.dtype == "int8" else None
+            else:
+                block = self._vectors[rows[start:end]]
+                scales = self._scales[rows[start:end]] if self.dtype == "int8" else None
+            if scales is not None:
+                scores[start:end] = (block.astype(np.float32) @ query) * scales
+            else:
+                scores[start:end] = block @ query
+        return scores
+
+    def search(
+        self,
+        vector: List[float],
+        limit: int,
+        score_threshold: float = 0.0,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Top-limit points by cosine similarity whose payload satisfies
+        predicate. Returns (id, score, payload) tuples, best first.
+        """
+        with self._lock:
+            if self._count == 0 or limit <= 0:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            norm = float(np.linalg.norm(query))
+            if norm:
+                query = query / norm
+
+            rows = None
+            if self._centroids is not None and self._use_ivf():
+                probes = min(self.ivf_probes, len(self._centroids))
+                nearest_lists = np.argpartition(-(self._centroids @ query), probes - 1)[:probes]
+                rows = np.flatnonzero(np.isin(self._assign[:self._count], nearest_lists))
+                if len(rows) == 0:
+                    return []
+
+            scores = self._score(query, rows)
+            eligible = np.flatnonzero(scores >= score_threshold)
+            if len(eligible) == 0:
+                return []
+
+            # Take a few times more candidates than needed so filtered-out
+            # payloads rarely force a second pass
+            results: List[Tuple[str, float, Dict[str, Any]]] = []
+            k = min(len(eligible), limit * 4 if predicate else limit)
+            checked = set()
+            while True:
+                top = eligible[np.argpartition(-scores[eligible], k - 1)[:k]] if k < len(eligible) else eligible
+                top = top[np.argsort(-scores[top], kind="stable")]
+                for i in top:
+                    if i in checked:
+                        continue
+                    checked.add(i)
+                    row = int(rows[i]) if rows is not None else int(i)
+                    payload = self._payloads[row]
+                    if predicate is None or predicate(payload):
+                        results.append((self._ids[row], float(scores[i]), payload))
+                if len(results) >= limit or k >= len(eligible):
+                    results.sort(key=lambda r: -r[1])
+                    return results[:limit]
+                k = min(len(eligible), k * 4)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "vectors": self._count,
+            "capacity": self._capacity,
+            "dtype": self.dtype,
+            "ivf_lists": 0 if self._centroids is None else len(self._centroids),
+            "ivf_active": self._centroids is not None and self._use_ivf(),
+        }
@@ -0,0 +1,53 @@
+"""
+Persistence round-trips for the local vector index.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.vector_store import LocalVectorIndex  # noqa: E402
+
+DIMENSIONS = 8
+
+
+def _points(count: int):
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((count, DIMENSIONS)).astype(np.float32)
+    return [(f"tool-{i}", vectors[i].tolist(), {"tool_id": f"tool-{i}"}) for i in range(count)]
+
+
+def _index(path, algorithm: str) -> LocalVectorIndex:
+    return LocalVectorIndex(
+        path=str(path),
+        dimensions=DIMENSIONS,
+        algorithm=algorithm,
+        ivf_min_points=16,
+        ivf_lists=4,
+        ivf_probes=4,
+    )
+
+
+@pytest.mark.parametrize("algorithm", ["brute", "ivf"])
+def test_flush_and_reload(tmp_path, algorithm):
+    points = _points(64)
+    index = _index(tmp_path, algorithm)
+    index.load()
+    index.upsert(points)
+    if algorithm == "ivf":
+        assert index._centroids is not None
+    expected = index.search(points[5][1], limit=3)
+    index.flush()
+
+    reopened = _index(tmp_path, algorithm)
+    reopened.load()
+
+    assert len(reopened) == len(points)
+    assert reopened.search(points[5][1], limit=3) == expected
+    assert expected[0][0] == "tool-5"
+    if algorithm == "ivf":
+        assert reopened._centroids is not None
+        assert np.array_equal(reopened._assign[:len(points)], index._assign[:len(points)])
+
+    # The reopened index keeps accepting writes
+    reopened.upsert([("tool-new", points[0][1], {"tool_id": "tool-new"})])
+    assert len(reopened) == len(points) + 1
@@ -58,7 +58,7 @@ export default function SubmitToolPage() {
     setIsSubmitting(true);
 
     try {
-      const tool = await api.submitToolFromUrl(url);
+      const tool = await api.submitToolFromUrl(url, extractedData.extraction_token);
       setSubmittedToolSlug(tool.slug);
       setStep('success');
       toast.success('Tool submitted successfully!');
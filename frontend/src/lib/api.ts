@@ -172,8 +172,11 @@ class ApiClient {
     return data;
   }
 
-  async submitToolFromUrl(url: string): Promise<Tool> {
-    const { data } = await this.client.post<Tool>('/tools/submit', { url });
+  async submitToolFromUrl(url: string, extractionToken?: string): Promise<Tool> {
+    const { data } = await this.client.post<Tool>('/tools/submit', {
+      url,
+      extraction_token: extractionToken,
+    });
     return data;
   }
 
@@ -140,6 +140,8 @@ export interface ToolExtractionResult {
   features: string[];
   use_cases: string[];
   raw_data: Record<string, unknown>;
+  extraction_token?: string;
+  expires_in?: number;
 }
 
 // API Responses